@@ -4,6 +4,7 @@ Cache Manager - Redis integration for workflow and execution data
 
 import redis
 import json
+import hashlib
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
@@ -31,6 +32,10 @@ class CacheManager:
             self.memory_cache = {
                 "workflows": {},
                 "executions": {},
+                "checkpoints": {},
+                "results": {},
+                "triggers": {},
+                "histograms": {},
                 "cache": {}
             }
     
@@ -67,6 +72,32 @@ class CacheManager:
         else:
             self.memory_cache["cache"][key] = value
     
+    def set_if_absent(self, key: str, value: str, ttl: int = 300) -> bool:
+        """Set value only if the key does not exist (atomic with Redis)"""
+        if self.use_redis:
+            try:
+                return bool(self.redis.set(key, value, ex=ttl, nx=True))
+            except:
+                return False
+        if key in self.memory_cache["cache"]:
+            return False
+        self.memory_cache["cache"][key] = value
+        return True
+    
+    def increment(self, key: str, ttl: int = 300) -> int:
+        """Increment a counter; the TTL starts with the first increment"""
+        if self.use_redis:
+            try:
+                value = self.redis.incr(key)
+                if value == 1:
+                    self.redis.expire(key, ttl)
+                return int(value)
+            except:
+                return 0
+        value = int(self.memory_cache["cache"].get(key) or 0) + 1
+        self.memory_cache["cache"][key] = str(value)
+        return value
+    
     def delete(self, key: str):
         """Delete key from cache"""
         if self.use_redis:
@@ -91,8 +122,10 @@ class CacheManager:
     # ========================================================================
     
     def set_workflow(self, workflow_id: str, workflow_data: Dict[str, Any]):
-        """Store workflow definition"""
+        """Store workflow definition (and a content revision used to invalidate compiled plans)"""
         key = f"workflow:{workflow_id}"
+        revision = hashlib.sha256(json.dumps(workflow_data, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        self.set(f"workflow:{workflow_id}:revision", revision, 86400 * 7)
         if self.use_redis:
             try:
                 self.redis.setex(key, 86400 * 7, json.dumps(workflow_data))  # 7 days TTL
@@ -114,6 +147,10 @@ class CacheManager:
                 return None
         return self.memory_cache["workflows"].get(workflow_id)
     
+    def get_workflow_revision(self, workflow_id: str) -> Optional[str]:
+        """Content revision of the stored workflow (cheap check before reusing a compiled plan)"""
+        return self.get(f"workflow:{workflow_id}:revision")
+    
     def list_workflows(self) -> List[Dict[str, Any]]:
         """List all workflows"""
         workflows = []
@@ -144,6 +181,85 @@ class CacheManager:
                 pass
         else:
             self.memory_cache["workflows"].pop(workflow_id, None)
+        self.delete(f"workflow:{workflow_id}:revision")
+        self.set_triggers(workflow_id, [])
+    
+    # ========================================================================
+    # WORKFLOW TRIGGERS
+    # ========================================================================
+    
+    def set_triggers(self, workflow_id: str, triggers: List[Dict[str, Any]]):
+        """Store the cron triggers of a workflow (no TTL - they outlive restarts)"""
+        key = f"workflow:{workflow_id}:triggers"
+        if self.use_redis:
+            try:
+                if triggers:
+                    self.redis.set(key, json.dumps(triggers))
+                    self.redis.sadd("triggers:list", workflow_id)
+                else:
+                    self.redis.delete(key)
+                    self.redis.srem("triggers:list", workflow_id)
+            except Exception as e:
+                print(f"Error storing triggers: {e}")
+        elif triggers:
+            self.memory_cache["triggers"][workflow_id] = triggers
+        else:
+            self.memory_cache["triggers"].pop(workflow_id, None)
+    
+    def get_triggers(self, workflow_id: str) -> List[Dict[str, Any]]:
+        """Cron triggers of one workflow"""
+        if self.use_redis:
+            try:
+                data = self.redis.get(f"workflow:{workflow_id}:triggers")
+                return json.loads(data) if data else []
+            except:
+                return []
+        return self.memory_cache["triggers"].get(workflow_id, [])
+    
+    def list_triggers(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Cron triggers of all workflows (workflow_id -> triggers)"""
+        if self.use_redis:
+            try:
+                return {
+                    workflow_id: self.get_triggers(workflow_id)
+                    for workflow_id in self.redis.smembers("triggers:list")
+                }
+            except:
+                return {}
+        return dict(self.memory_cache["triggers"])
+    
+    # ========================================================================
+    # LOCKS
+    # ========================================================================
+    
+    def acquire_lock(self, key: str, owner: str, ttl: int) -> bool:
+        """Take the lock, or extend it if `owner` already holds it"""
+        if self.use_redis:
+            try:
+                extended = self.redis.eval(
+                    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+                    "return redis.call('expire', KEYS[1], ARGV[2]) else return 0 end",
+                    1, key, owner, ttl
+                )
+                return bool(extended) or bool(self.redis.set(key, owner, ex=ttl, nx=True))
+            except:
+                return False
+        holder = self.memory_cache["cache"].setdefault(key, owner)
+        return holder == owner
+    
+    def release_lock(self, key: str, owner: str):
+        """Release the lock if `owner` holds it"""
+        if self.use_redis:
+            try:
+                self.redis.eval(
+                    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+                    "return redis.call('del', KEYS[1]) else return 0 end",
+                    1, key, owner
+                )
+            except:
+                pass
+        elif self.memory_cache["cache"].get(key) == owner:
+            self.memory_cache["cache"].pop(key, None)
     
     # ========================================================================
     # EXECUTION OPERATIONS
@@ -209,7 +325,7 @@ class CacheManager:
                 "error": error
             })
         
-        if status in ["completed", "failed"]:
+        if status in ["completed", "failed", "cancelled"]:
             execution_data["completed_at"] = datetime.now().isoformat()
         
         if error:
@@ -220,6 +336,109 @@ class CacheManager:
         
         self.set_execution(execution_id, execution_data)
     
+    def update_execution_fields(self, execution_id: str, fields: Dict[str, Any]):
+        """Merge extra fields (workflow_id, input_data, queue time...) into an execution"""
+        execution_data = self.get_execution(execution_id) or {
+            "execution_id": execution_id,
+            "started_at": datetime.now().isoformat(),
+            "steps": []
+        }
+        execution_data.update(fields)
+        self.set_execution(execution_id, execution_data)
+    
+    # ========================================================================
+    # NODE CHECKPOINTS
+    # ========================================================================
+    
+    def save_node_checkpoint(self, execution_id: str, node_id: str, checkpoint: Dict[str, Any]):
+        """Store the result of one completed node so a rerun can skip it"""
+        key = f"execution:{execution_id}:checkpoints"
+        checkpoint["saved_at"] = datetime.now().isoformat()
+        
+        if self.use_redis:
+            try:
+                self.redis.hset(key, node_id, json.dumps(checkpoint, default=str))
+                self.redis.expire(key, 86400)  # Same 24 hours TTL as the execution
+            except Exception as e:
+                print(f"Error storing checkpoint: {e}")
+        else:
+            self.memory_cache["checkpoints"].setdefault(execution_id, {})[node_id] = checkpoint
+    
+    def get_node_checkpoints(self, execution_id: str) -> Dict[str, Dict[str, Any]]:
+        """Retrieve all node checkpoints of an execution (node_id -> checkpoint)"""
+        key = f"execution:{execution_id}:checkpoints"
+        if self.use_redis:
+            try:
+                data = self.redis.hgetall(key)
+                return {node_id: json.loads(value) for node_id, value in data.items()}
+            except:
+                return {}
+        return dict(self.memory_cache["checkpoints"].get(execution_id, {}))
+    
+    def delete_node_checkpoints(self, execution_id: str):
+        """Drop all checkpoints of an execution"""
+        key = f"execution:{execution_id}:checkpoints"
+        if self.use_redis:
+            try:
+                self.redis.delete(key)
+            except:
+                pass
+        else:
+            self.memory_cache["checkpoints"].pop(execution_id, None)
+    
+    # ========================================================================
+    # SPILLED RESULTS
+    # ========================================================================
+    
+    def save_result_blob(self, execution_id: str, node_id: str, meta: str, rows: List[str], chunk_size: int = 1000):
+        """Store a large node result once: meta JSON plus one JSON string per row"""
+        key = f"execution:{execution_id}:result:{node_id}"
+        
+        if self.use_redis:
+            try:
+                pipe = self.redis.pipeline()
+                pipe.delete(f"{key}:rows")
+                pipe.setex(key, 86400, meta)  # Same 24 hours TTL as the execution
+                for i in range(0, len(rows), chunk_size):
+                    pipe.rpush(f"{key}:rows", *rows[i:i + chunk_size])
+                pipe.expire(f"{key}:rows", 86400)
+                pipe.execute()
+            except Exception as e:
+                print(f"Error storing result blob: {e}")
+        else:
+            self.memory_cache["results"].setdefault(execution_id, {})[node_id] = {"meta": meta, "rows": rows}
+    
+    def get_result_blob_meta(self, execution_id: str, node_id: str) -> Optional[str]:
+        key = f"execution:{execution_id}:result:{node_id}"
+        if self.use_redis:
+            try:
+                return self.redis.get(key)
+            except:
+                return None
+        blob = self.memory_cache["results"].get(execution_id, {}).get(node_id)
+        return blob["meta"] if blob else None
+    
+    def get_result_blob_rows(self, execution_id: str, node_id: str, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """Rows [start, stop) of a stored result (stop=None for all)"""
+        key = f"execution:{execution_id}:result:{node_id}:rows"
+        if self.use_redis:
+            try:
+                return self.redis.lrange(key, start, -1 if stop is None else stop - 1)
+            except:
+                return []
+        blob = self.memory_cache["results"].get(execution_id, {}).get(node_id)
+        return blob["rows"][start:stop] if blob else []
+    
+    def delete_result_blob(self, execution_id: str, node_id: str):
+        key = f"execution:{execution_id}:result:{node_id}"
+        if self.use_redis:
+            try:
+                self.redis.delete(key, f"{key}:rows")
+            except:
+                pass
+        else:
+            self.memory_cache["results"].get(execution_id, {}).pop(node_id, None)
+    
     def list_executions(self, limit: int = 20) -> List[Dict[str, Any]]:
         """List recent executions"""
         executions = []
@@ -243,6 +462,43 @@ class CacheManager:
         
         return executions
     
+    # ========================================================================
+    # HISTOGRAMS
+    # ========================================================================
+    
+    def increment_histograms(self, observations: Dict[str, Dict[str, int]], ttl: int = 86400 * 30):
+        """Add bucket counts to several histograms at once ({key: {bucket: count}})"""
+        if self.use_redis:
+            try:
+                pipe = self.redis.pipeline()
+                for key, buckets in observations.items():
+                    for bucket, count in buckets.items():
+                        pipe.hincrby(f"histogram:{key}", bucket, count)
+                    pipe.expire(f"histogram:{key}", ttl)
+                pipe.execute()
+            except Exception as e:
+                print(f"Error updating histograms: {e}")
+        else:
+            for key, buckets in observations.items():
+                histogram = self.memory_cache["histograms"].setdefault(key, {})
+                for bucket, count in buckets.items():
+                    histogram[bucket] = histogram.get(bucket, 0) + count
+    
+    def get_histograms(self, keys: List[str]) -> Dict[str, Dict[str, int]]:
+        """Bucket counts of several histograms ({} for unknown keys)"""
+        if self.use_redis:
+            try:
+                pipe = self.redis.pipeline()
+                for key in keys:
+                    pipe.hgetall(f"histogram:{key}")
+                return {
+                    key: {bucket: int(count) for bucket, count in buckets.items()}
+                    for key, buckets in zip(keys, pipe.execute())
+                }
+            except:
+                return {key: {} for key in keys}
+        return {key: dict(self.memory_cache["histograms"].get(key, {})) for key in keys}
+    
     # ========================================================================
     # LLM RESPONSE CACHING
     # ========================================================================
@@ -293,5 +549,9 @@ class CacheManager:
             self.memory_cache = {
                 "workflows": {},
                 "executions": {},
+                "checkpoints": {},
+                "results": {},
+                "triggers": {},
+                "histograms": {},
                 "cache": {}
             }
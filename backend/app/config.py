@@ -27,6 +27,20 @@ class Settings(BaseSettings):
     ORACLE_USER: str = "pricing_user"
     ORACLE_PASSWORD: str = "change_me"
     
+    # Oracle Session Pools (one per credentials, shared by all nodes in a process)
+    ORACLE_POOL_MIN: int = 2
+    ORACLE_POOL_MAX: int = 10  # keep >= ORACLE_POOL_WORKERS so pool threads never wait for a session
+    ORACLE_POOL_IDLE_TIMEOUT: int = 300  # idle sessions beyond the minimum are closed after this
+    ORACLE_POOL_PING_INTERVAL: int = 60  # sessions idle this long are pinged on checkout
+    ORACLE_POOL_CHECKOUT_TIMEOUT: int = 30
+    
+    # Oracle Fetching (limits: 0 = none)
+    ORACLE_FETCH_SIZE: int = 100  # rows per round trip (cursor arraysize / prefetchrows)
+    ORACLE_QUERY_MAX_ROWS: int = 0  # a query stops fetching after this many rows
+    ORACLE_QUERY_MAX_BYTES: int = 0  # ... or once its rows reach about this many bytes
+    ORACLE_DML_BATCH_SIZE: int = 1000  # rows per executemany() / commit in batch DML
+    ORACLE_BULK_COLLECTION_TYPE: str = "SYS.ODCIVARCHAR2LIST"  # array-binds bulk CUSIP lookups ("" = IN-lists)
+    
     # Unix SSH Settings
     UNIX_SERVERS: dict = {
         "pricing_server_1": {
@@ -45,7 +59,80 @@ class Settings(BaseSettings):
     
     # Workflow Settings
     WORKFLOW_TIMEOUT: int = 300  # 5 minutes
+    NODE_TIMEOUT: int = 120  # per node, capped by the remaining workflow time
     MAX_CONCURRENT_WORKFLOWS: int = 10
+    MAX_CONCURRENT_PER_WORKFLOW: int = 3
+    MAX_QUEUED_WORKFLOWS: int = 100
+    
+    # Execution Queue ("local": run in the API process, "queue": Redis Streams + app/worker.py)
+    EXECUTION_MODE: str = "local"
+    EXECUTION_STREAM: str = "workflow:executions"
+    EXECUTION_GROUP: str = "workflow-workers"
+    EXECUTION_STREAM_MAXLEN: int = 10000
+    EXECUTION_RECLAIM_IDLE_MS: int = 60000  # pending this long without heartbeat -> reclaimed
+    EXECUTION_MAX_DELIVERIES: int = 3  # then moved to the dead-letter stream
+    CREDENTIAL_ENCRYPTION_KEY: str = ""  # Fernet key shared by API and workers; required in queue mode
+    
+    # Cron Triggers (fired by one leader process, elected through Redis)
+    TRIGGERS_ENABLED: bool = True
+    TRIGGER_POLL_SECONDS: int = 5
+    TRIGGER_LEADER_TTL: int = 30  # a dead leader is replaced after this
+    TRIGGER_LOOKBACK_SECONDS: int = 120  # missed slots younger than this still fire on takeover
+    TRIGGER_PREWARM_SECONDS: int = 60  # compile + connect this long before a scheduled run
+    
+    # Single-flight: identical concurrent execute requests share one execution
+    SINGLE_FLIGHT_ENABLED: bool = True
+    
+    # Retries and Circuit Breakers (attempts / backoff come from the agent config.json)
+    RETRY_BASE_DELAY: float = 0.5  # seconds, doubled per attempt with exponential backoff
+    RETRY_MAX_DELAY: float = 10.0
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # failures within the window that open a target's breaker
+    CIRCUIT_FAILURE_WINDOW: int = 60
+    CIRCUIT_COOLDOWN: int = 30  # seconds open before a half-open probe call is let through
+    CIRCUIT_PROBE_TIMEOUT: int = 60
+    
+    # Executor Pools (threads for blocking MCP calls, per backend)
+    ORACLE_POOL_WORKERS: int = 10
+    UNIX_POOL_WORKERS: int = 10
+    REPORT_POOL_WORKERS: int = 4  # report file writes
+    # Process pool for CPU-bound steps; 0 = one per core (per API / worker process)
+    CPU_POOL_WORKERS: int = 0
+    CPU_POOL_START_METHOD: str = "spawn"  # fork is unsafe once the thread pools are running
+    CPU_POOL_SHARED_MEMORY_BYTES: int = 1048576  # str/bytes arguments this large go through shared memory
+    
+    # Execution Event Stream
+    EVENT_COALESCE_MS: int = 100
+    EVENT_INLINE_RESULT_BYTES: int = 16384  # larger node results are sent by reference
+    EVENT_CLIENT_QUEUE_SIZE: int = 256
+    
+    # Streaming Row Pipelines
+    STREAM_BATCH_ROWS: int = 500  # rows per fetchmany() / stream batch
+    STREAM_BUFFER_BATCHES: int = 4  # batches buffered per consumer before the producer waits
+    STREAM_LLM_SAMPLE_ROWS: int = 20  # rows an LLM node keeps from a streamed input
+    
+    # Large Result Spill Store
+    RESULT_SPILL_BYTES: int = 262144  # node results above this are stored outside the execution
+    RESULT_SPILL_BACKEND: str = "redis"  # "redis" or "disk"
+    RESULT_SPILL_DIR: str = "./data/results"
+    RESULT_SPILL_MAX_AGE: int = 86400  # disk files are removed with the execution TTL
+    
+    # Report Nodes (CSV / XLSX files written batch by batch)
+    REPORT_DIR: str = "./data/reports"
+    REPORT_MAX_AGE: int = 86400
+    REPORT_PROCESS_MIN_CELLS: int = 50000  # larger XLSX batches are rendered in the CPU process pool
+    
+    # Execution Tracing (spans per execution, node, MCP / LLM call, cache lookup...)
+    TRACE_ENABLED: bool = True
+    TRACE_EXPORTER: str = "redis"  # "redis" or "file"
+    TRACE_DIR: str = "./data/traces"
+    TRACE_MAX_SPANS: int = 5000  # per execution run; further spans are counted as dropped
+    TRACE_TTL: int = 86400
+    
+    # Duration Estimates (histograms from traces of completed executions)
+    ESTIMATE_MIN_SAMPLES: int = 3  # observations before a histogram is trusted
+    ESTIMATE_WARN_SECONDS: int = 300  # warn when p95 reaches this during market hours
+    ESTIMATE_CACHE_SECONDS: int = 60  # reuse an estimate per plan revision and input size this long
+    MARKET_HOURS: str = "09:30-16:00"  # local time, weekdays
     
     # Skills Directory
     SKILLS_DIR: str = "./app/skills"
@@ -54,11 +141,14 @@ class Settings(BaseSettings):
     CACHE_LLM_RESPONSE_TTL: int = 3600  # 1 hour
     CACHE_ORACLE_QUERY_TTL: int = 300   # 5 minutes
     CACHE_WORKFLOW_STATE_TTL: int = 7200  # 2 hours
+    CACHE_UNIX_COMMAND_TTL: int = 60    # 1 minute
+    CACHE_NODE_RESULT_TTL: int = 300    # default for other memoized node types
     
     # Compression Settings
     ENABLE_COMPRESSION: bool = True
     MAX_CONTEXT_TOKENS: int = 2000
     COMPRESSION_TARGET_RATIO: float = 0.4  # Target 40% reduction
+    COMPRESSION_PROCESS_MIN_CHARS: int = 20000  # longer contexts are compressed in the CPU process pool
     
     class Config:
         env_file = ".env"
@@ -5,10 +5,18 @@ For POC/Demo, we use Redis with basic encryption
 """
 
 import json
+import hashlib
 from typing import Dict, Optional, Any
 from cryptography.fernet import Fernet
 import base64
 import os
+from config import settings
+
+
+def credentials_fingerprint(credentials: Dict[str, Any]) -> str:
+    """Stable hash of a credentials dict (never the credentials themselves)"""
+    content = json.dumps(credentials, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
 
 
 class CredentialStore:
@@ -22,24 +30,56 @@ class CredentialStore:
         self.encryption_key = self._get_or_create_key()
         self.cipher = Fernet(self.encryption_key)
         
-        # Use in-memory storage for demo (could use Redis in production)
+        # In-memory storage for demo; with a Redis client the encrypted blobs are
+        # shared so queue workers in other processes see the same credentials
         self.credentials_store = {}
         self.redis_client = redis_client
         
-        print("✓ Credential store initialized (in-memory with encryption)")
+        backend = "Redis" if redis_client else "in-memory"
+        print(f"✓ Credential store initialized ({backend} with encryption)")
     
     def _get_or_create_key(self) -> bytes:
-        """Get or create encryption key"""
-        key_file = "/tmp/cred_store_key.key"
+        """
+        Encryption key: CREDENTIAL_ENCRYPTION_KEY when set (must be the same on every
+        API and worker host), else a key file local to this host
+        
+        Raises:
+            RuntimeError: in queue mode without CREDENTIAL_ENCRYPTION_KEY - workers on
+                          other hosts could not decrypt the shared credentials
+        """
+        if settings.CREDENTIAL_ENCRYPTION_KEY:
+            key = settings.CREDENTIAL_ENCRYPTION_KEY.encode()
+            Fernet(key)  # ValueError here beats failing on the first decrypt
+            return key
+        
+        if settings.EXECUTION_MODE == "queue":
+            raise RuntimeError(
+                "CREDENTIAL_ENCRYPTION_KEY must be set when EXECUTION_MODE=queue "
+                "(generate one with Fernet.generate_key() and share it with every worker)"
+            )
         
-        if os.path.exists(key_file):
-            with open(key_file, 'rb') as f:
-                return f.read()
-        else:
+        key_file = "/tmp/cred_store_key.key"
+        if not os.path.exists(key_file):
+            # Publish the key with link() so processes starting together agree on one key
             key = Fernet.generate_key()
-            with open(key_file, 'wb') as f:
+            tmp_file = f"{key_file}.{os.getpid()}"
+            with open(tmp_file, 'wb') as f:
                 f.write(key)
-            return key
+            try:
+                os.link(tmp_file, key_file)
+            except FileExistsError:
+                pass
+            finally:
+                os.remove(tmp_file)
+        
+        with open(key_file, 'rb') as f:
+            return f.read()
+    
+    def _load(self, node_id: str) -> Optional[str]:
+        """Encrypted credential blob, read from Redis first when shared"""
+        if self.redis_client:
+            return self.redis_client.hget("credentials", node_id)
+        return self.credentials_store.get(node_id)
     
     def _encrypt(self, data: str) -> str:
         """Encrypt data"""
@@ -68,8 +108,10 @@ class CredentialStore:
         # Encrypt the entire credential object
         encrypted = self._encrypt(json.dumps(cred_data))
         
-        # Store in memory
+        # Store in memory (and Redis when shared)
         self.credentials_store[node_id] = encrypted
+        if self.redis_client:
+            self.redis_client.hset("credentials", node_id, encrypted)
         
         print(f"✓ Credentials stored for {node_type} node: {node_id}")
     
@@ -83,7 +125,7 @@ class CredentialStore:
         Returns:
             Dictionary with node_type and credentials, or None if not found
         """
-        encrypted = self.credentials_store.get(node_id)
+        encrypted = self._load(node_id)
         if not encrypted:
             return None
         
@@ -97,16 +139,30 @@ class CredentialStore:
     
     def has_credentials(self, node_id: str) -> bool:
         """Check if credentials exist for a node"""
-        return node_id in self.credentials_store
+        return self._load(node_id) is not None
+    
+    def fingerprint(self, node_id: str) -> Optional[str]:
+        """
+        Stable hash of a node's credentials (never the credentials themselves)
+        Used to key cached results so a credential change invalidates them
+        """
+        cred_data = self.get(node_id)
+        if not cred_data:
+            return None
+        
+        return credentials_fingerprint(cred_data.get("credentials", {}))
     
     def delete(self, node_id: str):
         """Delete credentials for a node"""
-        if node_id in self.credentials_store:
-            del self.credentials_store[node_id]
+        if self.redis_client:
+            self.redis_client.hdel("credentials", node_id)
+        if self.credentials_store.pop(node_id, None) is not None:
             print(f"✓ Credentials deleted for node: {node_id}")
     
     def list_nodes_with_credentials(self) -> list:
         """List all node IDs that have credentials stored"""
+        if self.redis_client:
+            return list(self.redis_client.hkeys("credentials"))
         return list(self.credentials_store.keys())
     
     def get_credential_summary(self, node_id: str) -> Optional[Dict[str, Any]]:
@@ -163,6 +219,8 @@ class CredentialStore:
     def clear_all(self):
         """Clear all credentials (use with caution!)"""
         self.credentials_store.clear()
+        if self.redis_client:
+            self.redis_client.delete("credentials")
         print("✓ All credentials cleared")
     
     # ========================================================================
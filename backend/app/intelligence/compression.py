@@ -4,6 +4,8 @@ from typing import List, Tuple
 from datetime import datetime
 from config import settings
 from cache.redis_cache import cache
+from workflow.tracing import span
+from workflow.pools import executor_pools
 
 class BloatingCompressionEngine:
     """
@@ -38,6 +40,18 @@ class BloatingCompressionEngine:
         Returns:
             Tuple of (compressed_text, metadata)
         """
+        with span("compression", chars=len(context)) as compression_span:
+            compressed, metadata = await self._compress_context(context, max_tokens, preserve_structure)
+            compression_span.set(
+                original_tokens=metadata.get('original_tokens'),
+                compressed_tokens=metadata.get('compressed_tokens'),
+                technique=metadata.get('technique'),
+                cached=metadata.get('cached', False)
+            )
+            return compressed, metadata
+    
+    async def _compress_context(self, context: str, max_tokens: int = None,
+                                preserve_structure: bool = False) -> Tuple[str, dict]:
         max_tokens = max_tokens or settings.MAX_CONTEXT_TOKENS
         
         # Check cache first
@@ -59,28 +73,13 @@ class BloatingCompressionEngine:
                 'time_ms': 0
             }
         
-        # Apply compression techniques
-        compressed = context
-        technique_used = []
-        
-        # Step 1: Remove redundancy
-        if not preserve_structure:
-            compressed = self._remove_redundancy(compressed)
-            technique_used.append('redundancy_removal')
-        
-        # Step 2: Semantic deduplication
-        compressed = self._semantic_dedup(compressed)
-        technique_used.append('semantic_dedup')
-        
-        # Step 3: Sentence compression
-        if self._estimate_tokens(compressed) > max_tokens:
-            compressed = self._compress_sentences(compressed)
-            technique_used.append('sentence_compression')
-        
-        # Step 4: If still too large, aggressive summarization
-        if self._estimate_tokens(compressed) > max_tokens:
-            compressed = self._aggressive_compress(compressed, max_tokens)
-            technique_used.append('aggressive_summary')
+        # Apply compression techniques (long texts in the CPU process pool)
+        if len(context) >= settings.COMPRESSION_PROCESS_MIN_CHARS:
+            compressed, technique_used = await executor_pools.run(
+                "cpu", apply_techniques, context, max_tokens, preserve_structure
+            )
+        else:
+            compressed, technique_used = self._apply_techniques(context, max_tokens, preserve_structure)
         
         # Calculate stats
         compressed_tokens = self._estimate_tokens(compressed)
@@ -111,6 +110,33 @@ class BloatingCompressionEngine:
         
         return compressed, metadata
     
+    def _apply_techniques(self, context: str, max_tokens: int,
+                          preserve_structure: bool) -> Tuple[str, List[str]]:
+        """Regex passes, in order, until the text fits (pure CPU work)"""
+        compressed = context
+        technique_used = []
+        
+        # Step 1: Remove redundancy
+        if not preserve_structure:
+            compressed = self._remove_redundancy(compressed)
+            technique_used.append('redundancy_removal')
+        
+        # Step 2: Semantic deduplication
+        compressed = self._semantic_dedup(compressed)
+        technique_used.append('semantic_dedup')
+        
+        # Step 3: Sentence compression
+        if self._estimate_tokens(compressed) > max_tokens:
+            compressed = self._compress_sentences(compressed)
+            technique_used.append('sentence_compression')
+        
+        # Step 4: If still too large, aggressive summarization
+        if self._estimate_tokens(compressed) > max_tokens:
+            compressed = self._aggressive_compress(compressed, max_tokens)
+            technique_used.append('aggressive_summary')
+        
+        return compressed, technique_used
+    
     def _remove_redundancy(self, text: str) -> str:
         """Remove redundant phrases and filler words"""
         # Common redundant patterns
@@ -296,3 +322,7 @@ class BloatingCompressionEngine:
 
 # Global compression engine instance
 compression_engine = BloatingCompressionEngine()
+
+def apply_techniques(context: str, max_tokens: int, preserve_structure: bool) -> Tuple[str, List[str]]:
+    """Entry point for the CPU process pool (runs in a worker process)"""
+    return compression_engine._apply_techniques(context, max_tokens, preserve_structure)
@@ -11,6 +11,7 @@ import httpx
 
 from intelligence.compression import BloatingCompressionEngine, ResponseCompressor
 from intelligence.prompt_engine import PromptEngineeringEngine
+from workflow.tracing import span
 
 
 class IntelligentOrchestrator:
@@ -346,9 +347,16 @@ Final answer:
         """
         Call the LLM API with caching
         """
+        with span("llm.call", prompt_chars=len(prompt)) as llm_span:
+            response = await self._fetch_llm_response(prompt, llm_span)
+            llm_span.set(response_chars=len(response))
+            return response
+    
+    async def _fetch_llm_response(self, prompt: str, llm_span) -> str:
         # Check cache first
         cache_key = f"llm:{self.compressor._hash_text(prompt)}"
         cached = self.redis.get(cache_key)
+        llm_span.set(cached=bool(cached))
         
         if cached:
             print(f"      💾 LLM cache hit")
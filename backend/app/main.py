@@ -1,16 +1,48 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from contextlib import asynccontextmanager
 import uvicorn
+import asyncio
 import os
 import json
-
+import uuid
 
 from config import settings
 from models import *
 from cache.redis_cache import cache
 from intelligence.compression import compression_engine
 from intelligence.prompt_engine import prompt_engine
+from cache_manager import CacheManager
+from credential_store import CredentialStore
+from orchestrator import WorkflowOrchestrator
+from workflow.pools import executor_pools
+from workflow.scheduler import WorkflowScheduler, SchedulerSaturatedError
+from workflow.events import ExecutionEventHub
+from workflow.engine import PlanCompileError
+from workflow.queue import ExecutionQueueClient, relay_events
+from workflow.singleflight import SingleFlightRegistry
+from workflow.triggers import TriggerScheduler, CronError, normalize_triggers
+from mcp_servers.reporting_mcp import parse_byte_range, iter_file_range
+from mcp_servers.oracle_pool import oracle_pools
+from datetime import datetime
+from typing import Optional
+
+
+# Workflow execution components
+cache_manager = CacheManager(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
+# Credentials are shared through Redis only in queue mode (workers need them; the key is shared too)
+credential_store = CredentialStore(
+    redis_client=cache_manager.redis if settings.EXECUTION_MODE == "queue" and cache_manager.use_redis else None
+)
+orchestrator = WorkflowOrchestrator(cache_manager, credential_store, llm_endpoint=settings.LLM_API_URL)
+event_hub = ExecutionEventHub()
+scheduler = WorkflowScheduler(orchestrator, event_hub)
+# EXECUTION_MODE=queue: executions run in app/worker.py processes instead of here
+execution_queue = ExecutionQueueClient(cache_manager) \
+    if settings.EXECUTION_MODE == "queue" and cache_manager.use_redis else None
+single_flight = SingleFlightRegistry(cache_manager)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -27,6 +59,23 @@ async def lifespan(app: FastAPI):
     else:
         print("   ⚠ Redis cache unavailable (using in-memory)")
     
+    # Remove spilled results that outlived their executions
+    removed = orchestrator.spill.cleanup()
+    if removed:
+        print(f"   ✓ Removed {removed} expired spilled results")
+    removed = orchestrator.reports.cleanup(settings.REPORT_MAX_AGE)
+    if removed:
+        print(f"   ✓ Removed reports of {removed} expired executions")
+    
+    # Relay events of executions running in queue workers
+    relay_task = asyncio.ensure_future(relay_events(event_hub)) if execution_queue else None
+    if execution_queue:
+        print("   ✓ Execution queue mode (run app/worker.py for executors)")
+    
+    # Cron triggers (only the leader process fires them)
+    if settings.TRIGGERS_ENABLED:
+        triggers.start()
+    
     # Load available agents
     agents = prompt_engine.get_available_agents()
     print(f"   ✓ Loaded {len(agents)} agents: {', '.join(agents)}")
@@ -35,6 +84,11 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("👋 Shutting down Pricing Workflow POC...")
+    if relay_task:
+        relay_task.cancel()
+    await triggers.stop()
+    executor_pools.shutdown()
+    oracle_pools.close_all()
 
 # Create FastAPI app
 app = FastAPI(
@@ -76,6 +130,354 @@ async def get_cache_stats():
 async def get_compression_stats():
     return compression_engine.get_stats()
 
+@app.get("/api/oracle/pools/stats")
+async def get_oracle_pool_stats():
+    """Session pools per credentials fingerprint (prefix) and target"""
+    return oracle_pools.get_stats()
+
+@app.get("/api/executor/stats")
+async def get_executor_stats():
+    return executor_pools.get_stats()
+
+# Workflow definition endpoints
+@app.get("/api/workflows")
+async def list_workflows():
+    return {"workflows": cache_manager.list_workflows()}
+
+@app.get("/api/workflows/{workflow_id}")
+async def get_workflow(workflow_id: str):
+    workflow = cache_manager.get_workflow(workflow_id)
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return workflow
+
+@app.post("/api/workflows")
+async def save_workflow(workflow: dict):
+    """Create or update a workflow; it is compiled up front so invalid graphs are rejected"""
+    workflow_id = workflow.get('id') or str(uuid.uuid4())
+    existing = cache_manager.get_workflow(workflow_id)
+    now = datetime.now().isoformat()
+    workflow.update({
+        "id": workflow_id,
+        "created_at": existing.get("created_at", now) if existing else now,
+        "updated_at": now
+    })
+    
+    try:
+        plan = orchestrator.plans.compiler.compile(workflow_id, workflow)
+    except PlanCompileError as e:
+        raise HTTPException(status_code=400, detail={"message": str(e), "problems": e.problems})
+    
+    cache_manager.set_workflow(workflow_id, workflow)
+    orchestrator.plans.invalidate(workflow_id)
+    
+    return {
+        "workflow_id": workflow_id,
+        "plan": plan.describe(),
+        "estimate": orchestrator.estimator.estimate(workflow_id)
+    }
+
+@app.delete("/api/workflows/{workflow_id}")
+async def delete_workflow(workflow_id: str):
+    cache_manager.delete_workflow(workflow_id)
+    orchestrator.plans.invalidate(workflow_id)
+    return {"message": "Workflow deleted successfully"}
+
+@app.get("/api/workflows/{workflow_id}/triggers")
+async def get_workflow_triggers(workflow_id: str):
+    return {"workflow_id": workflow_id, "triggers": cache_manager.get_triggers(workflow_id)}
+
+@app.put("/api/workflows/{workflow_id}/triggers")
+async def set_workflow_triggers(workflow_id: str, request: dict):
+    """Replace the cron triggers of a workflow: [{"cron", "input_data", "priority", "enabled", "prewarm"}]"""
+    if not cache_manager.get_workflow(workflow_id):
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    
+    try:
+        workflow_triggers = normalize_triggers(request.get('triggers', []))
+    except CronError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    cache_manager.set_triggers(workflow_id, workflow_triggers)
+    return {"workflow_id": workflow_id, "triggers": workflow_triggers}
+
+@app.get("/api/triggers/stats")
+async def get_trigger_stats():
+    return triggers.get_stats()
+
+@app.get("/api/workflows/{workflow_id}/estimate")
+async def get_workflow_estimate(workflow_id: str):
+    return await estimate_workflow(workflow_id, {})
+
+@app.post("/api/workflows/{workflow_id}/estimate")
+async def estimate_workflow(workflow_id: str, request: dict):
+    """p50 / p95 wall time and resource cost of a run, from past executions (input_data sizes map nodes)"""
+    try:
+        estimate = orchestrator.estimator.estimate(workflow_id, request.get('input_data', {}))
+    except PlanCompileError as e:
+        raise HTTPException(status_code=400, detail={"message": str(e), "problems": e.problems})
+    if estimate is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return estimate
+
+@app.get("/api/workflows/plans/stats")
+async def get_plan_stats():
+    return orchestrator.plans.get_stats()
+
+@app.get("/api/workflows/estimates/stats")
+async def get_estimate_stats():
+    return orchestrator.estimator.get_stats()
+
+# Workflow execution endpoints
+async def _submit_execution(workflow_id: str, input_data: dict, execution_id: str, priority: str, resume: bool = False):
+    """Run in this process's scheduler, or enqueue for workers in queue mode"""
+    if execution_queue:
+        return await execution_queue.submit(workflow_id, input_data, execution_id, priority=priority, resume=resume)
+    return scheduler.submit(workflow_id, input_data, execution_id, priority=priority, resume=resume)
+
+# Cron triggers fire through the same submit path; prewarm only where executions run
+triggers = TriggerScheduler(cache_manager, _submit_execution, prewarm=None if execution_queue else orchestrator.prewarm)
+
+@app.post("/api/workflows/{workflow_id}/execute")
+async def execute_workflow(workflow_id: str, request: dict):
+    """
+    Queue a workflow execution (priority: eod_repair, scheduled, manual, chat)
+    
+    An identical request (same workflow revision and input) made while one is
+    still queued or running attaches to it instead ("coalesced": true, same
+    execution_id); pass "dedupe": false to force a separate run.
+    """
+    if not cache_manager.get_workflow(workflow_id):
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    
+    input_data = request.get('input_data', {})
+    execution_id = str(uuid.uuid4())
+    flight_key = None
+    if single_flight.enabled and request.get('dedupe', True):
+        flight_key, leader = single_flight.attach(workflow_id, input_data, execution_id)
+        if leader:
+            execution = cache_manager.get_execution(leader) or {}
+            return {
+                "execution_id": leader,
+                "status": execution.get("status", "queued"),
+                "coalesced": True
+            }
+    
+    try:
+        response = await _submit_execution(
+            workflow_id,
+            input_data,
+            execution_id,
+            priority=request.get('priority', 'manual')
+        )
+    except ValueError as e:
+        if flight_key:
+            single_flight.release(flight_key, execution_id)
+        raise HTTPException(status_code=400, detail=str(e))
+    except SchedulerSaturatedError as e:
+        if flight_key:
+            single_flight.release(flight_key, execution_id)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    
+    # Long runs during market hours are flagged (they still run)
+    try:
+        estimate = orchestrator.estimator.estimate(workflow_id, input_data)
+    except PlanCompileError:
+        estimate = None
+    if estimate and estimate["warnings"]:
+        response = {**response, "estimated_duration": estimate["estimated_duration"], "warnings": estimate["warnings"]}
+    return response
+
+@app.get("/api/executions/{execution_id}")
+async def get_execution(execution_id: str):
+    execution = cache_manager.get_execution(execution_id)
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return execution
+
+@app.post("/api/executions/{execution_id}/rerun")
+async def rerun_execution(execution_id: str, request: dict = None):
+    """Re-run a failed or cancelled execution, skipping nodes with valid checkpoints"""
+    request = request or {}
+    execution = cache_manager.get_execution(execution_id)
+    if not execution or not execution.get("workflow_id"):
+        raise HTTPException(status_code=404, detail="Execution not found")
+    
+    if (execution_queue or scheduler).is_active(execution_id):
+        raise HTTPException(status_code=409, detail="Execution is still queued or running")
+    
+    try:
+        return await _submit_execution(
+            execution["workflow_id"],
+            request.get('input_data', execution.get("input_data", {})),
+            execution_id,
+            priority=request.get('priority', execution.get("priority", "manual")),
+            resume=True
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SchedulerSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+
+@app.get("/api/executions/{execution_id}/trace")
+async def get_execution_trace(execution_id: str):
+    """Spans of every run of an execution plus total time per span name"""
+    trace = orchestrator.tracer.get_trace(execution_id)
+    if not trace:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace
+
+@app.get("/api/traces/stats")
+async def get_trace_stats():
+    return orchestrator.tracer.get_stats()
+
+@app.get("/api/executions/{execution_id}/checkpoints")
+async def get_execution_checkpoints(execution_id: str):
+    return cache_manager.get_node_checkpoints(execution_id)
+
+@app.post("/api/executions/control")
+async def control_execution(control: ExecutionControl):
+    """Pause, resume or cancel an execution"""
+    execution_id = control.workflow_execution_id
+    
+    if control.action == "start":
+        raise HTTPException(status_code=400, detail="Use POST /api/workflows/{workflow_id}/execute to start a workflow")
+    
+    if execution_queue:
+        accepted = await getattr(execution_queue, control.action)(execution_id)
+    else:
+        handlers = {
+            "pause": scheduler.pause,
+            "resume": scheduler.resume,
+            "cancel": scheduler.cancel
+        }
+        accepted = handlers[control.action](execution_id)
+    if not accepted:
+        raise HTTPException(status_code=409, detail=f"Cannot {control.action} execution {execution_id}")
+    
+    return {"execution_id": execution_id, "action": control.action, "accepted": True}
+
+@app.get("/api/scheduler/stats")
+async def get_scheduler_stats():
+    if execution_queue:
+        return await execution_queue.get_stats()
+    return scheduler.get_stats()
+
+@app.get("/api/resilience/stats")
+async def get_resilience_stats():
+    return orchestrator.resilience.get_stats()
+
+@app.get("/api/resilience/breakers/{target:path}")
+async def get_breaker_state(target: str):
+    return {"target": target, "state": orchestrator.resilience.breaker.state(target)}
+
+@app.get("/api/singleflight/stats")
+async def get_single_flight_stats():
+    return single_flight.get_stats()
+
+@app.get("/api/executions/{execution_id}/nodes/{node_id}/result")
+async def get_node_result(execution_id: str, node_id: str, offset: Optional[int] = None, limit: Optional[int] = None):
+    """
+    Result of one node (large results are only referenced in events and state)
+    
+    With offset/limit only that slice of the row field ("data" for queries,
+    "results" for map nodes) is returned; spilled results are read lazily.
+    """
+    checkpoint = cache_manager.get_node_checkpoints(execution_id).get(node_id)
+    if not checkpoint:
+        raise HTTPException(status_code=404, detail="Node result not found")
+    
+    result = checkpoint["result"]
+    ranged = offset is not None or limit is not None
+    offset, limit = max(0, offset or 0), max(1, min(limit or 1000, 10000))
+    spill = orchestrator.spill
+    
+    if spill.is_handle(result):
+        total_rows = result["total_rows"]
+        result = spill.load_range(execution_id, node_id, offset, limit) if ranged else spill.load(execution_id, node_id)
+        if result is None:
+            raise HTTPException(status_code=410, detail="Node result has expired")
+    elif ranged:
+        field, rows = spill.split_rows(result)
+        total_rows = len(rows)
+        if field:
+            window = rows[offset:offset + limit]
+            result = {**result, field: dict(window) if isinstance(result[field], dict) else window}
+    
+    if ranged:
+        result = {**result, "offset": offset, "limit": limit, "total_rows": total_rows}
+    return result
+
+@app.get("/api/nodes/cache/stats")
+async def get_node_cache_stats():
+    return orchestrator.node_cache.get_stats()
+
+@app.get("/api/executions/{execution_id}/nodes/{node_id}/report")
+async def download_report(execution_id: str, node_id: str, range: Optional[str] = Header(None)):
+    """Report file of a report node; honours a single "Range: bytes=..." header (206)"""
+    checkpoint = cache_manager.get_node_checkpoints(execution_id).get(node_id)
+    result = checkpoint["result"] if checkpoint else {}
+    if orchestrator.spill.is_handle(result):
+        result = orchestrator.spill.load(execution_id, node_id) or {}
+    report = result.get("report")
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    
+    path = orchestrator.reports.path_for(execution_id, node_id, report["format"])
+    if not os.path.exists(path):
+        raise HTTPException(status_code=410, detail="Report has expired")
+    
+    size = os.path.getsize(path)
+    try:
+        byte_range = parse_byte_range(range, size)
+    except ValueError as e:
+        raise HTTPException(status_code=416, detail=str(e), headers={"Content-Range": f"bytes */{size}"})
+    
+    start, end = byte_range or (0, size - 1)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(end - start + 1),
+        "Content-Disposition": f'attachment; filename="{report["filename"]}"'
+    }
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        iter_file_range(path, start, end),
+        status_code=206 if byte_range else 200,
+        media_type=report["content_type"],
+        headers=headers
+    )
+
+@app.get("/api/reports/stats")
+async def get_report_stats():
+    return orchestrator.reports.get_stats()
+
+@app.get("/api/results/spill/stats")
+async def get_spill_stats():
+    return orchestrator.spill.get_stats()
+
+@app.get("/api/events/stats")
+async def get_event_stats():
+    return event_hub.get_stats()
+
+async def _serve_events(websocket: WebSocket, execution_ids=None):
+    await event_hub.connect(websocket, execution_ids)
+    try:
+        while True:
+            message = await websocket.receive_json()
+            event_hub.handle_client_message(websocket, message)
+    except (WebSocketDisconnect, ValueError):
+        event_hub.disconnect(websocket)
+
+@app.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket):
+    """All executions; send {"action": "subscribe", "execution_id": ...} to narrow"""
+    await _serve_events(websocket)
+
+@app.websocket("/ws/executions/{execution_id}")
+async def execution_websocket(websocket: WebSocket, execution_id: str):
+    await _serve_events(websocket, [execution_id])
+
 @app.get("/api/agents")
 async def list_agents():
     agents = prompt_engine.get_available_agents()
@@ -4,17 +4,77 @@ Handles queries, stored procedures, and pricing-specific operations
 """
 
 import cx_Oracle
-from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple, Iterator, AsyncIterator
 import json
 from datetime import datetime
+from decimal import Decimal
+from config import settings
+from mcp_servers.oracle_pool import OracleSessionPool, PoolExhaustedError
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # only needed for result_format="numpy"
+
+# Columns of a bulk status lookup, in the order of each CUSIP's values
+STATUS_COLUMNS = ["SECURITY_NAME", "PRICE", "PRICING_DATE", "PRICING_STATUS", "ERROR_CODE", "LAST_UPDATED"]
+
+# CUSIPs per query: collection elements (SYS.ODCIVARCHAR2LIST is a VARRAY(32767)) / IN-list binds
+ARRAY_BIND_LIMIT = 32767
+IN_LIST_LIMIT = 1000
+
+# execute_query result shapes: row dicts, per-column lists, per-column lists with NumPy numeric columns
+RESULT_FORMATS = ("rows", "columnar", "numpy")
+
+
+def _numeric_array(values: List[Any]):
+    """int64 / float64 (NULL -> NaN) array for a numeric column, None for any other column"""
+    if not any(value is not None for value in values):
+        return None
+    if not all(value is None or (isinstance(value, (int, float, Decimal)) and not isinstance(value, bool))
+               for value in values):
+        return None
+    if all(isinstance(value, int) for value in values):
+        try:
+            return numpy.array(values, dtype=numpy.int64)
+        except OverflowError:
+            pass
+    return numpy.array([numpy.nan if value is None else float(value) for value in values], dtype=numpy.float64)
+
+
+def pricing_status_entry(bulk_result: Dict[str, Any], cusip: str) -> Dict[str, Any]:
+    """One CUSIP of a check_pricing_status_bulk result, shaped like check_pricing_status"""
+    values = bulk_result["statuses"].get(cusip)
+    if values is None:
+        return {
+            "success": False,
+            "cusip": cusip,
+            "message": "CUSIP not found in pricing master table"
+        }
+    details = {"CUSIP": cusip, **dict(zip(bulk_result["columns"], values))}
+    return {
+        "success": True,
+        "cusip": cusip,
+        "status": details.get("PRICING_STATUS"),
+        "price": details.get("PRICE"),
+        "error_code": details.get("ERROR_CODE"),
+        "last_updated": details.get("LAST_UPDATED"),
+        "details": details
+    }
 
 
 class OracleMCPServer:
-    def __init__(self):
+    def __init__(self, pool: Optional[OracleSessionPool] = None):
+        """With a pool, connect() borrows a session from it and disconnect() returns it"""
         self.connection = None
         self.cursor = None
         self.credentials = None
-        print("✓ Oracle MCP Server initialized")
+        self.pool = pool
+        self.last_fetch: Dict[str, Any] = {}
+        self._collection_type = None
+        if pool is None:
+            print("✓ Oracle MCP Server initialized")
     
     def connect(self, credentials: Dict[str, str]) -> Tuple[bool, str]:
         """
@@ -26,6 +86,9 @@ class OracleMCPServer:
         Returns:
             (success: bool, message: str)
         """
+        if self.pool is not None:
+            return self._borrow(credentials)
+        
         try:
             self.credentials = credentials
             
@@ -58,17 +121,62 @@ class OracleMCPServer:
         except Exception as e:
             return (False, f"✗ Connection failed: {str(e)}")
     
+    def _borrow(self, credentials: Dict[str, str]) -> Tuple[bool, str]:
+        """
+        Check out a pooled session (already health-checked by the pool)
+        
+        Raises:
+            PoolExhaustedError: if every session stays busy (not a connection failure)
+        """
+        try:
+            self.credentials = credentials
+            self.connection = self.pool.acquire()
+            self.cursor = self.connection.cursor()
+            return (True, f"✓ Connected to Oracle: {self.pool.target} (pooled session)")
+        except PoolExhaustedError:
+            raise
+        except cx_Oracle.Error as e:
+            error_obj, = e.args
+            return (False, f"✗ Oracle connection failed: {error_obj.message}")
+        except Exception as e:
+            return (False, f"✗ Connection failed: {str(e)}")
+    
     def disconnect(self):
-        """Close database connection"""
+        """Close database connection (a pooled session goes back to its pool)"""
         try:
             if self.cursor:
                 self.cursor.close()
-            if self.connection:
-                self.connection.close()
+        except:
+            pass
+        connection, self.connection, self.cursor = self.connection, None, None
+        self._collection_type = None
+        if connection is None:
+            return
+        if self.pool is not None:
+            self.pool.release(connection)
+            return
+        try:
+            connection.close()
             print("✓ Oracle connection closed")
         except:
             pass
     
+    def set_call_timeout(self, timeout: float):
+        """Limit each database round trip to `timeout` seconds (cx_Oracle callTimeout)"""
+        if self.connection:
+            self.connection.callTimeout = max(1, int(timeout * 1000))
+    
+    def cancel(self):
+        """
+        Interrupt the statement currently running on this connection
+        Safe to call from another thread; the blocked call raises ORA-01013
+        """
+        try:
+            if self.connection:
+                self.connection.cancel()
+        except Exception:
+            pass
+    
     def test_connection(self) -> Dict[str, Any]:
         """Test if connection is active"""
         try:
@@ -90,49 +198,45 @@ class OracleMCPServer:
     # GENERIC QUERY OPERATIONS
     # ========================================================================
     
-    def execute_query(self, sql: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+    def execute_query(self, sql: str, params: Optional[Dict] = None, fetch_size: Optional[int] = None,
+                      max_rows: Optional[int] = None, max_bytes: Optional[int] = None,
+                      result_format: str = "rows") -> Dict[str, Any]:
         """
         Execute a SQL query and return results
         
         Args:
             sql: SQL query string
             params: Optional parameters for query
+            fetch_size: Rows per round trip (default ORACLE_FETCH_SIZE)
+            max_rows / max_bytes: Stop fetching once reached (default ORACLE_QUERY_MAX_*; 0 = no limit)
+            result_format: "rows" - "data" is a list of row dicts;
+                           "columnar" - "column_data" maps each column to its list of values;
+                           "numpy" - as columnar, with numeric columns as NumPy arrays
             
         Returns:
-            Dictionary with results and metadata
+            Dictionary with results and metadata ("truncated" names the limit that cut it short)
         """
+        if result_format not in RESULT_FORMATS:
+            return {"success": False, "error": f"Unknown result_format '{result_format}'", "sql": sql}
+        if result_format == "numpy" and numpy is None:
+            return {"success": False, "error": "result_format 'numpy' needs numpy installed", "sql": sql}
+        
         try:
-            if params:
-                self.cursor.execute(sql, params)
+            if result_format == "rows":
+                columns, results = [], []
+                for columns, rows in self.iter_query(sql, params, fetch_size, max_rows, max_bytes):
+                    results.extend(rows)
+                result = {
+                    "success": True,
+                    "row_count": len(results),
+                    "columns": columns or self.last_fetch.get("columns", []),
+                    "data": results
+                }
             else:
-                self.cursor.execute(sql)
-            
-            # Get column names
-            columns = [desc[0] for desc in self.cursor.description] if self.cursor.description else []
-            
-            # Fetch results
-            rows = self.cursor.fetchall()
-            
-            # Convert to list of dictionaries
-            results = []
-            for row in rows:
-                row_dict = {}
-                for i, col in enumerate(columns):
-                    # Convert Oracle types to JSON-serializable types
-                    value = row[i]
-                    if isinstance(value, datetime):
-                        value = value.isoformat()
-                    elif isinstance(value, (cx_Oracle.LOB, cx_Oracle.CLOB)):
-                        value = value.read()
-                    row_dict[col] = value
-                results.append(row_dict)
-            
-            return {
-                "success": True,
-                "row_count": len(results),
-                "columns": columns,
-                "data": results
-            }
+                result = self._execute_columnar(sql, params, fetch_size, max_rows, max_bytes, result_format)
+            if self.last_fetch.get("truncated"):
+                result["truncated"] = self.last_fetch["truncated"]
+            return result
             
         except cx_Oracle.Error as e:
             error_obj, = e.args
@@ -148,6 +252,155 @@ class OracleMCPServer:
                 "sql": sql
             }
     
+    def _execute_columnar(self, sql: str, params: Optional[Dict], fetch_size: Optional[int],
+                          max_rows: Optional[int], max_bytes: Optional[int], result_format: str) -> Dict[str, Any]:
+        """execute_query() body for the columnar formats"""
+        column_data: Dict[str, List[Any]] = {}
+        for _, batch in self.iter_query(sql, params, fetch_size, max_rows, max_bytes, columnar=True):
+            for column, values in batch.items():
+                column_data.setdefault(column, []).extend(values)
+        columns = self.last_fetch.get("columns", [])
+        column_data = column_data or {column: [] for column in columns}
+        
+        if result_format == "numpy":
+            for column, values in column_data.items():
+                array = _numeric_array(values)
+                if array is not None:
+                    column_data[column] = array
+        
+        return {
+            "success": True,
+            "row_count": self.last_fetch.get("row_count", 0),
+            "columns": columns,
+            "format": result_format,
+            "column_data": column_data
+        }
+    
+    def iter_query(self, sql: str, params: Optional[Dict] = None, batch_size: Optional[int] = None,
+                   max_rows: Optional[int] = None, max_bytes: Optional[int] = None,
+                   columnar: bool = False) -> Iterator[Tuple[List[str], Any]]:
+        """
+        Execute a SQL query and yield results in batches instead of fetchall()
+        
+        Args:
+            sql: SQL query string
+            params: Optional parameters for query
+            batch_size: Rows per fetchmany() round trip (cursor arraysize / prefetchrows)
+            max_rows: Stop after this many rows (the last batch is cut to fit)
+            max_bytes: Stop once the rows fetched so far reach about this many bytes
+            columnar: Yield each batch as {column: [values]} instead of row dicts
+            
+        Yields:
+            (columns, rows) tuples, rows converted like execute_query
+            
+        Raises:
+            cx_Oracle.Error: on query failure (the caller owns error reporting)
+        
+        Afterwards last_fetch holds the columns, row/batch counts, estimated
+        bytes (counted only under max_bytes) and "truncated" ("max_rows" /
+        "max_bytes", or None).
+        """
+        batch_size = max(1, int(batch_size or settings.ORACLE_FETCH_SIZE))
+        max_rows = settings.ORACLE_QUERY_MAX_ROWS if max_rows is None else max_rows
+        max_bytes = settings.ORACLE_QUERY_MAX_BYTES if max_bytes is None else max_bytes
+        
+        self.cursor.arraysize = batch_size
+        if hasattr(self.cursor, "prefetchrows"):
+            # Rows come back with the execute round trip (+1 so a last short batch needs no extra fetch)
+            self.cursor.prefetchrows = batch_size + 1
+        if params:
+            self.cursor.execute(sql, params)
+        else:
+            self.cursor.execute(sql)
+        
+        columns = [desc[0] for desc in self.cursor.description] if self.cursor.description else []
+        fetch = self.last_fetch = {"columns": columns, "row_count": 0, "batch_count": 0, "bytes": 0, "truncated": None}
+        
+        while True:
+            size = batch_size
+            if max_rows:
+                size = min(size, max_rows - fetch["row_count"])
+                if size <= 0:
+                    fetch["truncated"] = "max_rows"
+                    break
+            rows = self.cursor.fetchmany(size)
+            if not rows:
+                break
+            
+            if columnar:
+                batch = self._rows_to_columns(columns, rows)
+                if max_bytes:
+                    fetch["bytes"] += sum(self._values_bytes(values) for values in batch.values())
+            else:
+                batch = [self._row_to_dict(columns, row) for row in rows]
+                if max_bytes:
+                    fetch["bytes"] += sum(self._values_bytes(row.values()) for row in batch)
+            fetch["row_count"] += len(rows)
+            fetch["batch_count"] += 1
+            yield columns, batch
+            
+            if max_bytes and fetch["bytes"] >= max_bytes:
+                fetch["truncated"] = "max_bytes"
+                break
+        
+        if fetch["truncated"]:
+            # Drop the rest of the result set instead of leaving it open on the session
+            try:
+                self.cursor.close()
+            except Exception:
+                pass
+            self.cursor = self.connection.cursor()
+    
+    async def aiter_query(self, sql: str, params: Optional[Dict] = None, batch_size: Optional[int] = None,
+                          max_rows: Optional[int] = None, max_bytes: Optional[int] = None,
+                          columnar: bool = False, executor=None) -> AsyncIterator[Tuple[List[str], Any]]:
+        """
+        Async generator over iter_query(); each blocking fetch runs in `executor`
+        (the loop's default executor if None), so the event loop never waits on Oracle
+        """
+        loop = asyncio.get_running_loop()
+        batches = self.iter_query(sql, params, batch_size, max_rows, max_bytes, columnar)
+        done = object()
+        try:
+            while True:
+                batch = await loop.run_in_executor(executor, next, batches, done)
+                if batch is done:
+                    break
+                yield batch
+        finally:
+            batches.close()
+    
+    @staticmethod
+    def _values_bytes(values) -> int:
+        """Rough size of converted values (text / binary length, 8 bytes per other value)"""
+        return sum(len(value) if isinstance(value, (str, bytes)) else 8 for value in values)
+    
+    @staticmethod
+    def _rows_to_columns(columns: List[str], rows: List[Tuple]) -> Dict[str, List[Any]]:
+        """Transpose a fetched batch into per-column lists, converted like _row_to_dict"""
+        result = {}
+        for column, values in zip(columns, zip(*rows)):
+            sample = next((value for value in values if value is not None), None)
+            if isinstance(sample, datetime):
+                values = [None if value is None else value.isoformat() for value in values]
+            elif isinstance(sample, cx_Oracle.LOB):
+                values = [None if value is None else value.read() for value in values]
+            result[column] = list(values)
+        return result
+    
+    @staticmethod
+    def _row_to_dict(columns: List[str], row: Tuple) -> Dict[str, Any]:
+        """Convert Oracle types to JSON-serializable types"""
+        row_dict = {}
+        for i, col in enumerate(columns):
+            value = row[i]
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif isinstance(value, cx_Oracle.LOB):
+                value = value.read()
+            row_dict[col] = value
+        return row_dict
+    
     def execute_dml(self, sql: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Execute DML (INSERT, UPDATE, DELETE) and commit
@@ -189,6 +442,85 @@ class OracleMCPServer:
                 "sql": sql
             }
     
+    def execute_dml_batch(self, sql: str, rows: List[Dict[str, Any]], chunk_size: Optional[int] = None,
+                          input_sizes: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Execute one DML statement for many bind rows (executemany with batcherrors)
+        
+        Each chunk of chunk_size rows (default ORACLE_DML_BATCH_SIZE) is one round
+        trip and one commit. Rows Oracle rejects are reported by index while the
+        rest of their chunk is committed; a chunk that fails as a whole is rolled
+        back and ends the batch (earlier chunks stay committed).
+        
+        Args:
+            sql: DML statement with named binds
+            rows: One bind dictionary per row
+            chunk_size: Rows per executemany() / commit
+            input_sizes: Optional cursor.setinputsizes() arguments (e.g. for mostly-NULL columns)
+            
+        Returns:
+            Dictionary with rows_affected, failed_rows ({index, code, error, row}) and
+            unmatched (indexes of rows that affected nothing)
+        """
+        chunk_size = max(1, int(chunk_size or settings.ORACLE_DML_BATCH_SIZE))
+        rows_affected = 0
+        committed = 0
+        failed_rows = []
+        unmatched = []
+        
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                if input_sizes:
+                    self.cursor.setinputsizes(**input_sizes)
+                self.cursor.executemany(sql, chunk, batcherrors=True, arraydmlrowcounts=True)
+                errors = self.cursor.getbatcherrors()
+                counts = self.cursor.getarraydmlrowcounts()
+                self.connection.commit()
+            except Exception as e:
+                try:
+                    self.connection.rollback()
+                except Exception:
+                    pass
+                message = e.args[0].message if isinstance(e, cx_Oracle.Error) else str(e)
+                return {
+                    "success": False,
+                    "error": f"Chunk at row {start} failed: {message}",
+                    "rows": len(rows),
+                    "rows_committed": committed,
+                    "rows_affected": rows_affected,
+                    "failed_rows": failed_rows,
+                    "unmatched": unmatched,
+                    "sql": sql
+                }
+            
+            rejected = set()
+            for error in errors:
+                rejected.add(error.offset)
+                failed_rows.append({
+                    "index": start + error.offset,
+                    "code": error.code,
+                    "error": error.message.strip(),
+                    "row": chunk[error.offset]
+                })
+            unmatched.extend(start + i for i, count in enumerate(counts) if not count and i not in rejected)
+            rows_affected += sum(counts)
+            committed += len(chunk) - len(rejected)
+        
+        result = {
+            "success": not failed_rows,
+            "rows": len(rows),
+            "rows_committed": committed,
+            "rows_affected": rows_affected,
+            "chunks": -(-len(rows) // chunk_size),
+            "failed_rows": failed_rows,
+            "unmatched": unmatched,
+            "message": f"Batch DML executed, {rows_affected} rows affected, {len(failed_rows)} of {len(rows)} rows failed"
+        }
+        if failed_rows:
+            result["error"] = f"{len(failed_rows)} of {len(rows)} rows failed"
+        return result
+    
     # ========================================================================
     # PRICING-SPECIFIC OPERATIONS
     # ========================================================================
@@ -233,6 +565,75 @@ class OracleMCPServer:
                 "message": "CUSIP not found in pricing master table"
             }
     
+    def check_pricing_status_bulk(self, cusips: List[str], chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Latest pricing status for many CUSIPs in a few round trips
+        
+        The CUSIPs go in as one array-bound collection (ORACLE_BULK_COLLECTION_TYPE,
+        up to 32767 per query); without that type, as IN-lists of up to 1000 binds.
+        
+        Returns:
+            {"columns": [...], "statuses": {cusip: [values in column order]},
+             "missing": [cusips without a row], ...}; pricing_status_entry() expands one CUSIP
+        """
+        unique_cusips = [str(cusip) for cusip in dict.fromkeys(cusips)]
+        collection = self._bulk_collection_type()
+        limit = ARRAY_BIND_LIMIT if collection else IN_LIST_LIMIT
+        chunk_size = min(chunk_size or limit, limit)
+        
+        statuses = {}
+        round_trips = 1 if collection else 0  # gettype()
+        for start in range(0, len(unique_cusips), chunk_size):
+            chunk = unique_cusips[start:start + chunk_size]
+            if collection:
+                binds = {"cusips": collection.newobject()}
+                binds["cusips"].extend(chunk)
+                source = "SELECT column_value FROM TABLE(:cusips)"
+            else:
+                binds = {f"c{i}": cusip for i, cusip in enumerate(chunk)}
+                source = ', '.join(':' + name for name in binds)
+            sql = f"""
+                SELECT cusip, {', '.join(STATUS_COLUMNS)}
+                FROM (
+                    SELECT p.*,
+                           ROW_NUMBER() OVER (PARTITION BY cusip ORDER BY pricing_date DESC) AS rn
+                    FROM pricing_master p
+                    WHERE cusip IN ({source})
+                )
+                WHERE rn = 1
+            """
+            
+            # Everything comes back with the execute (prefetch), and no query limit applies
+            result = self.execute_query(sql, binds, fetch_size=len(chunk), max_rows=0, max_bytes=0)
+            round_trips += max(1, self.last_fetch.get("batch_count", 0))
+            if not result["success"]:
+                return {"success": False, "error": result["error"], "resolved": len(statuses)}
+            
+            for row in result["data"]:
+                statuses[row["CUSIP"]] = [row.get(column) for column in STATUS_COLUMNS]
+        
+        return {
+            "success": True,
+            "requested": len(unique_cusips),
+            "found": len(statuses),
+            "columns": STATUS_COLUMNS,
+            "statuses": statuses,
+            "missing": [cusip for cusip in unique_cusips if cusip not in statuses],
+            "bind_mode": "array" if collection else "in_list",
+            "round_trips": round_trips
+        }
+    
+    def _bulk_collection_type(self):
+        """Object type for array-binding CUSIPs, None to fall back to IN-lists"""
+        if self._collection_type is None:
+            self._collection_type = False
+            if settings.ORACLE_BULK_COLLECTION_TYPE:
+                try:
+                    self._collection_type = self.connection.gettype(settings.ORACLE_BULK_COLLECTION_TYPE)
+                except Exception as e:
+                    print(f"✗ Array binds unavailable ({settings.ORACLE_BULK_COLLECTION_TYPE}: {e}), using IN-lists")
+        return self._collection_type or None
+    
     def get_failed_pricings(self, date: Optional[str] = None) -> Dict[str, Any]:
         """
         Get all failed pricings for a specific date
@@ -309,6 +710,31 @@ class OracleMCPServer:
         
         return self.execute_dml(sql, params)
     
+    def update_pricing_status_bulk(self, updates: List[Dict[str, Any]], chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Update today's pricing status for many CUSIPs in one batch DML
+        
+        Args:
+            updates: [{"cusip", "status", "error_code" (optional, NULL when absent)}]
+            chunk_size: Rows per executemany() / commit
+        """
+        sql = """
+            UPDATE pricing_master
+            SET pricing_status = :status,
+                error_code = :error_code,
+                last_updated = SYSDATE
+            WHERE cusip = :cusip
+              AND TRUNC(pricing_date) = TRUNC(SYSDATE)
+        """
+        rows = [
+            {"cusip": update["cusip"], "status": update["status"], "error_code": update.get("error_code")}
+            for update in updates
+        ]
+        result = self.execute_dml_batch(sql, rows, chunk_size, input_sizes={"error_code": 100})
+        # CUSIPs without a pricing row for today
+        result["unmatched_cusips"] = [rows[i]["cusip"] for i in result["unmatched"]]
+        return result
+    
     def get_table_info(self, table_name: str) -> Dict[str, Any]:
         """Get information about a table's structure"""
         sql = """
@@ -0,0 +1,280 @@
+"""
+Oracle Session Pool - Process-wide pools of open Oracle sessions
+One pool per set of credentials (keyed by their CredentialStore fingerprint),
+so Oracle nodes and connection tests borrow an authenticated session instead
+of paying a TCP + authentication handshake and a probe query every call.
+The driver is any DB-API module with connect() (cx_Oracle by default), so
+the pool can be exercised with a fake driver.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+from config import settings
+from credential_store import credentials_fingerprint
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no session frees up within the checkout timeout"""
+
+
+def _driver():
+    import cx_Oracle
+    return cx_Oracle
+
+
+def open_session(driver, credentials: Dict[str, Any]):
+    """New authenticated connection from a DB-API driver"""
+    dsn = driver.makedsn(
+        credentials['host'],
+        credentials.get('port', 1521),
+        service_name=credentials['service_name']
+    )
+    return driver.connect(
+        user=credentials['username'],
+        password=credentials['password'],
+        dsn=dsn,
+        encoding="UTF-8"
+    )
+
+
+class OracleSessionPool:
+    """
+    Bounded pool of sessions for one set of credentials (thread-safe)
+
+    - min_sessions are kept open (fill() opens them up front)
+    - at most max_sessions exist; further checkouts wait up to checkout_timeout
+    - sessions idle longer than idle_timeout are closed down to min_sessions
+    - a session idle longer than ping_interval is pinged on checkout and
+      replaced if the ping fails; release() rolls back, and a session that
+      cannot is dropped
+    """
+
+    def __init__(self, credentials: Dict[str, Any], driver=None,
+                 min_sessions: Optional[int] = None, max_sessions: Optional[int] = None,
+                 idle_timeout: Optional[float] = None, ping_interval: Optional[float] = None,
+                 checkout_timeout: Optional[float] = None):
+        self.credentials = credentials
+        self.driver = driver
+        self.min_sessions = settings.ORACLE_POOL_MIN if min_sessions is None else min_sessions
+        self.max_sessions = max(1, settings.ORACLE_POOL_MAX if max_sessions is None else max_sessions)
+        self.idle_timeout = settings.ORACLE_POOL_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.ping_interval = settings.ORACLE_POOL_PING_INTERVAL if ping_interval is None else ping_interval
+        self.checkout_timeout = settings.ORACLE_POOL_CHECKOUT_TIMEOUT if checkout_timeout is None else checkout_timeout
+        self.target = f"{credentials.get('host')}:{credentials.get('port', 1521)}/{credentials.get('service_name')}"
+
+        self._idle = deque()  # (connection, released_at), most recently used on the right
+        self._size = 0  # open sessions, idle + checked out + being opened
+        self._cond = threading.Condition()
+        self.stats = {
+            'created': 0,
+            'closed': 0,
+            'checkouts': 0,
+            'reused': 0,
+            'waits': 0,
+            'total_wait_ms': 0.0,
+            'health_check_failures': 0,
+            'idle_closed': 0,
+            'release_failures': 0,
+            'exhausted': 0,
+            'connect_failures': 0,
+            'peak_in_use': 0
+        }
+
+    def _new_session(self):
+        """Open a session for a slot already counted in _size"""
+        try:
+            connection = open_session(self.driver or _driver(), self.credentials)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self.stats['connect_failures'] += 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.stats['created'] += 1
+        return connection
+
+    def _close(self, connection, reason: str):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self.stats['closed'] += 1
+            if reason == "idle":
+                self.stats['idle_closed'] += 1
+            elif reason == "health":
+                self.stats['health_check_failures'] += 1
+            elif reason == "release":
+                self.stats['release_failures'] += 1
+            self._cond.notify()
+
+    def _healthy(self, connection) -> bool:
+        try:
+            if hasattr(connection, "ping"):
+                connection.ping()
+            else:
+                cursor = connection.cursor()
+                cursor.execute("SELECT 1 FROM DUAL")
+                cursor.fetchone()
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _expired_idle(self) -> list:
+        """Pop sessions past idle_timeout beyond min_sessions (caller holds the lock)"""
+        expired = []
+        cutoff = time.time() - self.idle_timeout
+        while self._idle and self._idle[0][1] < cutoff and self._size - len(expired) > self.min_sessions:
+            expired.append(self._idle.popleft()[0])
+        return expired
+
+    def acquire(self):
+        """
+        Check out a healthy session
+
+        Raises:
+            PoolExhaustedError: if none frees up within checkout_timeout
+            driver errors: if a new session cannot be opened
+        """
+        started = time.perf_counter()
+        deadline = started + self.checkout_timeout
+        waited = False
+        while True:
+            with self._cond:
+                expired = self._expired_idle()
+                while not self._idle and self._size >= self.max_sessions:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        self.stats['exhausted'] += 1
+                        raise PoolExhaustedError(
+                            f"No Oracle session free for {self.target} within {self.checkout_timeout}s "
+                            f"({self.max_sessions} in use)"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    connection, released_at = self._idle.pop()
+                    opened = False
+                else:
+                    connection, released_at = None, None
+                    self._size += 1
+                    opened = True
+
+            for stale in expired:
+                self._close(stale, "idle")
+
+            if opened:
+                connection = self._new_session()
+            elif time.time() - released_at >= self.ping_interval and not self._healthy(connection):
+                self._close(connection, "health")
+                continue
+
+            with self._cond:
+                self.stats['checkouts'] += 1
+                self.stats['reused'] += not opened
+                if waited:
+                    self.stats['waits'] += 1
+                    self.stats['total_wait_ms'] += (time.perf_counter() - started) * 1000
+                self.stats['peak_in_use'] = max(self.stats['peak_in_use'], self._size - len(self._idle))
+            return connection
+
+    def release(self, connection):
+        """Return a session; its open transaction (if any) is rolled back"""
+        try:
+            connection.rollback()
+            if hasattr(connection, "callTimeout"):
+                connection.callTimeout = 0
+        except Exception:
+            self._close(connection, "release")
+            return
+
+        with self._cond:
+            self._idle.append((connection, time.time()))
+            expired = self._expired_idle()
+            self._cond.notify()
+        for stale in expired:
+            self._close(stale, "idle")
+
+    def fill(self) -> int:
+        """Open sessions up to min_sessions; returns how many were opened"""
+        opened = []
+        try:
+            while True:
+                with self._cond:
+                    if self._size >= max(self.min_sessions, 1) or self._size >= self.max_sessions:
+                        break
+                    self._size += 1
+                opened.append(self._new_session())
+        finally:
+            for connection in opened:
+                self.release(connection)
+        return len(opened)
+
+    def close(self):
+        """Close the idle sessions (checked-out ones close on release)"""
+        with self._cond:
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self.min_sessions = 0
+            self.idle_timeout = 0
+        for connection in idle:
+            self._close(connection, "shutdown")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self.stats)
+            idle, size = len(self._idle), self._size
+        return {
+            **stats,
+            'target': self.target,
+            'min_sessions': self.min_sessions,
+            'max_sessions': self.max_sessions,
+            'open': size,
+            'idle': idle,
+            'in_use': size - idle,
+            'reuse_rate': round(stats['reused'] / stats['checkouts'], 3) if stats['checkouts'] else 0.0,
+            'average_wait_ms': round(stats['total_wait_ms'] / stats['waits'], 2) if stats['waits'] else 0.0
+        }
+
+
+class OracleSessionPoolManager:
+    """Process-wide registry: one OracleSessionPool per credentials fingerprint"""
+
+    def __init__(self, driver=None):
+        self.driver = driver
+        self.pools: Dict[str, OracleSessionPool] = {}
+        self._lock = threading.Lock()
+
+    def pool_for(self, credentials: Dict[str, Any]) -> OracleSessionPool:
+        key = credentials_fingerprint(credentials)
+        with self._lock:
+            pool = self.pools.get(key)
+            if pool is None:
+                pool = self.pools[key] = OracleSessionPool(credentials, self.driver)
+            return pool
+
+    def session(self, credentials: Dict[str, Any]) -> Tuple[OracleSessionPool, Any]:
+        """Check out a session: (pool to release it to, connection)"""
+        pool = self.pool_for(credentials)
+        return pool, pool.acquire()
+
+    def close_all(self):
+        with self._lock:
+            pools = list(self.pools.values())
+        for pool in pools:
+            pool.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pools = dict(self.pools)
+        return {key[:12]: pool.get_stats() for key, pool in pools.items()}
+
+
+# Global session pool manager instance
+oracle_pools = OracleSessionPoolManager()
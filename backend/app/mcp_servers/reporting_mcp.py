@@ -0,0 +1,316 @@
+"""
+Reporting MCP Server - CSV / Excel report files built from row batches
+Rows are rendered batch by batch and appended to a file on disk, so a report
+of any size costs one batch of memory. XLSX is written as a streamed zip
+(inline strings, a new sheet every XLSX_MAX_ROWS rows) without openpyxl.
+"""
+
+import csv
+import io
+import math
+import os
+import re
+import shutil
+import time
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple, Iterator
+from xml.sax.saxutils import escape
+
+
+REPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+# Excel's row limit per sheet, header row included
+XLSX_MAX_ROWS = 1048576
+
+# Control characters XML 1.0 cannot carry
+ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+SHEET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_FOOTER = '</sheetData></worksheet>'
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _row_values(row: Any, columns: List[str]) -> List[Any]:
+    if isinstance(row, dict):
+        return [row.get(column) for column in columns]
+    return list(row)
+
+
+def _xlsx_cell(value: Any) -> str:
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, Decimal)) or (isinstance(value, float) and math.isfinite(value)):
+        return f'<c><v>{value}</v></c>'
+    text = escape(ILLEGAL_XML_CHARS.sub("", _text(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def render_rows(fmt: str, columns: List[str], rows: List[Any], first_row: int = 1) -> bytes:
+    """
+    Encode rows (dicts keyed by column, or value lists) for one report format
+
+    CSV gives plain lines; XLSX gives <row> elements numbered from first_row
+    (1-based, within the current sheet). Pure function, so large XLSX batches
+    can be rendered in the CPU process pool.
+    """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if value is None else _text(value) for value in _row_values(row, columns)])
+        return buffer.getvalue().encode("utf-8")
+
+    parts = []
+    for offset, row in enumerate(rows):
+        cells = "".join(_xlsx_cell(value) for value in _row_values(row, columns))
+        parts.append(f'<row r="{first_row + offset}">{cells}</row>')
+    return "".join(parts).encode("utf-8")
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) inclusive for a single "bytes=" Range header, None to send it all
+
+    Raises:
+        ValueError: if the range cannot be satisfied (respond 416)
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        return None  # multipart ranges are not supported - send the whole file
+    first, _, last = spec.partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start, end = max(0, size - int(last)), size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise ValueError(f"Range {header} not satisfiable for {size} bytes")
+    return start, end
+
+
+def iter_file_range(path: str, start: int, end: int, chunk_size: int = 65536) -> Iterator[bytes]:
+    """Bytes [start, end] of a file in chunks"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class ReportWriter:
+    """
+    One report file being written (blocking - runs in the report pool)
+
+    Data goes to {path}.part and is renamed into place by close(), so a
+    download never sees a half-written report.
+    """
+
+    def __init__(self, path: str, fmt: str, columns: List[str], sheet_name: str = "Report"):
+        self.path = path
+        self.fmt = fmt
+        self.columns = columns
+        self.sheet_name = re.sub(r"[\[\]:*?/\\]", "_", sheet_name)[:28] or "Report"
+        self.row_count = 0
+        self.sheets = 0
+        self._sheet_rows = 0
+        self._sheet = None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if fmt == "csv":
+            self._file = open(path + ".part", "wb")
+            self._file.write(render_rows("csv", columns, [columns]))
+            self.sheets = 1
+        else:
+            self._zip = zipfile.ZipFile(path + ".part", "w", zipfile.ZIP_DEFLATED, allowZip64=True)
+            self._begin_sheet()
+
+    def pieces(self, rows: List[Any]) -> List[Tuple[List[Any], int]]:
+        """Split a batch at sheet boundaries: (rows, first row number in its sheet)"""
+        if self.fmt == "csv":
+            return [(rows, self.row_count + 2)]
+        result = []
+        used = self._sheet_rows
+        while rows:
+            if used >= XLSX_MAX_ROWS:
+                used = 1
+            take = rows[:XLSX_MAX_ROWS - used]
+            result.append((take, used + 1))
+            used += len(take)
+            rows = rows[len(take):]
+        return result
+
+    def write_rows(self, rows: List[Any], first_row: int):
+        """Render and append one piece in the calling thread"""
+        self.append(render_rows(self.fmt, self.columns, rows, first_row), len(rows))
+
+    def append(self, chunk: bytes, count: int):
+        """Write one rendered piece (from pieces(), in order)"""
+        if self.fmt == "csv":
+            self._file.write(chunk)
+        else:
+            if self._sheet_rows >= XLSX_MAX_ROWS:
+                self._end_sheet()
+                self._begin_sheet()
+            self._sheet.write(chunk)
+            self._sheet_rows += count
+        self.row_count += count
+
+    def _begin_sheet(self):
+        self.sheets += 1
+        self._sheet = self._zip.open(f"xl/worksheets/sheet{self.sheets}.xml", "w", force_zip64=True)
+        self._sheet.write(SHEET_HEADER.encode("utf-8"))
+        self._sheet.write(render_rows("xlsx", self.columns, [self.columns], 1))
+        self._sheet_rows = 1
+
+    def _end_sheet(self):
+        self._sheet.write(SHEET_FOOTER.encode("utf-8"))
+        self._sheet.close()
+        self._sheet = None
+
+    def _write_workbook(self):
+        names = [self.sheet_name if self.sheets == 1 else f"{self.sheet_name} {n}" for n in range(1, self.sheets + 1)]
+        sheets = "".join(
+            f'<sheet name="{escape(name)}" sheetId="{n}" r:id="rId{n}"/>' for n, name in enumerate(names, 1)
+        )
+        relations = "".join(
+            f'<Relationship Id="rId{n}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{n}.xml"/>' for n in range(1, self.sheets + 1)
+        )
+        overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{n}.xml" '
+            f'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for n in range(1, self.sheets + 1)
+        )
+        xml = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        self._zip.writestr("[Content_Types].xml", xml + (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            f'{overrides}</Types>'
+        ))
+        self._zip.writestr("_rels/.rels", xml + (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>'
+        ))
+        self._zip.writestr("xl/workbook.xml", xml + (
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets}</sheets></workbook>'
+        ))
+        self._zip.writestr("xl/_rels/workbook.xml.rels", xml + (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{relations}</Relationships>'
+        ))
+
+    def close(self) -> Dict[str, Any]:
+        """Finish the file and move it into place"""
+        if self.fmt == "csv":
+            self._file.close()
+        else:
+            self._end_sheet()
+            self._write_workbook()
+            self._zip.close()
+        os.replace(self.path + ".part", self.path)
+        return {
+            "format": self.fmt,
+            "row_count": self.row_count,
+            "sheets": self.sheets,
+            "size_bytes": os.path.getsize(self.path)
+        }
+
+    def abort(self):
+        """Drop a report that will not be finished"""
+        try:
+            if self.fmt == "csv":
+                self._file.close()
+            else:
+                if self._sheet is not None:
+                    self._sheet.close()
+                self._zip.close()
+        except Exception:
+            pass
+        try:
+            os.remove(self.path + ".part")
+        except FileNotFoundError:
+            pass
+
+
+class ReportingMCPServer:
+    """Report files under {root}/{execution_id}/{node_id}.{csv|xlsx}"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.stats = {
+            'reports': 0,
+            'rows': 0,
+            'bytes': 0,
+            'failed': 0
+        }
+        print("✓ Reporting MCP Server initialized")
+
+    def path_for(self, execution_id: str, node_id: str, fmt: str) -> str:
+        safe = lambda value: re.sub(r"[^A-Za-z0-9_.-]", "_", value)
+        return os.path.join(self.root, safe(execution_id), f"{safe(node_id)}.{fmt}")
+
+    def open_report(self, execution_id: str, node_id: str, fmt: str, columns: List[str],
+                    sheet_name: str = "Report") -> ReportWriter:
+        """
+        Raises:
+            ValueError: for an unknown format
+        """
+        if fmt not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported report format '{fmt}' (use {', '.join(REPORT_FORMATS)})")
+        return ReportWriter(self.path_for(execution_id, node_id, fmt), fmt, columns, sheet_name)
+
+    def record(self, summary: Optional[Dict[str, Any]]):
+        """Count a finished (summary) or failed (None) report"""
+        if summary is None:
+            self.stats['failed'] += 1
+            return
+        self.stats['reports'] += 1
+        self.stats['rows'] += summary["row_count"]
+        self.stats['bytes'] += summary["size_bytes"]
+
+    def cleanup(self, max_age: int) -> int:
+        """Delete execution report directories older than max_age seconds"""
+        if not os.path.isdir(self.root):
+            return 0
+        cutoff = time.time() - max_age
+        removed = 0
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'root': self.root}
@@ -15,6 +15,8 @@ class UnixMCPServer:
         self.ssh_client = None
         self.sftp_client = None
         self.credentials = None
+        self.command_timeout = 30
+        self.active_channel = None
         print("✓ Unix MCP Server initialized")
     
     def connect(self, credentials: Dict[str, str]) -> Tuple[bool, str]:
@@ -89,6 +91,19 @@ class UnixMCPServer:
         except:
             pass
     
+    def cancel(self):
+        """
+        Interrupt the running command by closing its channel and the transport
+        Safe to call from another thread; the blocked read returns immediately
+        """
+        try:
+            if self.active_channel:
+                self.active_channel.close()
+            if self.ssh_client:
+                self.ssh_client.close()
+        except Exception:
+            pass
+    
     def test_connection(self) -> Dict[str, Any]:
         """Test if SSH connection is active"""
         try:
@@ -110,11 +125,23 @@ class UnixMCPServer:
         except Exception as e:
             return {"success": False, "message": f"Connection test failed: {str(e)}"}
     
-    def execute_command(self, command: str, timeout: int = 30) -> Dict[str, Any]:
-        """Execute a shell command"""
+    def execute_command(self, command: str, timeout: Optional[int] = None) -> Dict[str, Any]:
+        """Execute a shell command (defaults to self.command_timeout seconds)"""
+        timeout = timeout or self.command_timeout
         try:
             stdin, stdout, stderr = self.ssh_client.exec_command(command, timeout=timeout)
-            exit_code = stdout.channel.recv_exit_status()
+            self.active_channel = stdout.channel
+            
+            if not self.active_channel.status_event.wait(timeout):
+                self.active_channel.close()
+                return {
+                    "success": False,
+                    "exit_code": -1,
+                    "error": f"Command timed out after {timeout}s",
+                    "command": command
+                }
+            
+            exit_code = self.active_channel.recv_exit_status()
             output = stdout.read().decode()
             error = stderr.read().decode()
             
@@ -131,6 +158,8 @@ class UnixMCPServer:
                 "error": str(e),
                 "command": command
             }
+        finally:
+            self.active_channel = None
     
     def tail_file(self, remote_path: str, lines: int = 100) -> Dict[str, Any]:
         """Read last N lines of a file"""
@@ -123,6 +123,9 @@ class OracleQuery(BaseModel):
     sql: str
     parameters: Dict[str, Any] = {}
     fetch_size: int = 100
+    max_rows: Optional[int] = None
+    max_bytes: Optional[int] = None
+    result_format: Literal["rows", "columnar", "numpy"] = "rows"
 
 class OracleQueryResult(BaseModel):
     columns: List[str]
@@ -130,6 +133,12 @@ class OracleQueryResult(BaseModel):
     row_count: int
     execution_time: float
 
+class OracleColumnarResult(BaseModel):
+    columns: List[str]
+    column_data: Dict[str, List[Any]]
+    row_count: int
+    execution_time: float
+
 # Unix Command Models
 class UnixCommand(BaseModel):
     command: str
@@ -3,14 +3,34 @@ Workflow Orchestrator - Coordinates workflow execution
 """
 
 import asyncio
+import functools
 import hashlib
 import json
-from typing import Dict, Any, List
+import os
+import uuid
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from datetime import datetime
 import aiohttp
 
-from mcp_servers.oracle_mcp import OracleMCPServer
+from mcp_servers.oracle_mcp import OracleMCPServer, pricing_status_entry
+from mcp_servers.oracle_pool import oracle_pools, PoolExhaustedError
 from mcp_servers.unix_mcp import UnixMCPServer
+from mcp_servers.reporting_mcp import ReportingMCPServer, REPORT_FORMATS, render_rows
+from workflow.executor import WorkflowGraph, DAGExecutor
+from workflow.pools import executor_pools
+from workflow.control import ExecutionHandle, interrupt_key
+from workflow.memo import NodeResultCache
+from workflow.engine import PlanCache, NOOP_TYPE, sql_bind_names, command_placeholders, render_command
+from workflow.conditions import ConditionError, evaluate_condition
+from workflow.streams import RowStream, RowStreamReader, StreamAborted
+from workflow.spill import ResultSpillStore
+from workflow.resilience import ResilienceLayer, target_for
+from workflow.tracing import Tracer, span
+from workflow.estimator import DurationHistograms, DurationEstimator
+from config import settings
+
+# Per-item marker for map children whose every input branch was not taken
+SKIPPED_ITEM = {"skipped": True, "reason": "branch not taken"}
 
 
 class WorkflowOrchestrator:
@@ -18,6 +38,14 @@ class WorkflowOrchestrator:
         self.cache_manager = cache_manager
         self.credential_store = credential_store
         self.llm_endpoint = llm_endpoint
+        self.node_cache = NodeResultCache(cache_manager)
+        self.plans = PlanCache(cache_manager)
+        self.spill = ResultSpillStore(cache_manager)
+        self.resilience = ResilienceLayer(cache_manager)
+        self.tracer = Tracer(cache_manager)
+        self.reports = ReportingMCPServer(settings.REPORT_DIR)
+        self.durations = DurationHistograms(cache_manager)
+        self.estimator = DurationEstimator(self.durations, self.plans, credential_store, llm_endpoint)
         print("✓ Workflow Orchestrator initialized")
     
     async def test_connection(self, node_id: str, credentials: Dict[str, str]) -> Dict[str, Any]:
@@ -31,22 +59,10 @@ class WorkflowOrchestrator:
         
         try:
             if node_type == "oracle":
-                mcp = OracleMCPServer()
-                success, message = mcp.connect(creds)
-                if success:
-                    result = mcp.test_connection()
-                    mcp.disconnect()
-                    return result
-                return {"success": False, "message": message}
+                return await executor_pools.run("oracle", self._test_oracle_connection, creds)
             
             elif node_type == "unix":
-                mcp = UnixMCPServer()
-                success, message = mcp.connect(creds)
-                if success:
-                    result = mcp.test_connection()
-                    mcp.disconnect()
-                    return result
-                return {"success": False, "message": message}
+                return await executor_pools.run("unix", self._test_mcp_connection, UnixMCPServer, creds)
             
             else:
                 return {"success": True, "message": "Test not implemented"}
@@ -54,9 +70,75 @@ class WorkflowOrchestrator:
         except Exception as e:
             return {"success": False, "message": str(e)}
     
-    async def execute_workflow(self, workflow_id: str, input_data: Dict[str, Any], execution_id: str, connection_manager):
-        """Execute workflow"""
+    async def prewarm(self, workflow_id: str) -> Dict[str, Any]:
+        """Compile the plan and connect once to each Oracle / SSH target ahead of a scheduled run"""
+        plan = self.plans.get(workflow_id)
+        if plan is None:
+            return {"success": False, "error": "Workflow not found"}
+        
+        targets = {}
+        for node_id, node in plan.nodes.items():
+            cred_data = self.credential_store.get(node_id) if node["type"] in ("oracle", "unix") else None
+            if cred_data:
+                targets.setdefault(target_for(node["type"], cred_data["credentials"]), node_id)
+        
+        results = await asyncio.gather(*[
+            self.test_connection(node_id, None) for node_id in targets.values()
+        ])
+        # Open the Oracle session pools up to their minimum size too
+        for target, node_id in targets.items():
+            if target.startswith("oracle:"):
+                pool = oracle_pools.pool_for(self.credential_store.get(node_id)["credentials"])
+                try:
+                    await executor_pools.run("oracle", pool.fill)
+                except Exception as e:
+                    print(f"✗ Could not fill Oracle session pool for {pool.target}: {e}")
+        warmed = {target: result.get("success", False) for target, result in zip(targets, results)}
+        print(f"✓ Prewarmed workflow {workflow_id} ({sum(warmed.values())}/{len(warmed)} targets reachable)")
+        return {"success": all(warmed.values()), "targets": warmed}
+    
+    @staticmethod
+    def _test_oracle_connection(creds: Dict[str, str]) -> Dict[str, Any]:
+        """Borrow a session from the credentials' pool and test it (blocking - runs in the oracle pool)"""
+        mcp = OracleMCPServer(oracle_pools.pool_for(creds))
+        try:
+            success, message = mcp.connect(creds)
+        except PoolExhaustedError as e:
+            return {"success": False, "message": str(e)}
+        if not success:
+            return {"success": False, "message": message}
+        try:
+            return mcp.test_connection()
+        finally:
+            mcp.disconnect()
+    
+    @staticmethod
+    def _test_mcp_connection(mcp_class, creds: Dict[str, str]) -> Dict[str, Any]:
+        """Connect, test and disconnect (blocking - runs in an executor pool)"""
+        mcp = mcp_class()
+        success, message = mcp.connect(creds)
+        if success:
+            result = mcp.test_connection()
+            mcp.disconnect()
+            return result
+        return {"success": False, "message": message}
+    
+    async def execute_workflow(self, workflow_id: str, input_data: Dict[str, Any], execution_id: str, connection_manager,
+                               handle: Optional[ExecutionHandle] = None, resume: bool = False):
+        """
+        Execute workflow (bounded by WORKFLOW_TIMEOUT, controllable through the handle)
+        
+        Every completed node is checkpointed. With resume=True, nodes whose
+        checkpoint succeeded with the same inputs are restored instead of re-run.
+        """
+        handle = handle or ExecutionHandle(execution_id)
+        trace = self.tracer.start_trace(execution_id, workflow_id=workflow_id, resume=resume)
+        trace_status, trace_error = "completed", None
         try:
+            fields = {"workflow_id": workflow_id, "input_data": input_data}
+            if resume:
+                fields.update({"error": None, "completed_at": None})
+            self.cache_manager.update_execution_fields(execution_id, fields)
             self.cache_manager.update_execution_status(execution_id, status="running", current_step="Starting")
             
             await connection_manager.broadcast({
@@ -65,23 +147,115 @@ class WorkflowOrchestrator:
                 "status": "running"
             })
             
-            workflow = self.cache_manager.get_workflow(workflow_id)
-            if not workflow:
+            plan = self.plans.get(workflow_id)
+            if not plan:
                 raise Exception("Workflow not found")
             
-            # Execute nodes (simplified)
-            results = {}
-            for node in workflow["nodes"]:
-                result = await self._execute_node(node, input_data, results)
-                results[node["id"]] = result
+            # Execute nodes in dependency order, independent branches in parallel
+            graph = plan.graph
+            checkpoints = self.cache_manager.get_node_checkpoints(execution_id) if resume else {}
+            restored_nodes = []
+            node_cache_trace = {}
+            stored_results = {}
+            fingerprints = {}
+            digests = {}  # node_id -> content digest of its result, chained into child fingerprints
+            
+            def store_result(node_id: str, result: Dict):
+                # Large results are written once to the spill store; only the handle is kept
+                stored_results[node_id], digests[node_id] = self.spill.store(execution_id, node_id, result)
+                self.cache_manager.save_node_checkpoint(execution_id, node_id, {
+                    "fingerprint": fingerprints[node_id],
+                    "digest": digests[node_id],
+                    "result": stored_results[node_id]
+                })
+            
+            async def run_node(node: Dict, upstream_results: Dict) -> Dict:
+                with span("node", node_id=node["id"], type=node["type"]) as node_span:
+                    upstream_results, readers = await self._attach_streams(node, upstream_results)
+                    try:
+                        result = await run_attached(node, upstream_results, streamed_input=bool(readers))
+                    finally:
+                        for reader in readers:
+                            reader.release()
+                    node_span.set(
+                        success=result.get("success", True),
+                        rows=self._row_count(result),
+                        streamed_input=bool(readers),
+                        streaming=isinstance(result.get("stream"), RowStream),
+                        restored=node["id"] in restored_nodes,
+                        cache=node_cache_trace.get(node["id"])
+                    )
+                    return result
+            
+            async def run_attached(node: Dict, upstream_results: Dict, streamed_input: bool) -> Dict:
+                # Open streams have no digest yet: their children never match a checkpoint or memo
+                upstream_digests = {
+                    parent: digests.get(parent) or f"unknown:{uuid.uuid4().hex}" for parent in upstream_results
+                }
+                fingerprint = fingerprints[node["id"]] = self._node_fingerprint(node, input_data, upstream_digests)
+                
+                checkpoint = checkpoints.get(node["id"])
+                if checkpoint and checkpoint["fingerprint"] == fingerprint \
+                        and checkpoint["result"].get("success", True):
+                    stored = checkpoint["result"]
+                    result = self.spill.load(execution_id, node["id"]) if self.spill.is_handle(stored) else stored
+                    if result is not None:
+                        stored_results[node["id"]] = stored
+                        if checkpoint.get("digest"):
+                            digests[node["id"]] = checkpoint["digest"]
+                        restored_nodes.append(node["id"])
+                        return result
+                
+                memo_key = None
+                if self.node_cache.enabled_for(node) and not streamed_input:
+                    memo_key = self.node_cache.key_for(
+                        node, input_data, upstream_digests,
+                        self.credential_store.fingerprint(node["id"]) if self.credential_store else None
+                    )
+                    result = self.node_cache.get(memo_key)
+                    node_cache_trace[node["id"]] = "hit" if result is not None else "miss"
                 
+                if memo_key is None or result is None:
+                    result = await self._execute_node(node, input_data, upstream_results, handle, streaming=True)
+                    if isinstance(result.get("stream"), RowStream):
+                        # Completes (and is broadcast) when the stream ends; only
+                        # checkpointed if the executor has to materialize it
+                        return result
+                    if memo_key:
+                        self.node_cache.put(memo_key, node, result)
+                
+                store_result(node["id"], result)
+                return result
+            
+            async def stream_materialized(node_id: str, result: Dict):
+                store_result(node_id, result)
+            
+            async def node_completed(node_id: str, result: Dict):
                 await connection_manager.broadcast({
                     "type": "node_completed",
                     "execution_id": execution_id,
-                    "node_id": node["id"],
-                    "result": result
+                    "node_id": node_id,
+                    "result": stored_results.get(node_id, result),
+                    "restored": node_id in restored_nodes,
+                    "cache": node_cache_trace.get(node_id)
+                })
+            
+            async def node_skipped(node_id: str):
+                await connection_manager.broadcast({
+                    "type": "node_skipped",
+                    "execution_id": execution_id,
+                    "node_id": node_id
                 })
             
+            executor = DAGExecutor(graph, run_node, node_completed, handle, on_node_skipped=node_skipped,
+                                   on_stream_materialized=stream_materialized)
+            results = await executor.run()
+            
+            trace_fields = {"node_cache": node_cache_trace, "skipped_nodes": executor.skipped}
+            if resume:
+                trace_fields["restored_nodes"] = restored_nodes
+            self.cache_manager.update_execution_fields(execution_id, trace_fields)
+            results = {node_id: stored_results.get(node_id, result) for node_id, result in results.items()}
             self.cache_manager.update_execution_status(execution_id, status="completed", result=results)
             
             await connection_manager.broadcast({
@@ -90,7 +264,20 @@ class WorkflowOrchestrator:
                 "results": results
             })
         
+        except asyncio.CancelledError:
+            trace_status = "cancelled"
+            handle.cancel()
+            self.cache_manager.update_execution_status(execution_id, status="cancelled", error="Cancelled by user")
+            
+            await connection_manager.broadcast({
+                "type": "execution_cancelled",
+                "execution_id": execution_id
+            })
+            raise
+        
         except Exception as e:
+            trace_status, trace_error = "failed", str(e)
+            handle.interrupt_all()
             self.cache_manager.update_execution_status(execution_id, status="failed", error=str(e))
             
             await connection_manager.broadcast({
@@ -98,79 +285,652 @@ class WorkflowOrchestrator:
                 "execution_id": execution_id,
                 "error": str(e)
             })
+        
+        finally:
+            run = self.tracer.finish_trace(trace, trace_status, trace_error)
+            try:
+                self.durations.observe_run(workflow_id, run)
+            except Exception as e:
+                print(f"✗ Duration histograms not updated for {execution_id}: {e}")
+    
+    @staticmethod
+    def _row_count(result: Dict) -> Optional[int]:
+        """Rows (or map items) in a node result, for trace attributes"""
+        for key in ("row_count", "item_count", "total_rows"):
+            if isinstance(result.get(key), int):
+                return result[key]
+        if isinstance(result.get("data"), list):
+            return len(result["data"])
+        return None
     
-    async def _execute_node(self, node: Dict, input_data: Dict, previous_results: Dict) -> Dict:
-        """Execute a node"""
+    @staticmethod
+    def _node_fingerprint(node: Dict, input_data: Dict, upstream_digests: Dict[str, str]) -> str:
+        """
+        Hash of everything a node's result depends on: type, config, inputs and
+        the content digests of its upstream results (never the rows themselves)
+        """
+        content = json.dumps({
+            "type": node.get("type"),
+            "config": node.get("config", {}),
+            "input_data": input_data,
+            "upstream": upstream_digests
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode()).hexdigest()
+    
+    async def _execute_node(self, node: Dict, input_data: Dict, previous_results: Dict,
+                            handle: Optional[ExecutionHandle] = None, streaming: bool = False) -> Dict:
+        """Execute a node (streaming=True lets a node return a RowStream to the DAG executor)"""
         node_type = node["type"]
         config = node.get("config", {})
         
         if node_type == "oracle":
-            return await self._execute_oracle_node(node["id"], config, input_data)
+            if streaming and config.get("stream") and config.get("action", "query") == "query":
+                return await self._stream_oracle_node(node["id"], config, input_data, handle)
+            return await self._execute_oracle_node(node["id"], config, input_data, handle)
         elif node_type == "unix":
-            return await self._execute_unix_node(node["id"], config, input_data)
+            return await self._execute_unix_node(node["id"], config, input_data, handle)
         elif node_type == "llm":
             return await self._execute_llm_node(config, input_data, previous_results)
+        elif node_type in ("map", "parallel"):
+            return await self._execute_map_node(node, input_data, previous_results, handle)
+        elif node_type == "condition":
+            return self._execute_condition_node(config, input_data, previous_results)
+        elif node_type == "report":
+            return await self._execute_report_node(node, previous_results, handle)
+        elif node_type == NOOP_TYPE:
+            return {"success": True, "passthrough": True, "node_type": node.get("declared_type")}
         
         return {"success": False, "error": "Unknown node type"}
     
-    async def _execute_oracle_node(self, node_id: str, config: Dict, input_data: Dict) -> Dict:
+    @staticmethod
+    def _node_control(node_id: str, config: Dict, handle: Optional[ExecutionHandle]) -> Tuple[Optional[float], Optional[Callable]]:
+        """Timeout and interrupt registration passed down to a blocking MCP call"""
+        if handle is None:
+            return None, None
+        return handle.node_timeout(config), functools.partial(handle.register_interrupt, interrupt_key(node_id))
+    
+    async def _execute_oracle_node(self, node_id: str, config: Dict, input_data: Dict,
+                                   handle: Optional[ExecutionHandle] = None) -> Dict:
         """Execute Oracle node"""
         cred_data = self.credential_store.get(node_id)
         if not cred_data:
             return {"success": False, "error": "No credentials"}
         
-        mcp = OracleMCPServer()
+        timeout, register_interrupt = self._node_control(node_id, config, handle)
+        return await self.resilience.call(
+            target_for("oracle", cred_data["credentials"]),
+            self.resilience.policy_for("oracle", config),
+            lambda: executor_pools.run(
+                "oracle", self._run_oracle_action, cred_data["credentials"], config, input_data,
+                timeout, register_interrupt
+            ),
+            deadline=handle.remaining if handle else None
+        )
+    
+    @staticmethod
+    def _run_oracle_action(credentials: Dict, config: Dict, input_data: Dict,
+                           timeout: Optional[float] = None, register_interrupt: Optional[Callable] = None) -> Dict:
+        """Borrow a pooled session, run the configured action and return it (blocking - runs in the oracle pool)"""
+        mcp = OracleMCPServer(oracle_pools.pool_for(credentials))
+        if register_interrupt:
+            register_interrupt(mcp.cancel)
         try:
-            success, msg = mcp.connect(cred_data["credentials"])
+            try:
+                success, msg = mcp.connect(credentials)
+            except PoolExhaustedError as e:
+                return {"success": False, "error": str(e)}
             if not success:
-                return {"success": False, "error": msg}
+                return {"success": False, "error": msg, "retryable": True}
+            if timeout:
+                mcp.set_call_timeout(timeout)
             
             action = config.get("action", "query")
             if action == "check_pricing_status":
                 cusip = input_data.get("cusip") or config.get("cusip")
                 return mcp.check_pricing_status(cusip)
+            elif action == "check_pricing_status_bulk":
+                cusips = input_data.get("cusips") or config.get("cusips", [])
+                return mcp.check_pricing_status_bulk(cusips)
+            elif action == "update_pricing_status_bulk":
+                updates = input_data.get("updates") or config.get("updates") or [
+                    {"cusip": cusip, "status": config.get("status"), "error_code": config.get("error_code")}
+                    for cusip in input_data.get("cusips") or config.get("cusips", [])
+                ]
+                return mcp.update_pricing_status_bulk(updates, config.get("chunk_size"))
+            elif action == "execute_dml_batch":
+                rows = input_data.get("rows") or config.get("rows", [])
+                return mcp.execute_dml_batch(config.get("sql") or config["query"], rows, config.get("chunk_size"))
             elif action == "query":
-                return mcp.execute_query(config.get("sql", "SELECT 1 FROM DUAL"))
+                sql, binds = WorkflowOrchestrator._query_binds(config, input_data)
+                return mcp.execute_query(
+                    sql, binds, config.get("fetch_size"), config.get("max_rows"), config.get("max_bytes"),
+                    config.get("result_format", "rows")
+                )
             
             return {"success": True, "message": "Action completed"}
         finally:
             mcp.disconnect()
     
-    async def _execute_unix_node(self, node_id: str, config: Dict, input_data: Dict) -> Dict:
+    @staticmethod
+    def _query_binds(config: Dict, input_data: Dict) -> Tuple[str, Optional[Dict]]:
+        """SQL of a query node and its binds (input data first, then config params)"""
+        sql = config.get("sql") or config.get("query") or "SELECT 1 FROM DUAL"
+        bind_names = config.get("bind_names")
+        if bind_names is None:
+            bind_names = sql_bind_names(sql)
+        params = config.get("params", {})
+        binds = {name: input_data.get(name, params.get(name)) for name in bind_names}
+        return sql, binds or None
+    
+    # ========================================================================
+    # STREAMING ROW PIPELINES
+    # ========================================================================
+    
+    async def _stream_oracle_node(self, node_id: str, config: Dict, input_data: Dict,
+                                  handle: Optional[ExecutionHandle] = None) -> Dict:
+        """
+        Start an Oracle query that streams row batches (config {"stream": true})
+        
+        Returns at once with the RowStream; the fetch continues in the oracle
+        pool, throttled by the slowest consumer.
+        """
+        cred_data = self.credential_store.get(node_id)
+        if not cred_data:
+            return {"success": False, "error": "No credentials"}
+        
+        timeout, register_interrupt = self._node_control(node_id, config, handle)
+        stream = RowStream(node_id)
+        
+        async def fetch():
+            try:
+                fetched = await executor_pools.run(
+                    "oracle", self._run_oracle_stream, cred_data["credentials"], config, input_data,
+                    stream, timeout, register_interrupt
+                )
+            except StreamAborted:
+                return {"success": False, "error": f"Stream {node_id} aborted"}  # finish() is a no-op then
+            except PoolExhaustedError as e:
+                return {"success": False, "error": str(e)}
+            result = {"success": True, "row_count": stream.row_count}
+            if fetched.get("truncated"):
+                result["truncated"] = fetched["truncated"]
+            return result
+        
+        async def produce():
+            try:
+                # Retried only until the first batch was pushed downstream
+                result = await self.resilience.call(
+                    target_for("oracle", cred_data["credentials"]),
+                    self.resilience.policy_for("oracle", config),
+                    fetch,
+                    can_retry=lambda: stream.batch_count == 0,
+                    deadline=handle.remaining if handle else None
+                )
+                if result.get("success"):
+                    await stream.finish({"truncated": result["truncated"]} if result.get("truncated") else None)
+                else:
+                    await stream.finish(result)
+            except Exception as e:
+                await stream.finish({"success": False, "error": str(e)})
+        
+        stream.producer = asyncio.ensure_future(produce())
+        return {"success": True, "streaming": True, "stream": stream}
+    
+    @staticmethod
+    def _run_oracle_stream(credentials: Dict, config: Dict, input_data: Dict, stream: RowStream,
+                           timeout: Optional[float] = None, register_interrupt: Optional[Callable] = None):
+        """
+        Fetch a query with fetchmany() and push each batch (blocking - runs in the oracle pool)
+        Returns the fetch summary (row / byte counts, whether a limit cut it short)
+        """
+        mcp = OracleMCPServer(oracle_pools.pool_for(credentials))
+        if register_interrupt:
+            register_interrupt(mcp.cancel)
+        try:
+            success, msg = mcp.connect(credentials)
+            if not success:
+                raise Exception(msg)
+            if timeout:
+                mcp.set_call_timeout(timeout)
+            
+            sql, binds = WorkflowOrchestrator._query_binds(config, input_data)
+            batch_size = int(config.get("batch_size") or config.get("fetch_size") or settings.STREAM_BATCH_ROWS)
+            batches = mcp.iter_query(sql, binds, batch_size, config.get("max_rows"), config.get("max_bytes"))
+            for columns, rows in batches:
+                stream.put_threadsafe(columns, rows)
+            return mcp.last_fetch
+        finally:
+            mcp.disconnect()
+    
+    @staticmethod
+    def _consumes_stream(node: Dict, parent_id: str) -> bool:
+        """Whether a node reads an upstream stream incrementally instead of materialized"""
+        if node["type"] == "llm":
+            return True
+        if node["type"] in ("map", "parallel"):
+            return node.get("config", {}).get("items_from", "input.cusips").partition(".")[0] == parent_id
+        if node["type"] == "report":
+            return node.get("config", {}).get("source", parent_id) == parent_id
+        return False
+    
+    async def _attach_streams(self, node: Dict, upstream_results: Dict) -> Tuple[Dict, List[RowStreamReader]]:
+        """
+        Claim this node's reader on every streaming upstream result
+        
+        Stream-aware nodes get the reader under "stream"; all others get the
+        rows materialized, exactly as a non-streaming query would return them.
+        """
+        attached = dict(upstream_results)
+        readers = []
+        for parent, result in upstream_results.items():
+            stream = result.get("stream") if isinstance(result, dict) else None
+            if not isinstance(stream, RowStream):
+                continue
+            
+            reader = stream.reader()
+            readers.append(reader)
+            if self._consumes_stream(node, parent):
+                attached[parent] = {**result, "stream": reader}
+            else:
+                attached[parent] = await reader.collect()
+        return attached, readers
+    
+    async def _execute_unix_node(self, node_id: str, config: Dict, input_data: Dict,
+                                 handle: Optional[ExecutionHandle] = None) -> Dict:
         """Execute Unix node"""
         cred_data = self.credential_store.get(node_id)
         if not cred_data:
             return {"success": False, "error": "No credentials"}
         
+        timeout, register_interrupt = self._node_control(node_id, config, handle)
+        return await self.resilience.call(
+            target_for("unix", cred_data["credentials"]),
+            self.resilience.policy_for("unix", config),
+            lambda: executor_pools.run(
+                "unix", self._run_unix_action, cred_data["credentials"], config, input_data,
+                timeout, register_interrupt
+            ),
+            deadline=handle.remaining if handle else None
+        )
+    
+    @staticmethod
+    def _run_unix_action(credentials: Dict, config: Dict, input_data: Dict,
+                         timeout: Optional[float] = None, register_interrupt: Optional[Callable] = None) -> Dict:
+        """Connect, run the configured action and disconnect (blocking - runs in the unix pool)"""
         mcp = UnixMCPServer()
+        if register_interrupt:
+            register_interrupt(mcp.cancel)
+        if timeout:
+            mcp.command_timeout = max(1, int(timeout))
         try:
-            success, msg = mcp.connect(cred_data["credentials"])
+            success, msg = mcp.connect(credentials)
             if not success:
-                return {"success": False, "error": msg}
+                return {"success": False, "error": msg, "retryable": True}
             
             action = config.get("action", "execute_command")
             if action == "check_pricing_job_logs":
                 cusip = input_data.get("cusip") or config.get("cusip")
                 return mcp.check_pricing_job_logs(cusip)
             elif action == "execute_command":
-                return mcp.execute_command(config.get("command", "echo 'test'"))
+                command = config.get("command", "echo 'test'")
+                placeholders = command_placeholders(config)
+                params = config.get("params") or {}
+                try:
+                    command = render_command(command, placeholders, {
+                        name: input_data.get(name, params.get(name)) for name in placeholders
+                    })
+                except ValueError as e:
+                    return {"success": False, "error": str(e)}
+                return mcp.execute_command(command)
             
             return {"success": True, "message": "Action completed"}
         finally:
             mcp.disconnect()
     
+    @staticmethod
+    def _execute_condition_node(config: Dict, input_data: Dict, previous_results: Dict) -> Dict:
+        """
+        Evaluate a condition expression and report which branch to take
+        
+        Names resolve against the input data, the fields of upstream results
+        (merged) and the upstream node ids themselves, e.g.
+        "status != 'PRICED'" or "check_status.row_count > 0".
+        """
+        expression = config.get("expression", "")
+        context = dict(input_data)
+        for result in previous_results.values():
+            if isinstance(result, dict):
+                context.update(result)
+        context.update(previous_results)
+        context.update({"input": input_data, "results": previous_results})
+        
+        try:
+            value = evaluate_condition(expression, context)
+        except ConditionError as e:
+            return {"success": False, "error": str(e)}
+        
+        return {
+            "success": True,
+            "value": value,
+            "branch": "true" if value else "false",
+            "expression": expression
+        }
+    
+    # ========================================================================
+    # MAP / FAN-OUT NODES
+    # ========================================================================
+    
+    async def _execute_map_node(self, node: Dict, input_data: Dict, previous_results: Dict,
+                                handle: Optional[ExecutionHandle] = None) -> Dict:
+        """
+        Run a child sub-flow over a list of items (e.g. thousands of CUSIPs)
+        
+        Config:
+            items_from: "input.<key>" (default "input.cusips") or "<upstream_node_id>.<path>";
+                        a streaming upstream query is batched as its rows arrive
+            item_field: field to take when the items are row dicts (e.g. "CUSIP")
+            item_key: input key each item is bound to for child nodes (default "cusip")
+            batch_size: items per batch (default 500)
+            max_parallel: batches running at once (default 4)
+            item_parallel: per-item child calls running at once inside a batch (default 8)
+            nodes / edges: the child sub-flow, same shape as a workflow
+        
+        Oracle check_pricing_status children run as one bulk query per batch;
+        other children run once per item. Condition children prune per item, so
+        e.g. log checks only run for CUSIPs whose status check failed. Output
+        holds the leaf results per item; an item whose child failed anywhere
+        counts as failed, and "missing" lists CUSIPs a bulk status check did not find.
+        """
+        config = node.get("config", {})
+        try:
+            child_graph = WorkflowGraph(config.get("nodes", []), config.get("edges", []))
+        except (KeyError, ValueError) as e:
+            return {"success": False, "error": f"Invalid map sub-flow: {e}"}
+        if not child_graph.nodes:
+            return {"success": False, "error": "Map node has no child nodes"}
+        
+        batch_size = max(1, int(config.get("batch_size", 500)))
+        semaphore = asyncio.Semaphore(max(1, int(config.get("max_parallel", 4))))
+        
+        async def run_batch(batch: List) -> Dict:
+            async with semaphore:
+                with span("map.batch", node_id=node["id"], items=len(batch)):
+                    return await self._run_map_batch(child_graph, batch, config, input_data, handle)
+        
+        source = previous_results.get(config.get("items_from", "input.cusips").partition(".")[0])
+        if isinstance(source, dict) and isinstance(source.get("stream"), RowStreamReader):
+            # Start batches while the upstream query is still fetching
+            batches, tasks = [], []
+            try:
+                async for batch in self._stream_map_batches(source["stream"], config, batch_size):
+                    batches.append(batch)
+                    tasks.append(asyncio.ensure_future(run_batch(batch)))
+                batch_results = await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+            
+            summary = await source["stream"].stream.result()
+            if not summary.get("success"):
+                return {"success": False, "error": f"Item stream failed: {summary.get('error')}"}
+            items = [item for batch in batches for item in batch]
+        else:
+            items = self._resolve_map_items(config, input_data, previous_results)
+            if items is None:
+                return {"success": False, "error": f"No item list found at {config.get('items_from', 'input.cusips')}"}
+            batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+            batch_results = await asyncio.gather(*[run_batch(batch) for batch in batches])
+        
+        # Gather leaf results per item into one compact output; an item failed if
+        # any child failed for it, even when a condition then pruned the leaves
+        leaves = [node_id for node_id in child_graph.order if not child_graph.downstream[node_id]]
+        results = {}
+        failed_items = []
+        missing = []
+        for batch, child_results in zip(batches, batch_results):
+            for child_result in child_results.values():
+                missing.extend(child_result.get("missing", []))
+            for item in batch:
+                per_item = {
+                    leaf: child_results[leaf]["items"].get(item) if leaf in child_results else SKIPPED_ITEM
+                    for leaf in leaves
+                }
+                results[item] = per_item[leaves[0]] if len(leaves) == 1 else per_item
+                child_items = [child_result["items"].get(item) for child_result in child_results.values()]
+                if any(not isinstance(r, dict) or r.get("success") is False for r in child_items):
+                    failed_items.append(item)
+        
+        return {
+            "success": not failed_items,
+            "item_count": len(items),
+            "batch_count": len(batches),
+            "succeeded": len(items) - len(failed_items),
+            "failed": len(failed_items),
+            "failed_items": failed_items,
+            "missing": list(dict.fromkeys(missing)),
+            "results": results
+        }
+    
+    @staticmethod
+    def _resolve_map_items(config: Dict, input_data: Dict, previous_results: Dict) -> Optional[List]:
+        """Find the item list for a map node and de-duplicate it (order preserved)"""
+        source, _, path = config.get("items_from", "input.cusips").partition(".")
+        value: Any = input_data if source == "input" else previous_results.get(source)
+        
+        for part in filter(None, path.split(".")):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        
+        if not isinstance(value, list):
+            return None
+        
+        item_field = config.get("item_field")
+        if item_field:
+            value = [row.get(item_field) for row in value if isinstance(row, dict)]
+        
+        return list(dict.fromkeys(str(item) for item in value if item is not None))
+    
+    @staticmethod
+    async def _stream_map_batches(reader: RowStreamReader, config: Dict, batch_size: int):
+        """Group streamed rows into de-duplicated item batches as they arrive"""
+        item_field = config.get("item_field")
+        seen = set()
+        pending = []
+        async for rows in reader:
+            for row in rows:
+                item = row.get(item_field) if item_field else next(iter(row.values()), None)
+                if item is None or str(item) in seen:
+                    continue
+                seen.add(str(item))
+                pending.append(str(item))
+                if len(pending) >= batch_size:
+                    yield pending
+                    pending = []
+        if pending:
+            yield pending
+    
+    async def _run_map_batch(self, child_graph: WorkflowGraph, batch: List[str], config: Dict,
+                             input_data: Dict, handle: Optional[ExecutionHandle]) -> Dict[str, Dict]:
+        """Run the child sub-flow for one batch; each child result maps item -> result"""
+        item_key = config.get("item_key", "cusip")
+        item_semaphore = asyncio.Semaphore(max(1, int(config.get("item_parallel", 8))))
+        
+        def item_live(child_id: str, item: str, upstream: Dict) -> bool:
+            """An item runs for a child unless every parent is dead for that item"""
+            if not upstream:
+                return True
+            for parent, parent_result in upstream.items():
+                item_result = parent_result["items"].get(item)
+                if item_result is not SKIPPED_ITEM and child_graph.edge_taken(parent, child_id, item_result):
+                    return True
+            return False
+        
+        async def run_child(child: Dict, upstream: Dict) -> Dict:
+            child_config = child.get("config", {})
+            live = [item for item in batch if item_live(child["id"], item, upstream)]
+            items = {item: SKIPPED_ITEM for item in batch}
+            
+            if live and child["type"] == "oracle" and child_config.get("action") == "check_pricing_status" and item_key == "cusip":
+                result = await self._execute_oracle_node(
+                    child["id"], {**child_config, "action": "check_pricing_status_bulk"},
+                    {**input_data, "cusips": live}, handle
+                )
+                if not result.get("success"):
+                    items.update({item: result for item in live})
+                    return {"success": False, "bulk": True, "items": items}
+                
+                items.update({item: pricing_status_entry(result, item) for item in live})
+                return {"success": True, "bulk": True, "items": items, "missing": result.get("missing", [])}
+            
+            elif live:
+                async def run_item(item: str):
+                    async with item_semaphore:
+                        item_upstream = {
+                            parent: r["items"].get(item) for parent, r in upstream.items()
+                            if r["items"].get(item) is not SKIPPED_ITEM
+                        }
+                        return item, await self._execute_node(child, {**input_data, item_key: item}, item_upstream, handle)
+                
+                items.update(dict(await asyncio.gather(*[run_item(item) for item in live])))
+            
+            batch_result = {
+                "success": all(r.get("success", True) for r in items.values()),
+                "items": items
+            }
+            if child["type"] == "condition":
+                batch_result["branches"] = sorted({r["branch"] for r in items.values() if "branch" in r})
+            return batch_result
+        
+        return await DAGExecutor(child_graph, run_child, handle=handle).run()
+    
+    async def _execute_report_node(self, node: Dict, previous_results: Dict,
+                                   handle: Optional[ExecutionHandle] = None) -> Dict:
+        """
+        Write upstream query rows to a CSV / XLSX file, batch by batch
+        
+        Config:
+            format: "csv" (default) or "xlsx"
+            source: upstream node whose rows go in the report (default: the first one with rows)
+            columns: column subset / order (default: the query's columns)
+            sheet_name: XLSX sheet name (default "Report")
+        
+        A streaming upstream query is written while it fetches, so memory stays
+        at one batch whatever the report size. Batches are rendered and appended
+        in the report pool; only XLSX batches of REPORT_PROCESS_MIN_CELLS cells
+        or more are rendered in the CPU process pool, where the XML encoding
+        outweighs pickling the rows. The file is served (with Range support) by
+        /api/executions/{id}/nodes/{node_id}/report.
+        """
+        config = node.get("config", {})
+        fmt = config.get("format", "csv")
+        source_id = config.get("source") or next(
+            (parent for parent, result in previous_results.items()
+             if isinstance(result, dict) and ("stream" in result or isinstance(result.get("data"), list)
+                                              or isinstance(result.get("column_data"), dict))),
+            None
+        )
+        source = previous_results.get(source_id)
+        if not isinstance(source, dict):
+            return {"success": False, "error": "Report node has no upstream rows"}
+        if source.get("success") is False:
+            return {"success": False, "error": f"Report source {source_id} failed: {source.get('error')}"}
+        
+        reader = source.get("stream") if isinstance(source.get("stream"), RowStreamReader) else None
+        
+        async def batches():
+            if reader:
+                async for batch in reader:
+                    yield batch
+            elif isinstance(source.get("column_data"), dict):
+                names = list(source["column_data"])
+                arrays = list(source["column_data"].values())
+                total = len(arrays[0]) if arrays else 0
+                for start in range(0, total, settings.STREAM_BATCH_ROWS):
+                    stop = start + settings.STREAM_BATCH_ROWS
+                    yield [dict(zip(names, values)) for values in zip(*(array[start:stop] for array in arrays))]
+            else:
+                rows = source.get("data") or []
+                for start in range(0, len(rows), settings.STREAM_BATCH_ROWS):
+                    yield rows[start:start + settings.STREAM_BATCH_ROWS]
+        
+        def columns_for(first_row: Optional[Dict]) -> List[str]:
+            known = reader.stream.columns if reader else source.get("columns")
+            return config.get("columns") or known or (list(first_row.keys()) if isinstance(first_row, dict) else [])
+        
+        execution_id = handle.execution_id if handle else "adhoc"
+        open_report = functools.partial(
+            self.reports.open_report, execution_id, node["id"], fmt, sheet_name=config.get("sheet_name", "Report")
+        )
+        writer = None
+        try:
+            async for batch in batches():
+                if writer is None:
+                    writer = await executor_pools.run("report", open_report, columns_for(batch[0] if batch else None))
+                for rows, first_row in writer.pieces(batch):
+                    if fmt == "xlsx" and len(rows) * len(writer.columns) >= settings.REPORT_PROCESS_MIN_CELLS:
+                        chunk = await executor_pools.run("cpu", render_rows, fmt, writer.columns, rows, first_row)
+                        await executor_pools.run("report", writer.append, chunk, len(rows))
+                    else:
+                        await executor_pools.run("report", writer.write_rows, rows, first_row)
+            
+            if reader:
+                summary = await reader.stream.result()
+                if not summary.get("success"):
+                    raise Exception(f"Report source {source_id} failed: {summary.get('error')}")
+            if writer is None:
+                writer = await executor_pools.run("report", open_report, columns_for(None))
+            report = await executor_pools.run("report", writer.close)
+        except BaseException as e:
+            if writer:
+                writer.abort()
+            self.reports.record(None)
+            if not isinstance(e, Exception):
+                raise
+            return {"success": False, "error": f"Report failed: {e}"}
+        
+        self.reports.record(report)
+        return {
+            "success": True,
+            "row_count": report["row_count"],
+            "report": {
+                **report,
+                "source": source_id,
+                "filename": os.path.basename(writer.path),
+                "content_type": REPORT_FORMATS[fmt],
+                "download_url": f"/api/executions/{execution_id}/nodes/{node['id']}/report"
+            }
+        }
+    
     async def _execute_llm_node(self, config: Dict, input_data: Dict, previous_results: Dict) -> Dict:
         """Execute LLM node"""
         prompt = config.get("prompt", "Analyze the data")
         
         # Check cache
         prompt_hash = hashlib.md5(prompt.encode()).hexdigest()
-        cached = self.cache_manager.get_cached_llm_response(prompt_hash)
+        with span("cache.llm") as cache_span:
+            cached = self.cache_manager.get_cached_llm_response(prompt_hash)
+            cache_span.set(hit=bool(cached))
         
         if cached:
             return {"success": True, "response": cached, "cached": True}
         
-        # Call LLM (mock for now)
+        # Streamed inputs are summarized (row count + first rows), never materialized
+        for parent, result in previous_results.items():
+            if isinstance(result, dict) and isinstance(result.get("stream"), RowStreamReader):
+                previous_results = {
+                    **previous_results,
+                    parent: await result["stream"].digest(settings.STREAM_LLM_SAMPLE_ROWS)
+                }
+        
+        return await self.resilience.call(
+            target_for("llm", url=self.llm_endpoint),
+            self.resilience.policy_for("llm", config),
+            lambda: self._call_llm(prompt, previous_results)
+        )
+    
+    async def _call_llm(self, prompt: str, previous_results: Dict) -> Dict:
+        """Call LLM (mock for now)"""
         return {"success": True, "response": "LLM analysis result", "cached": False}
     
     async def process_chat_message(self, message: str, context: Dict) -> Dict:
@@ -0,0 +1,188 @@
+"""
+Workflow Worker - Standalone process that runs queued executions
+Pulls execute_workflow jobs from the Redis Streams execution queue, runs them
+through a local WorkflowScheduler and acks them when they end. Start any
+number of these (pm2 / systemd) independently of the API processes:
+
+    cd backend && python app/worker.py
+"""
+
+import asyncio
+import json
+import signal
+from typing import Dict, Tuple
+
+from config import settings
+from cache_manager import CacheManager
+from credential_store import CredentialStore
+from orchestrator import WorkflowOrchestrator
+from workflow.scheduler import WorkflowScheduler
+from workflow.pools import executor_pools
+from mcp_servers.oracle_pool import oracle_pools
+from workflow.queue import ExecutionQueue, RedisEventPublisher, CONTROL_CHANNEL
+
+
+class WorkflowWorker:
+    """
+    Consumer loop: read as many jobs as there are free execution slots,
+    heartbeat the ones in flight, and reclaim jobs of workers that died
+    (they resume from their node checkpoints)
+    """
+
+    def __init__(self, queue: ExecutionQueue, scheduler: WorkflowScheduler):
+        self.queue = queue
+        self.scheduler = scheduler
+        self.in_flight: Dict[str, Tuple[str, str]] = {}  # execution_id -> (stream, entry_id)
+        self.slot_freed = asyncio.Event()
+        self.stopping = asyncio.Event()
+
+    def free_slots(self) -> int:
+        """Paused executions stay in flight but hold no slot"""
+        return self.scheduler.max_concurrent - len(self.in_flight) + len(self.scheduler.paused)
+
+    def _start(self, stream: str, entry_id: str, job: Dict):
+        execution_id = job["execution_id"]
+        if execution_id in self.in_flight:
+            return
+
+        execution = self.scheduler.orchestrator.cache_manager.get_execution(execution_id) or {}
+        if execution.get("status") == "cancelled":
+            asyncio.ensure_future(self.queue.ack(stream, entry_id))
+            return
+
+        def finished():
+            self.in_flight.pop(execution_id, None)
+            asyncio.ensure_future(self.queue.ack(stream, entry_id))
+            self.slot_freed.set()
+
+        self.in_flight[execution_id] = (stream, entry_id)
+        self.scheduler.submit(
+            job["workflow_id"],
+            job.get("input_data", {}),
+            execution_id,
+            priority=job.get("priority", "manual"),
+            resume=job.get("resume", False),
+            on_finished=finished
+        )
+
+    async def consume(self):
+        while not self.stopping.is_set():
+            if self.free_slots() <= 0:
+                self.slot_freed.clear()
+                await self.slot_freed.wait()
+                continue
+            try:
+                jobs = await self.queue.read(self.free_slots(), block_ms=2000)
+            except Exception as e:
+                print(f"✗ Execution queue read failed: {e}")
+                await asyncio.sleep(1)
+                continue
+            for stream, entry_id, job in jobs:
+                self._start(stream, entry_id, job)
+
+    async def heartbeat(self):
+        interval = settings.EXECUTION_RECLAIM_IDLE_MS / 3000
+        while not self.stopping.is_set():
+            await asyncio.sleep(interval)
+            if self.in_flight:
+                await self.queue.heartbeat(list(self.in_flight.values()))
+
+    async def reclaim(self):
+        interval = settings.EXECUTION_RECLAIM_IDLE_MS / 1000
+        while not self.stopping.is_set():
+            if self.free_slots() > 0:
+                try:
+                    reclaimed, dead = await self.queue.reclaim(count=self.free_slots())
+                except Exception as e:
+                    print(f"✗ Execution queue reclaim failed: {e}")
+                    reclaimed, dead = [], []
+
+                for job in dead:
+                    self.scheduler.orchestrator.cache_manager.update_execution_status(
+                        job["execution_id"], status="failed",
+                        error=f"Abandoned after {settings.EXECUTION_MAX_DELIVERIES} worker attempts"
+                    )
+                for stream, entry_id, job in reclaimed:
+                    print(f"✓ Reclaimed execution {job['execution_id']} from a lost worker")
+                    self._start(stream, entry_id, job)
+            await asyncio.sleep(interval)
+
+    async def listen_control(self):
+        """Apply cancel / pause / resume published by API processes"""
+        pubsub = self.queue.redis.pubsub()
+        await pubsub.subscribe(CONTROL_CHANNEL)
+        handlers = {
+            "cancel": self.scheduler.cancel,
+            "pause": self.scheduler.pause,
+            "resume": self.scheduler.resume
+        }
+        async for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+            command = json.loads(message["data"])
+            handler = handlers.get(command.get("action"))
+            if handler and command.get("execution_id") in self.in_flight:
+                if handler(command["execution_id"]) and command["action"] == "pause":
+                    self.slot_freed.set()
+
+    async def run(self):
+        await self.queue.ensure_groups()
+        print(f"✓ Workflow worker {self.queue.consumer} consuming {self.queue.prefix}:* "
+              f"(slots={self.scheduler.max_concurrent})")
+
+        tasks = [asyncio.ensure_future(coro) for coro in (
+            self.consume(), self.heartbeat(), self.reclaim(), self.listen_control()
+        )]
+        await self.stopping.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._release_in_flight()
+
+    async def _release_in_flight(self):
+        """Unwind running executions without acking them, so another worker takes over"""
+        jobs = list(self.scheduler.running.values()) + list(self.scheduler.paused.values())
+        for job in jobs:
+            job["on_finished"] = None
+            job["task"].cancel()
+        await asyncio.gather(*(job["task"] for job in jobs), return_exceptions=True)
+
+        cache_manager = self.scheduler.orchestrator.cache_manager
+        for execution_id in self.in_flight:
+            cache_manager.update_execution_status(
+                execution_id, status="queued", current_step="Worker stopped - waiting to be reclaimed"
+            )
+
+    def stop(self):
+        """
+        Stop taking jobs; in-flight entries stay pending and are reclaimed
+        (and resumed from their checkpoints) by another worker
+        """
+        print("👋 Stopping workflow worker...")
+        self.stopping.set()
+        self.slot_freed.set()
+
+
+async def main():
+    cache_manager = CacheManager(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
+    if not cache_manager.use_redis:
+        raise SystemExit("✗ The workflow worker needs Redis (execution queue, shared state)")
+
+    credential_store = CredentialStore(redis_client=cache_manager.redis)
+    orchestrator = WorkflowOrchestrator(cache_manager, credential_store, llm_endpoint=settings.LLM_API_URL)
+    scheduler = WorkflowScheduler(orchestrator, RedisEventPublisher())
+    worker = WorkflowWorker(ExecutionQueue(), scheduler)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        executor_pools.shutdown()
+        oracle_pools.close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
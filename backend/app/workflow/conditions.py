@@ -0,0 +1,165 @@
+"""
+Condition Expressions - Safe evaluation of condition node expressions
+Supports comparisons, and/or/not, arithmetic, membership, indexing and a few
+builtins over upstream results, e.g. "status == 'FAILED' and price > 0"
+"""
+
+import ast
+import numbers
+import operator
+from functools import lru_cache
+from typing import Dict, Any
+
+
+class ConditionError(ValueError):
+    """Raised for invalid or unsupported condition expressions"""
+
+
+BRANCH_LABELS = {
+    "true": "true", "yes": "true", "1": "true", "then": "true",
+    "false": "false", "no": "false", "0": "false", "else": "false"
+}
+
+_COMPARE = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not
+}
+
+def _multiply(left: Any, right: Any) -> Any:
+    """Numbers only: sequence repetition ([0] * 10**9) could exhaust memory"""
+    if not isinstance(left, numbers.Number) or not isinstance(right, numbers.Number):
+        raise TypeError("only numbers can be multiplied in conditions")
+    return left * right
+
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _multiply,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod
+}
+
+_FUNCTIONS = {
+    "len": len,
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "str": str,
+    "int": int,
+    "float": float,
+    "lower": lambda value: str(value).lower(),
+    "upper": lambda value: str(value).upper()
+}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+    ast.Compare, ast.BinOp, ast.Constant, ast.Name, ast.Load, ast.Attribute,
+    ast.Subscript, ast.List, ast.Tuple, ast.Call
+) + tuple(_COMPARE) + tuple(_BINARY)
+
+
+def normalize_branch_label(label: Any) -> str:
+    """Map edge labels like 'yes' / 'Else' onto 'true' / 'false'"""
+    text = str(label).strip().lower()
+    return BRANCH_LABELS.get(text, text)
+
+
+@lru_cache(maxsize=512)
+def compile_expression(expression: str) -> ast.Expression:
+    """Parse and whitelist-check an expression (cached per expression text)"""
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ConditionError(f"Invalid condition '{expression}': {e.msg}")
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ConditionError(f"Unsupported syntax in condition '{expression}': {type(node).__name__}")
+        if isinstance(node, ast.Call) and (not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS):
+            raise ConditionError(f"Only {', '.join(_FUNCTIONS)} may be called in conditions")
+        if isinstance(node, ast.Attribute) and node.attr.startswith("_"):
+            raise ConditionError(f"Private attributes are not allowed in conditions: {node.attr}")
+
+    return tree
+
+
+def evaluate_condition(expression: str, context: Dict[str, Any]) -> bool:
+    """Evaluate an expression against a context; unknown names resolve to None"""
+    tree = compile_expression(expression)
+    return bool(_evaluate(tree.body, context))
+
+
+def _lookup(value: Any, key: Any) -> Any:
+    if isinstance(value, dict):
+        return value.get(key)
+    if isinstance(value, (list, tuple)) and isinstance(key, int):
+        return value[key] if -len(value) <= key < len(value) else None
+    return None
+
+
+def _evaluate(node: ast.AST, context: Dict[str, Any]) -> Any:
+    if isinstance(node, ast.Constant):
+        return node.value
+
+    if isinstance(node, ast.Name):
+        if node.id in ("true", "True"):
+            return True
+        if node.id in ("false", "False"):
+            return False
+        if node.id in ("null", "None"):
+            return None
+        return context.get(node.id)
+
+    if isinstance(node, ast.BoolOp):
+        if isinstance(node.op, ast.And):
+            return all(_evaluate(value, context) for value in node.values)
+        return any(_evaluate(value, context) for value in node.values)
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _evaluate(node.operand, context)
+        return -operand if isinstance(node.op, ast.USub) else not operand
+
+    if isinstance(node, ast.Compare):
+        left = _evaluate(node.left, context)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = _evaluate(comparator, context)
+            try:
+                if not _COMPARE[type(op)](left, right):
+                    return False
+            except TypeError:
+                return False
+            left = right
+        return True
+
+    if isinstance(node, ast.BinOp):
+        try:
+            return _BINARY[type(node.op)](_evaluate(node.left, context), _evaluate(node.right, context))
+        except (TypeError, ZeroDivisionError):
+            return None
+
+    if isinstance(node, ast.Attribute):
+        return _lookup(_evaluate(node.value, context), node.attr)
+
+    if isinstance(node, ast.Subscript):
+        return _lookup(_evaluate(node.value, context), _evaluate(node.slice, context))
+
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [_evaluate(element, context) for element in node.elts]
+
+    if isinstance(node, ast.Call):
+        args = [_evaluate(arg, context) for arg in node.args]
+        try:
+            return _FUNCTIONS[node.func.id](*args)
+        except (TypeError, ValueError):
+            return None
+
+    raise ConditionError(f"Unsupported syntax: {type(node).__name__}")
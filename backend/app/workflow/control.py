@@ -0,0 +1,162 @@
+"""
+Execution Control - Deadlines, pause/resume and cooperative cancellation
+One ExecutionHandle is created per running workflow and shared by every node
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Dict, Any, List, Callable, Optional
+from config import settings
+
+
+# Interrupt key of the node run the current task belongs to; a map node runs
+# the same child ids in parallel batches, so keys are unique per run
+_interrupt_scope: ContextVar[Optional[str]] = ContextVar("interrupt_scope", default=None)
+
+
+def new_interrupt_key(node_id: str) -> str:
+    """Key for one run of a node, made current for the tasks it starts"""
+    key = f"{node_id}:{uuid.uuid4().hex[:12]}"
+    _interrupt_scope.set(key)
+    return key
+
+
+def interrupt_key(node_id: str) -> str:
+    """Key blocking calls of node_id register under (its current run, if any)"""
+    return _interrupt_scope.get() or node_id
+
+
+class ExecutionCancelled(Exception):
+    """Raised inside an execution that was cancelled by the user"""
+
+
+class ExecutionTimeout(Exception):
+    """Raised when the workflow deadline (WORKFLOW_TIMEOUT) has passed"""
+
+
+class ExecutionHandle:
+    """
+    Runtime control state for one workflow execution
+
+    - Deadline: the workflow gets `timeout` seconds; each node gets its own
+      timeout (config["timeout"] or NODE_TIMEOUT) clipped to what is left
+    - Pause: no new nodes start until resumed; paused time does not count
+      against the deadline
+    - Cancel/timeout: interrupt callbacks registered by blocking MCP calls
+      (cx_Oracle connection.cancel, SSH channel close) are fired so worker
+      threads return promptly instead of holding their pool slot
+    """
+
+    def __init__(self, execution_id: str, timeout: Optional[float] = None):
+        self.execution_id = execution_id
+        self.timeout = timeout or settings.WORKFLOW_TIMEOUT
+        self.deadline = time.monotonic() + self.timeout
+        self.cancelled = False
+        self.paused_at: Optional[float] = None
+
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+        self._lock = threading.Lock()
+        self._interrupts: Dict[str, List[Callable[[], None]]] = {}
+
+    # ========================================================================
+    # DEADLINES
+    # ========================================================================
+
+    def remaining(self) -> float:
+        """Seconds left before the workflow deadline"""
+        if self.paused_at is not None:
+            return self.deadline - self.paused_at
+        return self.deadline - time.monotonic()
+
+    def node_timeout(self, config: Dict[str, Any]) -> float:
+        """Timeout for one node: its own limit, never beyond the workflow deadline"""
+        node_limit = float(config.get("timeout") or settings.NODE_TIMEOUT)
+        return max(0.0, min(node_limit, self.remaining()))
+
+    async def checkpoint(self):
+        """
+        Called before a node starts: waits while paused and raises if the
+        execution was cancelled or ran out of time
+        """
+        if self.cancelled:
+            raise ExecutionCancelled(f"Execution {self.execution_id} was cancelled")
+
+        await self._resumed.wait()
+
+        if self.cancelled:
+            raise ExecutionCancelled(f"Execution {self.execution_id} was cancelled")
+        if self.remaining() <= 0:
+            raise ExecutionTimeout(f"Workflow timed out after {self.timeout}s")
+
+    # ========================================================================
+    # PAUSE / RESUME / CANCEL
+    # ========================================================================
+
+    @property
+    def paused(self) -> bool:
+        return self.paused_at is not None
+
+    def pause(self):
+        if self.paused_at is None and not self.cancelled:
+            self.paused_at = time.monotonic()
+            self._resumed.clear()
+
+    def resume(self):
+        if self.paused_at is not None:
+            self.deadline += time.monotonic() - self.paused_at
+            self.paused_at = None
+            self._resumed.set()
+
+    def cancel(self):
+        self.cancelled = True
+        self.paused_at = None
+        self._resumed.set()
+        self.interrupt_all()
+
+    # ========================================================================
+    # INTERRUPTS FOR BLOCKING CALLS
+    # ========================================================================
+
+    def register_interrupt(self, key: str, callback: Callable[[], None]):
+        """
+        Register a callback that aborts a blocking call (thread-safe, may be
+        called from executor pool threads). Fires at once if already cancelled.
+        """
+        with self._lock:
+            self._interrupts.setdefault(key, []).append(callback)
+        if self.cancelled:
+            self._fire([callback])
+
+    def unregister_interrupts(self, key: str):
+        with self._lock:
+            self._interrupts.pop(key, None)
+
+    def interrupt(self, key: str):
+        with self._lock:
+            callbacks = self._interrupts.pop(key, [])
+        self._fire(callbacks)
+
+    def interrupt_all(self):
+        with self._lock:
+            callbacks = [cb for cbs in self._interrupts.values() for cb in cbs]
+            self._interrupts.clear()
+        self._fire(callbacks)
+
+    def _fire(self, callbacks: List[Callable[[], None]]):
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error interrupting execution {self.execution_id}: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "execution_id": self.execution_id,
+            "paused": self.paused,
+            "cancelled": self.cancelled,
+            "remaining_seconds": round(self.remaining(), 1)
+        }
@@ -0,0 +1,291 @@
+"""
+Workflow Engine - Compiles workflow definitions into cached execution plans
+A plan is built once per workflow revision: graph, topological order,
+resolved handler types, validated configs and pre-parsed SQL binds / command
+placeholders. Short, frequently triggered workflows skip all of that per run.
+"""
+
+import hashlib
+import json
+import re
+import shlex
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from workflow.executor import WorkflowGraph
+from workflow.conditions import ConditionError, compile_expression
+from workflow.memo import memoizable
+from workflow.tracing import span
+
+
+# NodeType values from models.py (and canvas aliases) -> orchestrator handler type
+HANDLER_TYPES = {
+    "oracle": "oracle",
+    "oracle_query": "oracle",
+    "unix": "unix",
+    "unix_command": "unix",
+    "llm": "llm",
+    "llm_analysis": "llm",
+    "map": "map",
+    "parallel": "map",
+    "condition": "condition",
+    "report": "report"
+}
+
+# Handler type of canvas nodes with no runtime behaviour (trigger_*, output_*, tool_*, ...):
+# they run as pass-throughs so the edges around them still hold
+NOOP_TYPE = "noop"
+
+REPORT_FORMATS = ("csv", "xlsx")
+
+SQL_BIND_PATTERN = re.compile(r"(?<!:):([A-Za-z_][A-Za-z0-9_]*)")
+SQL_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+PLACEHOLDER_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class PlanCompileError(ValueError):
+    """Raised when a workflow definition cannot be compiled"""
+
+    def __init__(self, workflow_id: str, problems: List[str]):
+        self.problems = problems
+        super().__init__(f"Workflow {workflow_id} is invalid: {'; '.join(problems)}")
+
+
+def workflow_revision(workflow: Dict[str, Any]) -> str:
+    """Content hash identifying one saved revision of a workflow"""
+    content = json.dumps(workflow, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def sql_bind_names(sql: str) -> List[str]:
+    """Bind variable names used in a statement (ignores string literals)"""
+    stripped = SQL_STRING_LITERAL.sub("''", sql)
+    return list(dict.fromkeys(SQL_BIND_PATTERN.findall(stripped)))
+
+
+def command_placeholders(config: Dict[str, Any]) -> List[str]:
+    """
+    Placeholder names a Unix node opted in to: its "placeholders" list, else
+    the keys of its "params". Commands without either are run verbatim.
+    """
+    names = config.get("placeholders")
+    if names is None:
+        names = list((config.get("params") or {}).keys())
+    return list(dict.fromkeys(names))
+
+
+def render_command(command: str, names: List[str], values: Dict[str, Any]) -> str:
+    """
+    Substitute the declared {name} placeholders with shell-quoted values;
+    any other braces (awk programs, find -exec {}) are left alone
+
+    Raises:
+        ValueError: if a declared placeholder in the command has no value
+    """
+    if not names:
+        return command
+    pattern = re.compile(r"(?<!\$)\{(" + "|".join(re.escape(name) for name in names) + r")\}")
+
+    def substitute(match) -> str:
+        name = match.group(1)
+        if values.get(name) is None:
+            raise ValueError(f"Command placeholder {{{name}}} is not bound")
+        return shlex.quote(str(values[name]))
+
+    return pattern.sub(substitute, command)
+
+
+class ExecutionPlan:
+    """
+    Compiled, read-only form of a workflow
+
+    Nodes are normalized to {"id", "type", "config"} whatever shape the
+    canvas saved them in (React Flow nodes keep type/config under "data").
+    """
+
+    def __init__(self, workflow_id: str, version: str, revision: str, graph: WorkflowGraph,
+                 warnings: Optional[List[str]] = None):
+        self.workflow_id = workflow_id
+        self.version = version
+        self.revision = revision
+        self.graph = graph
+        self.warnings = warnings or []
+        self.order = tuple(graph.order)
+        self.compiled_at = datetime.now().isoformat()
+
+    @property
+    def nodes(self) -> Dict[str, Dict[str, Any]]:
+        return self.graph.nodes
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "workflow_id": self.workflow_id,
+            "version": self.version,
+            "revision": self.revision,
+            "order": list(self.order),
+            "compiled_at": self.compiled_at,
+            "nodes": {node_id: node["type"] for node_id, node in self.graph.nodes.items()},
+            "warnings": self.warnings
+        }
+
+
+class PlanCompiler:
+    """Validates and normalizes a workflow definition into an ExecutionPlan"""
+
+    def compile(self, workflow_id: str, workflow: Dict[str, Any], revision: Optional[str] = None) -> ExecutionPlan:
+        problems: List[str] = []
+        warnings: List[str] = []
+        nodes = self._compile_nodes(workflow.get("nodes", []), problems, warnings)
+
+        graph = None
+        if not problems:
+            try:
+                graph = WorkflowGraph(nodes, workflow.get("edges", []))
+            except (KeyError, ValueError) as e:
+                problems.append(str(e))
+
+        if problems:
+            raise PlanCompileError(workflow_id, problems)
+
+        return ExecutionPlan(
+            workflow_id=workflow_id,
+            version=str(workflow.get("version", "1.0.0")),
+            revision=revision or workflow_revision(workflow),
+            graph=graph,
+            warnings=warnings
+        )
+
+    def _compile_nodes(self, raw_nodes: List[Dict[str, Any]], problems: List[str], warnings: List[str],
+                       prefix: str = "") -> List[Dict[str, Any]]:
+        compiled = []
+        for raw in raw_nodes:
+            node_id = raw.get("id")
+            if not node_id:
+                problems.append(f"{prefix}node without id")
+                continue
+
+            data = raw.get("data") or {}
+            declared_type = raw.get("type") if raw.get("type") in HANDLER_TYPES else data.get("type", raw.get("type"))
+            node_type = HANDLER_TYPES.get(declared_type)
+            config = dict(raw.get("config") or data.get("config") or {})
+            if node_type is None:
+                warnings.append(f"{prefix}{node_id}: node type '{declared_type}' has no handler, it will pass through")
+                compiled.append({"id": node_id, "type": NOOP_TYPE, "config": config, "declared_type": declared_type})
+                continue
+
+            self._validate(f"{prefix}{node_id}", node_type, config, problems, warnings)
+            compiled.append({"id": node_id, "type": node_type, "config": config})
+        return compiled
+
+    def _validate(self, label: str, node_type: str, config: Dict[str, Any], problems: List[str],
+                  warnings: List[str]):
+        """Check fields the runtime cannot default and pre-parse SQL binds"""
+        if node_type == "oracle":
+            if not config.get("sql") and config.get("query"):
+                config["sql"] = config["query"]  # the canvas stores the statement as "query"
+            if config.get("action", "query") == "query":
+                if config.get("sql"):
+                    config["bind_names"] = sql_bind_names(config["sql"])
+                else:
+                    warnings.append(f"{label}: oracle query has no 'sql', it will run SELECT 1 FROM DUAL")
+                if config.get("result_format", "rows") not in ("rows", "columnar"):
+                    problems.append(f"{label}: result_format must be 'rows' or 'columnar'")
+            elif config.get("action") == "execute_dml_batch" and not config.get("sql"):
+                problems.append(f"{label}: oracle execute_dml_batch needs 'sql'")
+
+        elif node_type == "unix":
+            names = config.get("placeholders")
+            if names is not None and not (
+                isinstance(names, list) and all(isinstance(name, str) and PLACEHOLDER_NAME.match(name) for name in names)
+            ):
+                problems.append(f"{label}: unix 'placeholders' must be a list of names")
+
+        elif node_type == "condition":
+            if not config.get("expression"):
+                problems.append(f"{label}: condition node needs 'expression'")
+            else:
+                try:
+                    compile_expression(config["expression"])
+                except ConditionError as e:
+                    problems.append(f"{label}: {e}")
+
+        elif node_type == "report":
+            if config.get("format", "csv") not in REPORT_FORMATS:
+                problems.append(f"{label}: report format must be one of {', '.join(REPORT_FORMATS)}")
+            if config.get("columns") is not None and not isinstance(config["columns"], list):
+                problems.append(f"{label}: report 'columns' must be a list")
+
+        elif node_type == "map":
+            if not config.get("nodes"):
+                problems.append(f"{label}: map node needs child 'nodes'")
+            else:
+                config["nodes"] = self._compile_nodes(config["nodes"], problems, warnings, prefix=f"{label}/")
+
+        if config.get("cache") and not memoizable(node_type, config):
+            problems.append(f"{label}: 'cache' is only allowed on read-only nodes "
+                            f"(LLM, SELECT queries, pricing status and log checks)")
+
+
+class PlanCache:
+    """
+    In-process cache of compiled plans keyed by workflow id
+
+    A plan is reused while the stored revision of its workflow is unchanged,
+    so saves from another process are picked up on the next run too.
+    """
+
+    def __init__(self, cache_manager, compiler: Optional[PlanCompiler] = None):
+        self.cache_manager = cache_manager
+        self.compiler = compiler or PlanCompiler()
+        self.plans: Dict[str, ExecutionPlan] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'compiles': 0,
+            'invalidations': 0,
+            'total_compile_ms': 0.0
+        }
+
+    def get(self, workflow_id: str) -> Optional[ExecutionPlan]:
+        """
+        Return the plan for the current revision of a workflow, compiling it on
+        first use (None if the workflow does not exist)
+
+        Raises:
+            PlanCompileError: if the stored workflow is invalid
+        """
+        revision = self.cache_manager.get_workflow_revision(workflow_id)
+
+        with self._lock:
+            plan = self.plans.get(workflow_id)
+        if plan is not None and revision is not None and plan.revision == revision:
+            self.stats['hits'] += 1
+            return plan
+
+        workflow = self.cache_manager.get_workflow(workflow_id)
+        if not workflow:
+            return None
+
+        start_time = datetime.now()
+        with span("plan.compile", workflow_id=workflow_id, nodes=len(workflow.get("nodes", []))):
+            plan = self.compiler.compile(workflow_id, workflow, revision)
+        self.stats['compiles'] += 1
+        self.stats['total_compile_ms'] += (datetime.now() - start_time).total_seconds() * 1000
+
+        with self._lock:
+            self.plans[workflow_id] = plan
+        return plan
+
+    def invalidate(self, workflow_id: str):
+        with self._lock:
+            if self.plans.pop(workflow_id, None) is not None:
+                self.stats['invalidations'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        compiles = self.stats['compiles']
+        return {
+            **self.stats,
+            'cached_plans': len(self.plans),
+            'average_compile_ms': round(self.stats['total_compile_ms'] / compiles, 2) if compiles else 0.0
+        }
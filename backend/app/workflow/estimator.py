@@ -0,0 +1,343 @@
+"""
+Duration Estimator - Predict wall time and resource cost of a workflow
+Latency and row-count histograms are built from the traces of past
+executions (per workflow node, per Oracle / SSH / LLM target and per node
+type); the estimator walks the DAG with them to predict p50 / p95 wall time
+and the LLM tokens, Oracle rows and SSH calls a run will cost
+"""
+
+import math
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from config import settings
+from workflow.executor import WorkflowGraph
+from workflow.resilience import target_for
+
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000, 300000, 600000)
+ROW_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000,
+               100000, 200000, 500000, 1000000, 10000000)
+
+# Used until a node, target or node type has ESTIMATE_MIN_SAMPLES observations
+DEFAULT_NODE_MS = {
+    "oracle": 2000,
+    "unix": 1000,
+    "llm": 5000,
+    "condition": 1,
+    "report": 1000,
+    "noop": 0,
+    "map": 50  # per item
+}
+DEFAULT_MAP_ITEMS = 100
+DEFAULT_LLM_MAX_TOKENS = 1000
+
+
+def _bucket(value: float, bounds: Tuple) -> str:
+    for bound in bounds:
+        if value <= bound:
+            return str(bound)
+    return "inf"
+
+
+def percentile(counts: Dict[str, int], q: float, bounds: Tuple) -> Optional[float]:
+    """q-quantile of a bucketed histogram, interpolated inside its bucket"""
+    total = sum(counts.values())
+    if not total:
+        return None
+    target = q * total
+    seen, lower = 0, 0.0
+    for bound in bounds + (None,):
+        count = counts.get(str(bound) if bound is not None else "inf", 0)
+        if count and seen + count >= target:
+            upper = float(bound) if bound is not None else lower * 2 or 1.0
+            return lower + (upper - lower) * (target - seen) / count
+        seen += count
+        lower = float(bound) if bound is not None else lower
+    return lower
+
+
+class DurationHistograms:
+    """
+    Histograms in the CacheManager (histogram:{key}, bucket -> count)
+
+    Keys:
+        duration:workflow:{workflow_id}            whole runs
+        duration:node:{workflow_id}:{node_id}      one node of one workflow
+        duration:target:{target}                   MCP / LLM calls per target
+        duration:type:{node_type}                  any node of a type
+        duration:item:{workflow_id}:{node_id}      map node time per item
+        rows:node:{workflow_id}:{node_id}, rows:type:{node_type}
+    """
+
+    def __init__(self, cache_manager):
+        self.cache_manager = cache_manager
+
+    def observe_run(self, workflow_id: str, run: Optional[Dict[str, Any]]):
+        """Record the spans of one finished execution run"""
+        if not run or run.get("status") != "completed":
+            return
+
+        spans = run["spans"]
+        call_ms: Dict[str, float] = {}
+        call_rows: Dict[str, int] = {}
+        for item in spans:
+            if item["name"].startswith("mcp.") or item["name"] == "llm.call":
+                parent = item["parent_id"]
+                call_ms[parent] = max(call_ms.get(parent, 0.0), item["duration_ms"] or 0.0)
+                if isinstance(item["attributes"].get("rows"), int):
+                    call_rows[parent] = item["attributes"]["rows"]
+
+        observations: Dict[str, Dict[str, int]] = {}
+
+        def observe(key: str, value: float, bounds: Tuple = LATENCY_BUCKETS_MS):
+            bucket = _bucket(value, bounds)
+            observations.setdefault(key, {})
+            observations[key][bucket] = observations[key].get(bucket, 0) + 1
+
+        if not spans[0]["attributes"].get("resume"):
+            observe(f"duration:workflow:{workflow_id}", run["duration_ms"])
+        for item in spans:
+            attributes = item["attributes"]
+            if item["name"] in ("mcp.oracle", "mcp.unix", "llm.call") and attributes.get("target"):
+                observe(f"duration:target:{attributes['target']}", item["duration_ms"] or 0.0)
+            # Restored and memoized nodes did no work; they would drag estimates down
+            if item["name"] != "node" or attributes.get("restored") or attributes.get("cache") == "hit" \
+                    or item["status"] != "ok":
+                continue
+
+            node_type, node_id = attributes.get("type"), attributes.get("node_id")
+            # A streaming node returns at once; its query keeps running in the call span
+            duration = max(item["duration_ms"] or 0.0, call_ms.get(item["span_id"], 0.0))
+            rows = attributes.get("rows")
+            rows = rows if isinstance(rows, int) else call_rows.get(item["span_id"])
+            if node_type in ("map", "parallel"):
+                if rows:
+                    observe(f"duration:item:{workflow_id}:{node_id}", duration / rows)
+                    observe("duration:type:map", duration / rows)
+            else:
+                observe(f"duration:node:{workflow_id}:{node_id}", duration)
+                observe(f"duration:type:{node_type}", duration)
+            if isinstance(rows, int):
+                observe(f"rows:node:{workflow_id}:{node_id}", rows, ROW_BUCKETS)
+                observe(f"rows:type:{node_type}", rows, ROW_BUCKETS)
+
+        self.cache_manager.increment_histograms(observations)
+
+    def summaries(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """count / p50 / p95 for each key"""
+        result = {}
+        for key, counts in self.cache_manager.get_histograms(keys).items():
+            bounds = ROW_BUCKETS if key.startswith("rows:") else LATENCY_BUCKETS_MS
+            result[key] = {
+                "count": sum(counts.values()),
+                "p50": percentile(counts, 0.5, bounds),
+                "p95": percentile(counts, 0.95, bounds)
+            }
+        return result
+
+
+class DurationEstimator:
+    """
+    Walks a compiled plan: each node gets p50 / p95 from the most specific
+    histogram with enough samples (this node > its target > its type >
+    defaults); the workflow takes the longest path, summing per-node
+    percentiles along it (an upper bound for p95)
+
+    Estimates are cached per plan revision and input list sizes for
+    ESTIMATE_CACHE_SECONDS, so submitting a run does not repeat the histogram
+    reads and credential decrypts; warnings are re-evaluated on every call
+    """
+
+    def __init__(self, histograms: DurationHistograms, plans, credential_store=None, llm_endpoint: Optional[str] = None):
+        self.histograms = histograms
+        self.plans = plans
+        self.credential_store = credential_store
+        self.llm_endpoint = llm_endpoint
+        self._cache: Dict[tuple, Tuple[float, Dict[str, Any]]] = {}
+        self.stats = {
+            'estimates': 0,
+            'cache_hits': 0
+        }
+
+    def _target(self, node_id: str, node_type: str) -> Optional[str]:
+        if node_type == "llm":
+            return target_for("llm", url=self.llm_endpoint)
+        if node_type not in ("oracle", "unix") or not self.credential_store:
+            return None
+        cred_data = self.credential_store.get(node_id)
+        return target_for(node_type, cred_data["credentials"]) if cred_data else None
+
+    def _pick(self, summaries: Dict[str, Dict[str, Any]], keys: List[str], default: float) -> Tuple[float, float, str]:
+        for key in keys:
+            summary = summaries.get(key)
+            if summary and summary["count"] >= settings.ESTIMATE_MIN_SAMPLES:
+                return summary["p50"], summary["p95"], key
+        return default, default * 3, "default"
+
+    def _keys(self, workflow_id: str, graph: WorkflowGraph) -> List[str]:
+        keys = [f"duration:workflow:{workflow_id}"]
+        for node_id, node in graph.nodes.items():
+            target = self._target(node_id, node["type"])
+            keys += [
+                f"duration:node:{workflow_id}:{node_id}", f"duration:item:{workflow_id}:{node_id}",
+                f"duration:type:{node['type']}", f"rows:node:{workflow_id}:{node_id}", f"rows:type:{node['type']}"
+            ]
+            if target:
+                keys.append(f"duration:target:{target}")
+            if node["type"] in ("map", "parallel"):
+                keys += self._keys(workflow_id, WorkflowGraph(
+                    node["config"].get("nodes", []), node["config"].get("edges", [])))[1:]
+        return keys
+
+    def estimate(self, workflow_id: str, input_data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns None if the workflow does not exist
+
+        Raises:
+            PlanCompileError: if the stored workflow is invalid
+        """
+        plan = self.plans.get(workflow_id)
+        if plan is None:
+            return None
+
+        # Input only sizes map nodes (items_from "input.<list>")
+        input_sizes = tuple(sorted(
+            (key, len(value)) for key, value in (input_data or {}).items() if isinstance(value, list)
+        ))
+        cache_key = (workflow_id, plan.revision, input_sizes)
+        now = time.monotonic()
+        cached = self._cache.get(cache_key)
+        if cached and cached[0] > now:
+            self.stats['cache_hits'] += 1
+            estimate = cached[1]
+        else:
+            self.stats['estimates'] += 1
+            estimate = self._estimate(workflow_id, plan, input_data or {})
+            self._cache = {key: entry for key, entry in self._cache.items() if entry[0] > now}
+            self._cache[cache_key] = (now + settings.ESTIMATE_CACHE_SECONDS, estimate)
+
+        return {**estimate, "warnings": self._warnings(estimate["p95_seconds"])}
+
+    def _estimate(self, workflow_id: str, plan, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        summaries = self.histograms.summaries(list(dict.fromkeys(self._keys(workflow_id, plan.graph))))
+        resources = {"llm_tokens": 0, "oracle_rows": 0, "ssh_calls": 0}
+        nodes = self._estimate_nodes(workflow_id, plan.graph, summaries, input_data, resources, 1)
+        p50, p95, critical_path = self._longest_path(plan.graph, nodes)
+        source = "dag"
+
+        # Whole-run history beats summed node percentiles unless the input resizes a map
+        history = summaries[f"duration:workflow:{workflow_id}"]
+        sized_by_input = any(node.get("items_source") == "input" for node in nodes.values())
+        if history["count"] >= settings.ESTIMATE_MIN_SAMPLES and not sized_by_input:
+            p50, p95, source = history["p50"], history["p95"], "history"
+
+        p95_seconds = round(p95 / 1000, 1)
+        return {
+            "workflow_id": workflow_id,
+            "estimated_duration": int(math.ceil(p50 / 1000)),
+            "p50_seconds": round(p50 / 1000, 1),
+            "p95_seconds": p95_seconds,
+            "source": source,
+            "critical_path": critical_path,
+            "nodes": nodes,
+            "resources": resources,
+            "history": {
+                "runs": history["count"],
+                "p50_seconds": round(history["p50"] / 1000, 1) if history["p50"] is not None else None,
+                "p95_seconds": round(history["p95"] / 1000, 1) if history["p95"] is not None else None
+            }
+        }
+
+    def _estimate_nodes(self, workflow_id: str, graph: WorkflowGraph, summaries: Dict, input_data: Dict,
+                        resources: Dict[str, int], repeat: int) -> Dict[str, Dict[str, Any]]:
+        """Per-node p50 / p95 (ms); resources are added `repeat` times (items of a map)"""
+        nodes = {}
+        for node_id in graph.order:
+            node = graph.nodes[node_id]
+            node_type, config = node["type"], node.get("config", {})
+            rows_p50 = self._pick(summaries, [f"rows:node:{workflow_id}:{node_id}"], 0)[0]
+
+            if node_type in ("map", "parallel"):
+                nodes[node_id] = self._estimate_map(workflow_id, node, graph, nodes, summaries, input_data, resources)
+                continue
+
+            target = self._target(node_id, node_type)
+            keys = [f"duration:node:{workflow_id}:{node_id}"]
+            keys += [f"duration:target:{target}"] if target else []
+            keys += [f"duration:type:{node_type}"]
+            p50, p95, source = self._pick(summaries, keys, DEFAULT_NODE_MS.get(node_type, 100))
+            nodes[node_id] = {"type": node_type, "p50_ms": round(p50, 1), "p95_ms": round(p95, 1), "source": source}
+
+            if node_type == "oracle":
+                resources["oracle_rows"] += int(rows_p50) * repeat
+            elif node_type == "unix":
+                resources["ssh_calls"] += repeat
+            elif node_type == "llm":
+                prompt_tokens = len(config.get("prompt", "")) // 4
+                resources["llm_tokens"] += (prompt_tokens + int(config.get("max_tokens", DEFAULT_LLM_MAX_TOKENS))) * repeat
+        return nodes
+
+    def _estimate_map(self, workflow_id: str, node: Dict, graph: WorkflowGraph, nodes: Dict, summaries: Dict,
+                      input_data: Dict, resources: Dict[str, int]) -> Dict[str, Any]:
+        config = node.get("config", {})
+        source, _, path = config.get("items_from", "input.cusips").partition(".")
+        if source == "input" and isinstance(input_data.get(path), list):
+            items, items_source = len(input_data[path]), "input"
+        else:
+            keys = [f"rows:node:{workflow_id}:{source}", f"rows:node:{workflow_id}:{node['id']}"]
+            items, _, items_source = self._pick(summaries, keys, DEFAULT_MAP_ITEMS)
+            items = int(items)
+
+        child_graph = WorkflowGraph(config.get("nodes", []), config.get("edges", []))
+        batch_size = max(1, int(config.get("batch_size", 500)))
+        per_batch = min(items, batch_size) or 1
+        child_resources = {"llm_tokens": 0, "oracle_rows": 0, "ssh_calls": 0}
+        children = self._estimate_nodes(workflow_id, child_graph, summaries, input_data, child_resources, items)
+        for key, value in child_resources.items():
+            resources[key] += value
+
+        item_p50, item_p95, source_key = self._pick(
+            summaries, [f"duration:item:{workflow_id}:{node['id']}", "duration:type:map"], 0)
+        if source_key != "default":
+            p50, p95 = item_p50 * items, item_p95 * items
+        else:
+            # No history: batches run max_parallel at a time; per-item children item_parallel at a time
+            item_rounds = math.ceil(per_batch / max(1, int(config.get("item_parallel", 8))))
+            for child_id, child in child_graph.nodes.items():
+                bulk = child["type"] == "oracle" and child.get("config", {}).get("action") == "check_pricing_status"
+                if not bulk:
+                    children[child_id] = {**children[child_id],
+                                          "p50_ms": children[child_id]["p50_ms"] * item_rounds,
+                                          "p95_ms": children[child_id]["p95_ms"] * item_rounds}
+            batch_p50, batch_p95, _ = self._longest_path(child_graph, children)
+            rounds = math.ceil(math.ceil(items / batch_size) / max(1, int(config.get("max_parallel", 4))))
+            p50, p95 = batch_p50 * rounds, batch_p95 * rounds
+
+        return {
+            "type": node["type"], "p50_ms": round(p50, 1), "p95_ms": round(p95, 1), "source": source_key,
+            "items": items, "items_source": items_source, "children": children
+        }
+
+    @staticmethod
+    def _longest_path(graph: WorkflowGraph, nodes: Dict[str, Dict[str, Any]]) -> Tuple[float, float, List[str]]:
+        """(p50, p95, node ids) of the path with the largest summed p95"""
+        best: Dict[str, Tuple[float, float, List[str]]] = {}
+        for node_id in graph.order:
+            parents = [best[parent] for parent in graph.upstream[node_id]]
+            p50, p95, path = max(parents, key=lambda entry: entry[1]) if parents else (0.0, 0.0, [])
+            best[node_id] = (p50 + nodes[node_id]["p50_ms"], p95 + nodes[node_id]["p95_ms"], path + [node_id])
+        return max(best.values(), key=lambda entry: entry[1]) if best else (0.0, 0.0, [])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'cached': len(self._cache)}
+
+    @staticmethod
+    def _warnings(p95_seconds: float, now: Optional[datetime] = None) -> List[str]:
+        now = now or datetime.now()
+        start, end = settings.MARKET_HOURS.split("-")
+        in_market_hours = now.weekday() < 5 and start <= now.strftime("%H:%M") < end
+        if in_market_hours and p95_seconds >= settings.ESTIMATE_WARN_SECONDS:
+            return [f"Estimated p95 of {p95_seconds / 60:.1f} min during market hours ({settings.MARKET_HOURS})"]
+        return []
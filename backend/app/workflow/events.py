@@ -0,0 +1,217 @@
+"""
+Execution Event Hub - Coalesced, per-execution websocket event stream
+Each event is serialized once, large node results are sent as a reference,
+and every client has its own bounded queue so a slow browser cannot stall
+the orchestrator
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import Dict, Any, List, Optional, Iterable
+from fastapi import WebSocket
+from config import settings
+from workflow.spill import ResultSpillStore, result_reference
+
+
+# Only the latest event per (type, execution) is kept inside one coalescing window;
+# these are also the only events dropped under backpressure
+COALESCED_EVENTS = {"execution_status", "node_progress"}
+
+
+def encoded_size(value: Any, limit: int) -> int:
+    """JSON size of a value, encoded only until it passes limit"""
+    size = 0
+    for chunk in json.JSONEncoder(default=str).iterencode(value):
+        size += len(chunk)
+        if size > limit:
+            break
+    return size
+
+
+class EventSubscriber:
+    """One websocket client with its subscriptions and pending event queue"""
+
+    def __init__(self, websocket: WebSocket, execution_ids: Optional[Iterable[str]], max_queue: int):
+        self.websocket = websocket
+        self.subscriptions = set(execution_ids or ["*"])
+        self.max_queue = max_queue
+        self.queue: deque = deque()
+        self.wakeup = asyncio.Event()
+        self.dropped = 0
+        self.overflowed = 0
+        self.sent = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def wants(self, execution_id: Optional[str]) -> bool:
+        return "*" in self.subscriptions or execution_id in self.subscriptions
+
+    def push(self, event_type: str, key: Optional[tuple], encoded: str):
+        """
+        Queue an encoded event, dropping the oldest coalescible progress event
+        when full. Node and execution state transitions are never dropped; with
+        none of those left to drop the queue grows past max_queue (overflowed).
+        """
+        if len(self.queue) >= self.max_queue:
+            for index, (queued_type, _, _) in enumerate(self.queue):
+                if queued_type in COALESCED_EVENTS:
+                    del self.queue[index]
+                    self.dropped += 1
+                    break
+            else:
+                self.overflowed += 1
+
+        self.queue.append((event_type, key, encoded))
+        self.wakeup.set()
+
+    def drain(self) -> List[str]:
+        """Take everything queued, keeping only the latest of each coalesced key"""
+        events = list(self.queue)
+        self.queue.clear()
+        self.wakeup.clear()
+
+        latest = {}
+        for index, (_, key, _) in enumerate(events):
+            if key is not None:
+                latest[key] = index
+
+        return [
+            encoded for index, (_, key, encoded) in enumerate(events)
+            if key is None or latest[key] == index
+        ]
+
+
+class ExecutionEventHub:
+    """
+    Drop-in replacement for a broadcast-to-all connection manager
+
+    - Clients subscribe to specific executions (or "*" for all)
+    - Events are flushed per client every `coalesce_ms` as one batch frame
+    - Node results above `inline_result_bytes` are replaced by a reference to
+      GET /api/executions/{id}/nodes/{node_id}/result. Spill handles already
+      are such a reference (with the full size_bytes) and go out as-is; other
+      results are only encoded up to the limit (size_bytes stays None)
+    - execution_completed only carries per-node status since results were
+      already streamed
+    """
+
+    def __init__(
+        self,
+        coalesce_ms: Optional[int] = None,
+        inline_result_bytes: Optional[int] = None,
+        client_queue_size: Optional[int] = None
+    ):
+        self.coalesce_ms = coalesce_ms if coalesce_ms is not None else settings.EVENT_COALESCE_MS
+        self.inline_result_bytes = inline_result_bytes or settings.EVENT_INLINE_RESULT_BYTES
+        self.client_queue_size = client_queue_size or settings.EVENT_CLIENT_QUEUE_SIZE
+        self.subscribers: Dict[WebSocket, EventSubscriber] = {}
+        self.stats = {
+            'events': 0,
+            'results_by_reference': 0,
+            'frames_sent': 0
+        }
+
+    # ========================================================================
+    # CONNECTIONS
+    # ========================================================================
+
+    async def connect(self, websocket: WebSocket, execution_ids: Optional[Iterable[str]] = None) -> EventSubscriber:
+        await websocket.accept()
+        subscriber = EventSubscriber(websocket, execution_ids, self.client_queue_size)
+        subscriber.task = asyncio.ensure_future(self._sender(subscriber))
+        self.subscribers[websocket] = subscriber
+        return subscriber
+
+    def disconnect(self, websocket: WebSocket):
+        subscriber = self.subscribers.pop(websocket, None)
+        if subscriber and subscriber.task:
+            subscriber.task.cancel()
+
+    def handle_client_message(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Apply {"action": "subscribe"|"unsubscribe", "execution_id": ...} from a client"""
+        subscriber = self.subscribers.get(websocket)
+        if not subscriber or not message.get("execution_id"):
+            return
+
+        execution_id = message["execution_id"]
+        if message.get("action") == "subscribe":
+            subscriber.subscriptions.discard("*")
+            subscriber.subscriptions.add(execution_id)
+        elif message.get("action") == "unsubscribe":
+            subscriber.subscriptions.discard(execution_id)
+
+    # ========================================================================
+    # PUBLISHING
+    # ========================================================================
+
+    async def broadcast(self, message: Dict[str, Any]):
+        """Compact, encode once and enqueue for every interested client"""
+        self.stats['events'] += 1
+        execution_id = message.get("execution_id")
+        targets = [s for s in self.subscribers.values() if s.wants(execution_id)]
+        if not targets:
+            return
+
+        message = self._compact(message)
+        encoded = json.dumps(message, default=str)
+        event_type = message.get("type", "")
+        key = (event_type, execution_id, message.get("node_id")) if event_type in COALESCED_EVENTS else None
+
+        for subscriber in targets:
+            subscriber.push(event_type, key, encoded)
+
+    def _compact(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        event_type = message.get("type")
+
+        if event_type == "node_completed" and ResultSpillStore.is_handle(message.get("result")):
+            self.stats['results_by_reference'] += 1
+
+        elif event_type == "node_completed" and "result" in message:
+            if encoded_size(message["result"], self.inline_result_bytes) > self.inline_result_bytes:
+                # Only known to exceed the limit; the full size is not measured
+                self.stats['results_by_reference'] += 1
+                message = dict(message)
+                message["result"] = result_reference(
+                    message["execution_id"], message["node_id"], message["result"], None
+                )
+
+        elif event_type == "execution_completed" and "results" in message:
+            message = dict(message)
+            results = message.pop("results") or {}
+            message["node_status"] = {
+                node_id: (result.get("success", True) if isinstance(result, dict) else True)
+                for node_id, result in results.items()
+            }
+
+        return message
+
+    async def _sender(self, subscriber: EventSubscriber):
+        """Per-client loop: wait for events, let the window fill, send one batch"""
+        try:
+            while True:
+                await subscriber.wakeup.wait()
+                if self.coalesce_ms:
+                    await asyncio.sleep(self.coalesce_ms / 1000)
+
+                events = subscriber.drain()
+                if not events:
+                    continue
+
+                await subscriber.websocket.send_text('{"type":"batch","events":[' + ','.join(events) + ']}')
+                subscriber.sent += len(events)
+                self.stats['frames_sent'] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.subscribers.pop(subscriber.websocket, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'subscribers': len(self.subscribers),
+            'queued': sum(len(s.queue) for s in self.subscribers.values()),
+            'dropped': sum(s.dropped for s in self.subscribers.values()),
+            'overflowed': sum(s.overflowed for s in self.subscribers.values()),
+            'coalesce_ms': self.coalesce_ms,
+            'inline_result_bytes': self.inline_result_bytes
+        }
@@ -0,0 +1,276 @@
+"""
+Workflow Executor - Dependency-aware parallel execution of workflow nodes
+Builds the node graph from workflow edges and runs every ready node concurrently
+"""
+
+import asyncio
+from typing import Dict, Any, List, Callable, Awaitable, Optional
+
+from workflow.control import ExecutionHandle, ExecutionTimeout, new_interrupt_key
+from workflow.conditions import normalize_branch_label
+from workflow.streams import RowStream
+
+
+class WorkflowGraph:
+    """
+    Directed acyclic graph of workflow nodes built from the edge list
+
+    Nodes without incoming edges are roots and start immediately.
+    A node becomes ready once every upstream node has finished.
+    Edges leaving a condition node may carry a "true"/"false" label and
+    are only followed when the condition took that branch.
+    """
+
+    def __init__(self, nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        for node in nodes:
+            if node["id"] in self.nodes:
+                raise ValueError(f"Duplicate node id: {node['id']}")
+            self.nodes[node["id"]] = node
+
+        self.upstream: Dict[str, List[str]] = {node_id: [] for node_id in self.nodes}
+        self.downstream: Dict[str, List[str]] = {node_id: [] for node_id in self.nodes}
+        self.edge_labels: Dict[tuple, str] = {}
+
+        for edge in edges or []:
+            source, target = edge["source"], edge["target"]
+            if source not in self.nodes or target not in self.nodes:
+                raise ValueError(f"Edge {edge.get('id', '')} references unknown node: {source} -> {target}")
+            if source not in self.upstream[target]:
+                self.upstream[target].append(source)
+                self.downstream[source].append(target)
+            if edge.get("label") and self.nodes[source].get("type") == "condition":
+                self.edge_labels[(source, target)] = normalize_branch_label(edge["label"])
+
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Kahn's algorithm; keeps the original node order among peers"""
+        remaining = {node_id: len(parents) for node_id, parents in self.upstream.items()}
+        ready = [node_id for node_id in self.nodes if remaining[node_id] == 0]
+        order = []
+
+        while ready:
+            node_id = ready.pop(0)
+            order.append(node_id)
+            for child in self.downstream[node_id]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
+
+        if len(order) != len(self.nodes):
+            cyclic = [node_id for node_id in self.nodes if node_id not in order]
+            raise ValueError(f"Workflow graph contains a cycle: {', '.join(cyclic)}")
+
+        return order
+
+    def edge_taken(self, source: str, target: str, result: Any) -> bool:
+        """Whether the edge source -> target is live given the source's result"""
+        label = self.edge_labels.get((source, target))
+        if label is None:
+            return True
+        if not isinstance(result, dict):
+            return False
+        # Map sub-flows report every branch some item took
+        branches = result.get("branches")
+        if branches is None:
+            branches = [result.get("branch")] if result.get("branch") is not None else []
+        return label in {normalize_branch_label(branch) for branch in branches}
+
+    @property
+    def roots(self) -> List[str]:
+        return [node_id for node_id in self.order if not self.upstream[node_id]]
+
+    @classmethod
+    def from_workflow(cls, workflow: Dict[str, Any]) -> "WorkflowGraph":
+        return cls(workflow.get("nodes", []), workflow.get("edges", []))
+
+
+class DAGExecutor:
+    """
+    Runs a WorkflowGraph with asyncio
+
+    Every node whose dependencies are satisfied is started at once, so
+    independent branches (e.g. Oracle plus several Unix hosts) overlap and
+    wall-clock time follows the longest path instead of the sum of all hops.
+    Each node only receives the results of its direct upstream nodes.
+
+    With an ExecutionHandle, each node waits while the execution is paused
+    and is cancelled (and its blocking call interrupted) when it overruns.
+
+    Branch pruning: a node whose incoming edges are all dead (untaken
+    condition branches or skipped parents) is never scheduled; it is recorded
+    in `skipped` and its own outgoing edges become dead in turn. A node with
+    at least one live input runs with the results of its live parents only.
+
+    Streaming: a node may return {"stream": RowStream, ...} as soon as its
+    first rows are on the way. If every child is waiting only on that node,
+    the children start right away with one stream reader each and the node
+    completes when the stream ends; otherwise the stream is materialized
+    first, as if the node had returned all rows at once, and the full result
+    is passed to on_stream_materialized before the node completes.
+    """
+
+    def __init__(
+        self,
+        graph: WorkflowGraph,
+        run_node: Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        on_node_completed: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+        handle: Optional[ExecutionHandle] = None,
+        on_node_skipped: Optional[Callable[[str], Awaitable[None]]] = None,
+        on_stream_materialized: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+    ):
+        self.graph = graph
+        self.run_node = run_node
+        self.on_node_completed = on_node_completed
+        self.on_node_skipped = on_node_skipped
+        self.on_stream_materialized = on_stream_materialized
+        self.handle = handle
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.skipped: List[str] = []
+        self._live_parents: Dict[str, List[str]] = {node_id: [] for node_id in graph.nodes}
+        self._open_streams: set = set()
+        self._materializing: set = set()
+
+    async def run(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Execute all nodes respecting dependencies
+
+        Returns:
+            Dictionary of node_id -> result. If a node raises, the remaining
+            running nodes are cancelled and the exception propagates.
+        """
+        self._remaining = {node_id: len(parents) for node_id, parents in self.graph.upstream.items()}
+        running: Dict[asyncio.Task, str] = {}
+
+        for node_id in self.graph.roots:
+            running[self._start(node_id)] = node_id
+
+        try:
+            while running:
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    node_id = running.pop(task)
+                    result = task.result()
+
+                    if node_id in self._open_streams:
+                        # Stream ended; its children were started when it opened
+                        self._open_streams.discard(node_id)
+                        self.results[node_id] = result
+                        if self.on_node_completed:
+                            await self.on_node_completed(node_id, result)
+                        continue
+
+                    if node_id in self._materializing:
+                        self._materializing.discard(node_id)
+                        if self.on_stream_materialized:
+                            await self.on_stream_materialized(node_id, result)
+
+                    self.results[node_id] = result
+                    stream = result.get("stream") if isinstance(result, dict) else None
+                    if isinstance(stream, RowStream):
+                        running[self._start_stream(node_id, stream)] = node_id
+                        if node_id not in self._open_streams:
+                            continue
+                    elif self.on_node_completed:
+                        await self.on_node_completed(node_id, result)
+
+                    ready = []
+                    for child in self.graph.downstream[node_id]:
+                        if self.graph.edge_taken(node_id, child, result):
+                            self._live_parents[child].append(node_id)
+                        ready.extend(self._resolve_input(child))
+
+                    for child in await self._prune(ready):
+                        running[self._start(child)] = child
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running.keys(), return_exceptions=True)
+
+        return self.results
+
+    def _start_stream(self, node_id: str, stream: RowStream) -> asyncio.Task:
+        """Open a stream to the children if they can all start now, else materialize it"""
+        children = self.graph.downstream[node_id]
+        if children and all(self._remaining[child] == 1 for child in children):
+            stream.open(len(children))
+            self._open_streams.add(node_id)
+            return asyncio.ensure_future(self._await_stream(stream))
+        self._materializing.add(node_id)
+        return asyncio.ensure_future(self._guard_stream(stream, stream.collect()))
+
+    async def _await_stream(self, stream: RowStream) -> Dict[str, Any]:
+        return await self._guard_stream(stream, stream.result())
+
+    async def _guard_stream(self, stream: RowStream, waiter: Awaitable) -> Dict[str, Any]:
+        """Bound a stream by the workflow deadline; abort it on timeout or cancellation"""
+        try:
+            if self.handle is None:
+                return await waiter
+            waiter = asyncio.ensure_future(waiter)
+            while True:
+                done, _ = await asyncio.wait({waiter}, timeout=max(self.handle.remaining(), 0.001))
+                if done:
+                    return waiter.result()
+                if self.handle.remaining() <= 0:
+                    waiter.cancel()
+                    raise ExecutionTimeout(f"Workflow timed out after {self.handle.timeout}s (stream {stream.name})")
+        except BaseException:
+            stream.abort()
+            if isinstance(waiter, asyncio.Future):
+                waiter.cancel()
+            raise
+
+    def _resolve_input(self, node_id: str) -> List[str]:
+        """Count one resolved input; returns [node_id] once all inputs are resolved"""
+        self._remaining[node_id] -= 1
+        return [node_id] if self._remaining[node_id] == 0 else []
+
+    async def _prune(self, ready: List[str]) -> List[str]:
+        """Skip ready nodes without live inputs (transitively); return the ones to start"""
+        to_start = []
+        while ready:
+            node_id = ready.pop(0)
+            if self._live_parents[node_id]:
+                to_start.append(node_id)
+                continue
+
+            self.skipped.append(node_id)
+            if self.on_node_skipped:
+                await self.on_node_skipped(node_id)
+            for child in self.graph.downstream[node_id]:
+                ready.extend(self._resolve_input(child))
+        return to_start
+
+    def _start(self, node_id: str) -> asyncio.Task:
+        node = self.graph.nodes[node_id]
+        upstream_results = {
+            parent: self.results[parent]
+            for parent in self._live_parents[node_id]
+        }
+        return asyncio.ensure_future(self._run_controlled(node, upstream_results))
+
+    async def _run_controlled(self, node: Dict[str, Any], upstream_results: Dict[str, Any]) -> Dict[str, Any]:
+        if self.handle is None:
+            return await self.run_node(node, upstream_results)
+
+        await self.handle.checkpoint()
+        timeout = self.handle.node_timeout(node.get("config", {}))
+        key = new_interrupt_key(node["id"])  # this task's context only
+
+        try:
+            return await asyncio.wait_for(self.run_node(node, upstream_results), timeout)
+        except asyncio.TimeoutError:
+            self.handle.interrupt(key)
+            if self.handle.remaining() <= 0:
+                raise ExecutionTimeout(f"Workflow timed out after {self.handle.timeout}s (node {node['id']})")
+            return {
+                "success": False,
+                "error": f"Node timed out after {timeout:.1f}s",
+                "timed_out": True
+            }
+        finally:
+            self.handle.unregister_interrupts(key)
@@ -0,0 +1,111 @@
+"""
+Node Result Cache - Content-addressed memoization of deterministic nodes
+Opt-in per node with config {"cache": true}, for read-only nodes only; the key
+covers everything the result depends on, so a hit is always safe to reuse
+until its TTL expires
+"""
+
+import hashlib
+import json
+import re
+from typing import Dict, Any, Optional
+from config import settings
+from workflow.tracing import span
+
+
+# Actions that only read state; a cache hit on anything else would skip a write
+READ_ONLY_ACTIONS = {
+    "oracle": ("query", "check_pricing_status", "check_pricing_status_bulk"),
+    "unix": ("check_pricing_job_logs",)
+}
+DEFAULT_ACTIONS = {"oracle": "query", "unix": "execute_command"}
+SELECT_SQL = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+
+
+def memoizable(node_type: str, config: Dict[str, Any]) -> bool:
+    """Whether a node may set {"cache": true}: LLM nodes, SELECTs and status checks"""
+    if node_type == "llm":
+        return True
+    action = config.get("action", DEFAULT_ACTIONS.get(node_type))
+    if action not in READ_ONLY_ACTIONS.get(node_type, ()):
+        return False
+    sql = config.get("sql") or config.get("query")
+    return action != "query" or not sql or bool(SELECT_SQL.match(sql))
+
+
+class NodeResultCache:
+    """
+    Memoizes node results in the CacheManager under node_result:{hash}
+
+    Key = sha256(node type, config, input data, upstream result digests, credential fingerprint)
+    TTL = config["cache_ttl"] or the per-type default (CACHE_*_TTL settings)
+    """
+
+    def __init__(self, cache_manager):
+        self.cache_manager = cache_manager
+        self.ttls = {
+            "oracle": settings.CACHE_ORACLE_QUERY_TTL,
+            "unix": settings.CACHE_UNIX_COMMAND_TTL,
+            "llm": settings.CACHE_LLM_RESPONSE_TTL
+        }
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'too_large': 0
+        }
+
+    @staticmethod
+    def enabled_for(node: Dict[str, Any]) -> bool:
+        config = node.get("config", {})
+        return bool(config.get("cache")) and memoizable(node.get("type"), config)
+
+    def ttl_for(self, node: Dict[str, Any]) -> int:
+        config = node.get("config", {})
+        return int(config.get("cache_ttl") or self.ttls.get(node.get("type"), settings.CACHE_NODE_RESULT_TTL))
+
+    @staticmethod
+    def key_for(node: Dict[str, Any], input_data: Dict[str, Any], upstream_digests: Dict[str, str],
+                credential_fingerprint: Optional[str] = None) -> str:
+        content = json.dumps({
+            "type": node.get("type"),
+            "config": {k: v for k, v in node.get("config", {}).items() if k not in ("cache", "cache_ttl", "timeout")},
+            "input_data": input_data,
+            "upstream": upstream_digests,
+            "credentials": credential_fingerprint
+        }, sort_keys=True, default=str)
+        return f"node_result:{hashlib.sha256(content.encode()).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with span("cache.node_result") as lookup:
+            data = self.cache_manager.get(key)
+            lookup.set(hit=bool(data), bytes=len(data) if data else 0)
+        if data:
+            self.stats['hits'] += 1
+            return json.loads(data)
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, node: Dict[str, Any], result: Dict[str, Any]):
+        """
+        Store a result; failed results are never memoized, nor results above
+        RESULT_SPILL_BYTES (those belong in the spill store, not a second copy)
+        """
+        if not isinstance(result, dict) or result.get("success") is False:
+            return
+        chunks, size = [], 0
+        for chunk in json.JSONEncoder(default=str).iterencode(result):
+            size += len(chunk)
+            if size > settings.RESULT_SPILL_BYTES:
+                self.stats['too_large'] += 1
+                return
+            chunks.append(chunk)
+        self.cache_manager.set(key, "".join(chunks), self.ttl_for(node))
+        self.stats['stores'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': round(self.stats['hits'] / total, 3) if total else 0.0
+        }
@@ -0,0 +1,281 @@
+"""
+Executor Pools - Bounded thread pools for blocking MCP calls
+cx_Oracle and paramiko block the calling thread, so every call is routed
+through a per-backend pool instead of running on the event loop.
+CPU-bound steps (compression passes, report generation) go to the "cpu"
+lane, a process pool, so they neither hold the event loop's GIL nor queue
+behind each other on one core
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, Any, Callable, List, Tuple
+from datetime import datetime
+from config import settings
+
+
+class BlockingCallPool:
+    """
+    Thread pool for one backend type with queue depth and saturation tracking
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self._lock = threading.Lock()
+        self.stats = {
+            'queued': 0,
+            'active': 0,
+            'completed': 0,
+            'failed': 0,
+            'peak_queued': 0,
+            'total_wait_ms': 0.0
+        }
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable in the pool and await its result"""
+        submitted_at = datetime.now()
+
+        with self._lock:
+            self.stats['queued'] += 1
+            self.stats['peak_queued'] = max(self.stats['peak_queued'], self.stats['queued'])
+
+        def tracked():
+            wait_ms = (datetime.now() - submitted_at).total_seconds() * 1000
+            with self._lock:
+                self.stats['queued'] -= 1
+                self.stats['active'] += 1
+                self.stats['total_wait_ms'] += wait_ms
+            try:
+                result = func(*args, **kwargs)
+                with self._lock:
+                    self.stats['completed'] += 1
+                return result
+            except Exception:
+                with self._lock:
+                    self.stats['failed'] += 1
+                raise
+            finally:
+                with self._lock:
+                    self.stats['active'] -= 1
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, tracked)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics"""
+        with self._lock:
+            stats = dict(self.stats)
+
+        finished = stats['completed'] + stats['failed']
+        return {
+            'name': self.name,
+            'max_workers': self.max_workers,
+            'queued': stats['queued'],
+            'active': stats['active'],
+            'completed': stats['completed'],
+            'failed': stats['failed'],
+            'peak_queued': stats['peak_queued'],
+            'saturation': round(stats['active'] / self.max_workers, 3) if self.max_workers else 0.0,
+            'saturated': stats['active'] >= self.max_workers and stats['queued'] > 0,
+            'average_wait_ms': round(stats['total_wait_ms'] / finished, 2) if finished else 0.0
+        }
+
+    def shutdown(self, wait: bool = False):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class SharedPayload:
+    """
+    A large str / bytes argument placed in shared memory for a worker process
+
+    Only the segment name crosses the process boundary; the worker copies the
+    bytes out once instead of receiving them pickled through the pool's pipe.
+    """
+
+    def __init__(self, data):
+        self.is_text = isinstance(data, str)
+        raw = data.encode() if self.is_text else data
+        self.size = len(raw)
+        self._segment = shared_memory.SharedMemory(create=True, size=max(self.size, 1))
+        self._segment.buf[:self.size] = raw
+        self.name = self._segment.name
+
+    def __getstate__(self):
+        return {"name": self.name, "size": self.size, "is_text": self.is_text}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._segment = None
+
+    def load(self):
+        """Read the payload (in the worker process)"""
+        # Pool workers share the parent's resource tracker; the parent unlinks
+        segment = shared_memory.SharedMemory(name=self.name)
+        try:
+            raw = bytes(segment.buf[:self.size])
+        finally:
+            segment.close()
+        return raw.decode() if self.is_text else raw
+
+    def release(self):
+        if self._segment is not None:
+            self._segment.close()
+            self._segment.unlink()
+            self._segment = None
+
+
+def _usable_cores() -> int:
+    """Cores this process may run on (container CPU sets included)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def _run_in_process(func: Callable, args: tuple, kwargs: dict) -> Tuple[Any, float]:
+    """Worker-side entry point: resolve shared payloads, run, report when it started"""
+    started_at = time.time()
+    args = tuple(arg.load() if isinstance(arg, SharedPayload) else arg for arg in args)
+    kwargs = {key: value.load() if isinstance(value, SharedPayload) else value for key, value in kwargs.items()}
+    return func(*args, **kwargs), started_at
+
+
+class ProcessCallPool:
+    """
+    Process pool lane for CPU-bound callables
+
+    func must be a module-level function (it is pickled by reference) and its
+    arguments and result picklable. str / bytes arguments of at least
+    CPU_POOL_SHARED_MEMORY_BYTES travel through shared memory. Same stats as
+    BlockingCallPool; a crashed worker breaks the pool, which is rebuilt.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._context = multiprocessing.get_context(settings.CPU_POOL_START_METHOD)
+        self.executor = self._new_executor()
+        self._lock = threading.Lock()
+        self.stats = {
+            'in_flight': 0,
+            'completed': 0,
+            'failed': 0,
+            'peak_in_flight': 0,
+            'total_wait_ms': 0.0,
+            'shared_payloads': 0,
+            'restarts': 0
+        }
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._context)
+
+    def _share(self, value: Any, shared: List[SharedPayload]) -> Any:
+        if isinstance(value, (str, bytes)) and len(value) >= settings.CPU_POOL_SHARED_MEMORY_BYTES:
+            payload = SharedPayload(value)
+            shared.append(payload)
+            return payload
+        return value
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a CPU-bound callable in a worker process and await its result"""
+        submitted_at = time.time()
+        shared: List[SharedPayload] = []
+        args = tuple(self._share(arg, shared) for arg in args)
+        kwargs = {key: self._share(value, shared) for key, value in kwargs.items()}
+
+        with self._lock:
+            self.stats['in_flight'] += 1
+            self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.stats['in_flight'])
+            self.stats['shared_payloads'] += len(shared)
+
+        executor = self.executor
+        loop = asyncio.get_running_loop()
+        try:
+            result, started_at = await loop.run_in_executor(executor, _run_in_process, func, args, kwargs)
+            with self._lock:
+                self.stats['completed'] += 1
+                self.stats['total_wait_ms'] += max(0.0, started_at - submitted_at) * 1000
+            return result
+        except BrokenProcessPool:
+            with self._lock:
+                self.stats['failed'] += 1
+                if self.executor is executor:
+                    self.executor = self._new_executor()
+                    self.stats['restarts'] += 1
+                    print(f"✗ {self.name} process pool broke (worker died) - restarted")
+            raise
+        except Exception:
+            with self._lock:
+                self.stats['failed'] += 1
+            raise
+        finally:
+            with self._lock:
+                self.stats['in_flight'] -= 1
+            for payload in shared:
+                payload.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+
+        active = min(stats['in_flight'], self.max_workers)
+        return {
+            'name': self.name,
+            'kind': 'process',
+            'max_workers': self.max_workers,
+            'queued': stats['in_flight'] - active,
+            'active': active,
+            'completed': stats['completed'],
+            'failed': stats['failed'],
+            'peak_queued': max(0, stats['peak_in_flight'] - self.max_workers),
+            'saturation': round(active / self.max_workers, 3) if self.max_workers else 0.0,
+            'saturated': stats['in_flight'] > self.max_workers,
+            'average_wait_ms': round(stats['total_wait_ms'] / stats['completed'], 2) if stats['completed'] else 0.0,
+            'shared_payloads': stats['shared_payloads'],
+            'restarts': stats['restarts']
+        }
+
+    def shutdown(self, wait: bool = False):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class ExecutorPools:
+    """
+    Registry of per-backend pools so a slow Oracle query cannot starve SSH calls
+    """
+
+    def __init__(self):
+        self.pools = {
+            'oracle': BlockingCallPool('oracle', settings.ORACLE_POOL_WORKERS),
+            'unix': BlockingCallPool('unix', settings.UNIX_POOL_WORKERS),
+            'report': BlockingCallPool('report', settings.REPORT_POOL_WORKERS),
+            'cpu': ProcessCallPool('cpu', settings.CPU_POOL_WORKERS or _usable_cores())
+        }
+        print(f"✓ Executor pools initialized: "
+              f"{', '.join(f'{name}={pool.max_workers}' for name, pool in self.pools.items())}")
+
+    def get(self, backend: str) -> BlockingCallPool:
+        if backend not in self.pools:
+            raise KeyError(f"No executor pool for backend: {backend}")
+        return self.pools[backend]
+
+    async def run(self, backend: str, func: Callable, *args, **kwargs) -> Any:
+        """Route a blocking call to the pool for its backend"""
+        return await self.get(backend).run(func, *args, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: pool.get_stats() for name, pool in self.pools.items()}
+
+    def shutdown(self):
+        for pool in self.pools.values():
+            pool.shutdown()
+
+# Global executor pools instance
+executor_pools = ExecutorPools()
@@ -0,0 +1,315 @@
+"""
+Execution Queue - Redis Streams transport between API processes and workers
+API processes XADD execution jobs (one stream per priority class); worker
+processes (app/worker.py) read them through one consumer group, ack when the
+execution ends, and reclaim entries left pending by a worker that died.
+Events and control commands travel over Redis pub/sub.
+"""
+
+import json
+import os
+import socket
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+import redis.asyncio as aioredis
+from config import settings
+from workflow.scheduler import PRIORITIES, DEFAULT_PRIORITY, SchedulerSaturatedError
+
+
+EVENTS_CHANNEL = "workflow:events"
+CONTROL_CHANNEL = "workflow:control"
+
+# Execution statuses that mean the job is still owned by the queue or a worker
+ACTIVE_STATUSES = {"queued", "running", "paused"}
+
+
+def redis_client() -> aioredis.Redis:
+    return aioredis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        password=settings.REDIS_PASSWORD,
+        decode_responses=True
+    )
+
+
+class ExecutionQueue:
+    """
+    Redis Streams execution queue with a consumer group
+
+    - enqueue(): XADD to {prefix}:{priority}
+    - read(): XREADGROUP, highest priority stream first
+    - ack(): XACK + XDEL, so XLEN is the number of queued + in-flight jobs
+    - heartbeat(): XCLAIM own entries to reset their idle time while running
+    - reclaim(): XAUTOCLAIM entries idle past EXECUTION_RECLAIM_IDLE_MS;
+      after EXECUTION_MAX_DELIVERIES they go to {prefix}:dead instead
+    """
+
+    def __init__(
+        self,
+        client: Optional[aioredis.Redis] = None,
+        prefix: Optional[str] = None,
+        group: Optional[str] = None,
+        consumer: Optional[str] = None
+    ):
+        self.redis = client or redis_client()
+        self.prefix = prefix or settings.EXECUTION_STREAM
+        self.group = group or settings.EXECUTION_GROUP
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.streams = [f"{self.prefix}:{name}" for name in sorted(PRIORITIES, key=PRIORITIES.get)]
+        self.dead_stream = f"{self.prefix}:dead"
+        self.stats = {
+            'enqueued': 0,
+            'read': 0,
+            'acked': 0,
+            'reclaimed': 0,
+            'dead_lettered': 0
+        }
+
+    def stream_for(self, priority: str) -> str:
+        return f"{self.prefix}:{priority}"
+
+    async def ensure_groups(self):
+        for stream in self.streams:
+            try:
+                await self.redis.xgroup_create(stream, self.group, id="0", mkstream=True)
+            except aioredis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def backlog(self) -> int:
+        """Jobs queued or in flight across all priority streams"""
+        pipe = self.redis.pipeline()
+        for stream in self.streams:
+            pipe.xlen(stream)
+        return sum(await pipe.execute())
+
+    async def enqueue(self, job: Dict[str, Any]) -> str:
+        """
+        Add a job to its priority stream
+
+        Raises:
+            SchedulerSaturatedError: past MAX_QUEUED_WORKFLOWS queued or in-flight jobs
+        """
+        backlog = await self.backlog()
+        if backlog >= settings.MAX_QUEUED_WORKFLOWS:
+            raise SchedulerSaturatedError(f"Execution queue is full ({backlog} queued or running)")
+
+        entry_id = await self.redis.xadd(
+            self.stream_for(job["priority"]),
+            {"job": json.dumps(job, default=str)},
+            maxlen=settings.EXECUTION_STREAM_MAXLEN,
+            approximate=True
+        )
+        self.stats['enqueued'] += 1
+        return entry_id
+
+    @staticmethod
+    def _decode(entries) -> List[Tuple[str, str, Dict[str, Any]]]:
+        jobs = []
+        for stream, messages in entries or []:
+            for entry_id, fields in messages:
+                if fields and "job" in fields:
+                    jobs.append((stream, entry_id, json.loads(fields["job"])))
+        return jobs
+
+    async def read(self, count: int, block_ms: int = 5000) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Up to `count` new jobs as (stream, entry_id, job), blocking up to block_ms"""
+        jobs = []
+        for stream in self.streams:
+            entries = await self.redis.xreadgroup(self.group, self.consumer, {stream: ">"}, count=count - len(jobs))
+            jobs.extend(self._decode(entries))
+            if len(jobs) >= count:
+                break
+        if jobs:
+            self.stats['read'] += len(jobs)
+            return jobs
+
+        entries = await self.redis.xreadgroup(
+            self.group, self.consumer, {stream: ">" for stream in self.streams},
+            count=count, block=block_ms
+        )
+        jobs = self._decode(entries)
+        self.stats['read'] += len(jobs)
+        return jobs
+
+    async def ack(self, stream: str, entry_id: str):
+        pipe = self.redis.pipeline()
+        pipe.xack(stream, self.group, entry_id)
+        pipe.xdel(stream, entry_id)
+        await pipe.execute()
+        self.stats['acked'] += 1
+
+    async def heartbeat(self, entries: List[Tuple[str, str]]):
+        """Reset the idle time of entries this consumer is still working on"""
+        by_stream: Dict[str, List[str]] = {}
+        for stream, entry_id in entries:
+            by_stream.setdefault(stream, []).append(entry_id)
+        for stream, entry_ids in by_stream.items():
+            await self.redis.xclaim(stream, self.group, self.consumer, 0, entry_ids, justid=True)
+
+    async def reclaim(self, min_idle_ms: Optional[int] = None, count: int = 10) -> Tuple[List, List[Dict[str, Any]]]:
+        """
+        Take over jobs whose worker stopped heartbeating
+
+        Streams are scanned in priority order, each XAUTOCLAIM cursor followed
+        until it wraps to 0-0 (Redis only scans ~10 x COUNT pending entries
+        per call), and at most `count` jobs are reclaimed in total.
+
+        Returns:
+            (reclaimed, dead): reclaimed (stream, entry_id, job) tuples to run
+            with resume=True, and jobs moved to the dead-letter stream
+        """
+        min_idle_ms = min_idle_ms or settings.EXECUTION_RECLAIM_IDLE_MS
+        reclaimed, dead = [], []
+        for stream in self.streams:
+            cursor = "0-0"
+            while len(reclaimed) < count:
+                response = await self.redis.xautoclaim(
+                    stream, self.group, self.consumer, min_idle_ms, start_id=cursor, count=count - len(reclaimed)
+                )
+                for _, entry_id, job in self._decode([(stream, response[1])]):
+                    pending = await self.redis.xpending_range(stream, self.group, entry_id, entry_id, 1)
+                    deliveries = pending[0]["times_delivered"] if pending else 1
+                    if deliveries > settings.EXECUTION_MAX_DELIVERIES:
+                        await self._dead_letter(stream, entry_id, job, deliveries)
+                        dead.append(job)
+                        continue
+                    job["resume"] = True  # continue from the node checkpoints of the lost run
+                    reclaimed.append((stream, entry_id, job))
+
+                cursor = response[0]
+                if cursor in ("0-0", b"0-0"):
+                    break
+
+        self.stats['reclaimed'] += len(reclaimed)
+        return reclaimed, dead
+
+    async def _dead_letter(self, stream: str, entry_id: str, job: Dict[str, Any], deliveries: int):
+        await self.redis.xadd(self.dead_stream, {
+            "job": json.dumps(job, default=str),
+            "source": stream,
+            "deliveries": deliveries,
+            "dead_at": datetime.now().isoformat()
+        }, maxlen=settings.EXECUTION_STREAM_MAXLEN, approximate=True)
+        await self.ack(stream, entry_id)
+        self.stats['dead_lettered'] += 1
+
+    async def get_stats(self) -> Dict[str, Any]:
+        streams = {}
+        for stream in self.streams:
+            try:
+                groups = await self.redis.xinfo_groups(stream)
+            except aioredis.ResponseError:
+                groups = []
+            group = next((g for g in groups if g["name"] == self.group), {})
+            streams[stream] = {
+                "length": await self.redis.xlen(stream),
+                "pending": group.get("pending", 0),
+                "consumers": group.get("consumers", 0)
+            }
+        return {
+            **self.stats,
+            'consumer': self.consumer,
+            'group': self.group,
+            'dead_lettered_total': await self.redis.xlen(self.dead_stream),
+            'streams': streams
+        }
+
+
+class RedisEventPublisher:
+    """connection_manager for worker processes: events go to API processes via pub/sub"""
+
+    def __init__(self, client: Optional[aioredis.Redis] = None):
+        self.redis = client or redis_client()
+
+    async def broadcast(self, message: Dict[str, Any]):
+        try:
+            await self.redis.publish(EVENTS_CHANNEL, json.dumps(message, default=str))
+        except Exception as e:
+            print(f"Error publishing execution event: {e}")
+
+
+async def relay_events(event_hub, client: Optional[aioredis.Redis] = None):
+    """API side: forward events published by workers to local websocket clients"""
+    pubsub = (client or redis_client()).pubsub()
+    await pubsub.subscribe(EVENTS_CHANNEL)
+    try:
+        async for message in pubsub.listen():
+            if message["type"] == "message":
+                await event_hub.broadcast(json.loads(message["data"]))
+    finally:
+        await pubsub.unsubscribe(EVENTS_CHANNEL)
+        await pubsub.close()
+
+
+class ExecutionQueueClient:
+    """
+    API-side stand-in for WorkflowScheduler when EXECUTION_MODE=queue
+
+    Same submit / cancel / pause / resume / is_active surface, but executions
+    are enqueued for workers and control commands are published to them.
+    """
+
+    def __init__(self, cache_manager, queue: Optional[ExecutionQueue] = None):
+        self.cache_manager = cache_manager
+        self.queue = queue or ExecutionQueue()
+        print(f"✓ Execution queue client initialized (streams {self.queue.prefix}:*)")
+
+    async def submit(
+        self,
+        workflow_id: str,
+        input_data: Dict[str, Any],
+        execution_id: str,
+        priority: str = DEFAULT_PRIORITY,
+        resume: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Raises:
+            SchedulerSaturatedError: if the queue is already full
+            ValueError: if the priority class is unknown
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority} (expected one of {', '.join(PRIORITIES)})")
+
+        await self.queue.ensure_groups()
+        self.cache_manager.update_execution_status(execution_id, status="queued")
+        await self.queue.enqueue({
+            "workflow_id": workflow_id,
+            "input_data": input_data,
+            "execution_id": execution_id,
+            "priority": priority,
+            "resume": resume,
+            "queued_at": datetime.now().isoformat()
+        })
+        return {
+            "execution_id": execution_id,
+            "status": "queued",
+            "priority": priority,
+            "queue_position": None
+        }
+
+    def is_active(self, execution_id: str) -> bool:
+        execution = self.cache_manager.get_execution(execution_id) or {}
+        return execution.get("status") in ACTIVE_STATUSES
+
+    async def _control(self, action: str, execution_id: str) -> bool:
+        if not self.is_active(execution_id):
+            return False
+        if action == "cancel" and self.cache_manager.get_execution(execution_id).get("status") == "queued":
+            # Workers skip jobs that were cancelled before they picked them up
+            self.cache_manager.update_execution_status(execution_id, status="cancelled", error="Cancelled before start")
+        await self.queue.redis.publish(CONTROL_CHANNEL, json.dumps({"action": action, "execution_id": execution_id}))
+        return True
+
+    async def cancel(self, execution_id: str) -> bool:
+        return await self._control("cancel", execution_id)
+
+    async def pause(self, execution_id: str) -> bool:
+        return await self._control("pause", execution_id)
+
+    async def resume(self, execution_id: str) -> bool:
+        return await self._control("resume", execution_id)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {"mode": "queue", **await self.queue.get_stats()}
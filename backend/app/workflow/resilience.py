@@ -0,0 +1,278 @@
+"""
+Resilience Layer - Retries and circuit breakers around MCP and LLM calls
+Retry policy comes from the agent's config.json (retry_attempts /
+retry_backoff); every target (Oracle DSN, SSH host, LLM URL) has a circuit
+breaker whose state lives in the CacheManager, so with Redis all API and
+worker processes stop calling a flapping target together
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable
+from config import settings
+from intelligence.prompt_engine import prompt_engine
+from workflow.tracing import span
+
+
+# Agent whose config.json drives the retry policy of each node type
+DEFAULT_AGENTS = {
+    "oracle": "pricing_agent",
+    "unix": "unix_agent",
+    "llm": "analysis_agent"
+}
+
+BACKOFFS = ("exponential", "linear", "fixed", "none")
+
+# Exceptions that mean the target is unreachable or slow: retried and counted by
+# its breaker. Anything else (KeyError, TypeError...) is a bug and re-raised at once.
+TRANSIENT_ERRORS = [OSError, TimeoutError, asyncio.TimeoutError]
+try:
+    import cx_Oracle
+    TRANSIENT_ERRORS += [cx_Oracle.OperationalError, cx_Oracle.InterfaceError]
+except ImportError:
+    pass
+try:
+    import paramiko
+    TRANSIENT_ERRORS.append(paramiko.SSHException)
+except ImportError:
+    pass
+try:
+    import aiohttp
+    TRANSIENT_ERRORS.append(aiohttp.ClientError)
+except ImportError:
+    pass
+TRANSIENT_ERRORS = tuple(TRANSIENT_ERRORS)
+
+
+def target_for(kind: str, credentials: Optional[Dict[str, Any]] = None, url: Optional[str] = None) -> str:
+    """Breaker name of the system a call goes to"""
+    credentials = credentials or {}
+    if kind == "oracle":
+        return f"oracle:{credentials.get('host')}:{credentials.get('port', 1521)}/{credentials.get('service_name')}"
+    if kind == "unix":
+        return f"unix:{credentials.get('host')}:{credentials.get('port', 22)}"
+    return f"{kind}:{url}"
+
+
+class RetryPolicy:
+    """Attempts and jittered backoff delays for one call"""
+
+    def __init__(self, attempts: int = 1, backoff: str = "exponential",
+                 base_delay: Optional[float] = None, max_delay: Optional[float] = None):
+        self.attempts = max(1, int(attempts))
+        self.backoff = backoff if backoff in BACKOFFS else "exponential"
+        self.base_delay = settings.RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = settings.RETRY_MAX_DELAY if max_delay is None else max_delay
+
+    @classmethod
+    def from_config(cls, agent_config: Dict[str, Any], node_config: Optional[Dict[str, Any]] = None) -> "RetryPolicy":
+        """Agent config.json values, overridden by the node's own retry_attempts / retry_backoff"""
+        merged = {**agent_config, **{k: v for k, v in (node_config or {}).items() if k.startswith("retry")}}
+        return cls(
+            attempts=merged.get("retry_attempts", merged.get("retry", 1)),
+            backoff=merged.get("retry_backoff", "exponential")
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Sleep before retry number `attempt` (1-based), with full jitter"""
+        if self.backoff == "none":
+            return 0.0
+        if self.backoff == "fixed":
+            ceiling = self.base_delay
+        elif self.backoff == "linear":
+            ceiling = self.base_delay * attempt
+        else:
+            ceiling = self.base_delay * (2 ** (attempt - 1))
+        return random.uniform(0, min(ceiling, self.max_delay))
+
+
+class CircuitBreaker:
+    """
+    Shared per-target breaker: closed -> open -> half-open -> closed
+
+    - closed: failures within CIRCUIT_FAILURE_WINDOW are counted
+      (breaker:{target}:failures); CIRCUIT_FAILURE_THRESHOLD of them open it
+    - open: breaker:{target}:open_until is in the future, calls fail fast
+    - half-open: after the cooldown one caller claims breaker:{target}:probe
+      and goes through; success closes the breaker, failure re-opens it
+    """
+
+    def __init__(self, cache_manager):
+        self.cache_manager = cache_manager
+
+    @staticmethod
+    def _key(target: str, part: str) -> str:
+        return f"breaker:{target}:{part}"
+
+    def _open_until(self, target: str) -> Optional[float]:
+        value = self.cache_manager.get(self._key(target, "open_until"))
+        return float(value) if value else None
+
+    def state(self, target: str) -> str:
+        open_until = self._open_until(target)
+        if open_until is None:
+            return "closed"
+        return "open" if time.time() < open_until else "half_open"
+
+    def allow(self, target: str) -> bool:
+        """Whether a call may go to the target now (claims the probe when half-open)"""
+        open_until = self._open_until(target)
+        if open_until is None:
+            return True
+        if time.time() < open_until:
+            return False
+
+        probe_key = self._key(target, "probe")
+        probe_until = str(time.time() + settings.CIRCUIT_PROBE_TIMEOUT)
+        if self.cache_manager.set_if_absent(probe_key, probe_until, settings.CIRCUIT_PROBE_TIMEOUT):
+            return True
+        # A probe whose caller died never reports back; let the next caller probe
+        current = self.cache_manager.get(probe_key)
+        if current and float(current) < time.time():
+            self.cache_manager.delete(probe_key)
+            return self.cache_manager.set_if_absent(probe_key, probe_until, settings.CIRCUIT_PROBE_TIMEOUT)
+        return False
+
+    def record_success(self, target: str):
+        if self._open_until(target) is not None:
+            self.cache_manager.delete(self._key(target, "open_until"))
+            self.cache_manager.delete(self._key(target, "probe"))
+            print(f"✓ Circuit closed for {target}")
+        self.cache_manager.delete(self._key(target, "failures"))
+
+    def record_failure(self, target: str) -> bool:
+        """Count a failure; returns True if the breaker (re)opened"""
+        if self._open_until(target) is not None:
+            # Failed probe: open again for another cooldown
+            self._open(target)
+            self.cache_manager.delete(self._key(target, "probe"))
+            return True
+
+        failures = self.cache_manager.increment(self._key(target, "failures"), settings.CIRCUIT_FAILURE_WINDOW)
+        if failures >= settings.CIRCUIT_FAILURE_THRESHOLD:
+            self._open(target)
+            self.cache_manager.delete(self._key(target, "failures"))
+            print(f"✗ Circuit opened for {target} after {failures} failures")
+            return True
+        return False
+
+    def _open(self, target: str):
+        self.cache_manager.set(
+            self._key(target, "open_until"),
+            str(time.time() + settings.CIRCUIT_COOLDOWN),
+            settings.CIRCUIT_COOLDOWN + settings.CIRCUIT_FAILURE_WINDOW
+        )
+
+
+class ResilienceLayer:
+    """
+    call() runs one MCP / LLM call with its agent's retry policy behind the
+    target's circuit breaker
+
+    A call failed retryably if it raised one of TRANSIENT_ERRORS or returned
+    {"retryable": True} (connection failures); other errors (bad SQL, non-zero
+    exit codes) mean the target is up and are returned as they are, and any
+    other exception propagates without counting against the breaker.
+    """
+
+    def __init__(self, cache_manager):
+        self.breaker = CircuitBreaker(cache_manager)
+        self._agent_configs: Dict[str, tuple] = {}
+        self.stats = {
+            'calls': 0,
+            'retries': 0,
+            'recovered': 0,
+            'exhausted': 0,
+            'fast_failures': 0,
+            'breakers_opened': 0
+        }
+
+    def _agent_config(self, agent_name: str) -> Dict[str, Any]:
+        """Agent config.json, re-read when the file changes"""
+        path = prompt_engine.skills_dir / agent_name / "config.json"
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+        cached = self._agent_configs.get(agent_name)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, prompt_engine.load_config(agent_name))
+            self._agent_configs[agent_name] = cached
+        return cached[1]
+
+    def policy_for(self, kind: str, node_config: Optional[Dict[str, Any]] = None) -> RetryPolicy:
+        node_config = node_config or {}
+        agent_name = node_config.get("agent") or DEFAULT_AGENTS.get(kind)
+        agent_config = self._agent_config(agent_name) if agent_name else {}
+        return RetryPolicy.from_config(agent_config, node_config)
+
+    async def call(
+        self,
+        target: str,
+        policy: RetryPolicy,
+        func: Callable[[], Awaitable[Dict[str, Any]]],
+        can_retry: Optional[Callable[[], bool]] = None,
+        deadline: Optional[Callable[[], float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Args:
+            func: the call itself, invoked once per attempt
+            can_retry: extra veto (e.g. a stream that already emitted rows)
+            deadline: seconds left for the node; no retry sleeps past it
+        """
+        kind = target.partition(":")[0]
+        with span("llm.call" if kind == "llm" else f"mcp.{kind}", target=target) as call_span:
+            result = await self._call(target, policy, func, can_retry, deadline, call_span)
+            call_span.set(
+                success=result.get("success", True),
+                circuit_open=bool(result.get("circuit_open")),
+                rows=result.get("row_count")
+            )
+            return result
+
+    async def _call(self, target: str, policy: RetryPolicy, func: Callable[[], Awaitable[Dict[str, Any]]],
+                    can_retry: Optional[Callable[[], bool]], deadline: Optional[Callable[[], float]],
+                    call_span) -> Dict[str, Any]:
+        self.stats['calls'] += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            call_span.set(attempts=attempt)
+            if not self.breaker.allow(target):
+                self.stats['fast_failures'] += 1
+                return {
+                    "success": False,
+                    "error": f"Circuit open for {target} - failing fast",
+                    "circuit_open": True
+                }
+
+            error = None
+            try:
+                result = await func()
+            except TRANSIENT_ERRORS as e:
+                error, result = e, {"success": False, "error": str(e), "retryable": True}
+
+            if not (isinstance(result, dict) and result.get("retryable")):
+                self.breaker.record_success(target)
+                if attempt > 1:
+                    self.stats['recovered'] += 1
+                return result
+
+            if self.breaker.record_failure(target):
+                self.stats['breakers_opened'] += 1
+
+            delay = policy.delay(attempt)
+            out_of_time = deadline is not None and delay >= deadline()
+            if attempt >= policy.attempts or out_of_time or (can_retry and not can_retry()):
+                self.stats['exhausted'] += 1
+                if error is not None:
+                    raise error
+                return {**result, "attempts": attempt}
+
+            self.stats['retries'] += 1
+            await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
@@ -0,0 +1,297 @@
+"""
+Workflow Scheduler - Admission control in front of the orchestrator
+Queues executions by priority and enforces global and per-workflow concurrency
+"""
+
+import asyncio
+import heapq
+import itertools
+from typing import Dict, Any, List, Optional, Callable
+from datetime import datetime
+from config import settings
+from workflow.control import ExecutionHandle
+
+
+# Lower value runs first
+PRIORITIES = {
+    "eod_repair": 0,
+    "scheduled": 10,
+    "manual": 20,
+    "chat": 30
+}
+DEFAULT_PRIORITY = "manual"
+
+
+class SchedulerSaturatedError(Exception):
+    """Raised when the queue is full and a new execution cannot be admitted"""
+
+
+class WorkflowScheduler:
+    """
+    Priority queue with admission control
+
+    - At most `max_concurrent` executions run at once (MAX_CONCURRENT_WORKFLOWS)
+    - At most `max_per_workflow` executions of the same workflow run at once
+    - At most `max_queued` executions wait; beyond that submit() rejects
+    - A paused execution gives up its slots (in-flight nodes still finish);
+      on resume it waits for free slots ahead of the queued executions
+    """
+
+    def __init__(
+        self,
+        orchestrator,
+        connection_manager,
+        max_concurrent: Optional[int] = None,
+        max_per_workflow: Optional[int] = None,
+        max_queued: Optional[int] = None
+    ):
+        self.orchestrator = orchestrator
+        self.connection_manager = connection_manager
+        self.max_concurrent = max_concurrent or settings.MAX_CONCURRENT_WORKFLOWS
+        self.max_per_workflow = max_per_workflow or settings.MAX_CONCURRENT_PER_WORKFLOW
+        self.max_queued = max_queued or settings.MAX_QUEUED_WORKFLOWS
+
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        self.running: Dict[str, Dict[str, Any]] = {}
+        self.running_per_workflow: Dict[str, int] = {}
+        self.paused: Dict[str, Dict[str, Any]] = {}
+        self._resuming: List[str] = []  # paused executions waiting for a slot, in resume order
+
+        self.stats = {
+            'submitted': 0,
+            'started': 0,
+            'completed': 0,
+            'rejected': 0,
+            'cancelled': 0,
+            'total_queue_ms': 0.0,
+            'max_queue_ms': 0.0
+        }
+
+        print(f"✓ Workflow Scheduler initialized (max_concurrent={self.max_concurrent}, "
+              f"per_workflow={self.max_per_workflow}, max_queued={self.max_queued})")
+
+    def submit(
+        self,
+        workflow_id: str,
+        input_data: Dict[str, Any],
+        execution_id: str,
+        priority: str = DEFAULT_PRIORITY,
+        resume: bool = False,
+        on_finished: Optional[Callable[[], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Admit an execution into the queue
+
+        With resume=True the execution reuses its node checkpoints and only
+        re-runs nodes that failed or whose inputs changed. `on_finished` is
+        called once the execution ends or is cancelled (queue workers ack there).
+
+        Raises:
+            SchedulerSaturatedError: if the queue is already full
+            ValueError: if the priority class is unknown
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority} (expected one of {', '.join(PRIORITIES)})")
+
+        if len(self._queue) >= self.max_queued:
+            self.stats['rejected'] += 1
+            raise SchedulerSaturatedError(
+                f"Scheduler queue is full ({len(self._queue)} waiting, {len(self.running)} running)"
+            )
+
+        job = {
+            "workflow_id": workflow_id,
+            "input_data": input_data,
+            "execution_id": execution_id,
+            "priority": priority,
+            "resume": resume,
+            "on_finished": on_finished,
+            "queued_at": datetime.now()
+        }
+        heapq.heappush(self._queue, (PRIORITIES[priority], next(self._sequence), job))
+        self.stats['submitted'] += 1
+
+        self.orchestrator.cache_manager.update_execution_status(execution_id, status="queued")
+        position = self._queue_position(execution_id)
+
+        self._dispatch()
+
+        return {
+            "execution_id": execution_id,
+            "status": "running" if execution_id in self.running else "queued",
+            "priority": priority,
+            "queue_position": None if execution_id in self.running else position
+        }
+
+    def _queue_position(self, execution_id: str) -> Optional[int]:
+        for position, (_, _, job) in enumerate(sorted(self._queue), 1):
+            if job["execution_id"] == execution_id:
+                return position
+        return None
+
+    def _has_slot(self, workflow_id: str) -> bool:
+        return (len(self.running) < self.max_concurrent
+                and self.running_per_workflow.get(workflow_id, 0) < self.max_per_workflow)
+
+    def _acquire_slot(self, job: Dict[str, Any]):
+        workflow_id = job["workflow_id"]
+        self.running_per_workflow[workflow_id] = self.running_per_workflow.get(workflow_id, 0) + 1
+        self.running[job["execution_id"]] = job
+
+    def _release_slot(self, job: Dict[str, Any]):
+        self.running.pop(job["execution_id"], None)
+        workflow_id = job["workflow_id"]
+        self.running_per_workflow[workflow_id] -= 1
+        if self.running_per_workflow[workflow_id] <= 0:
+            del self.running_per_workflow[workflow_id]
+
+    def _dispatch(self):
+        """Resume, then start queued executions while global and per-workflow slots are free"""
+        for execution_id in list(self._resuming):
+            job = self.paused[execution_id]
+            if self._has_slot(job["workflow_id"]):
+                self._resuming.remove(execution_id)
+                del self.paused[execution_id]
+                self._acquire_slot(job)
+                job["handle"].resume()
+                self.orchestrator.cache_manager.update_execution_status(execution_id, status="running")
+
+        if len(self.running) >= self.max_concurrent or not self._queue:
+            return
+
+        waiting = []
+        while self._queue and len(self.running) < self.max_concurrent:
+            entry = heapq.heappop(self._queue)
+            job = entry[2]
+            if self.running_per_workflow.get(job["workflow_id"], 0) >= self.max_per_workflow:
+                waiting.append(entry)
+                continue
+            self._start(job)
+
+        for entry in waiting:
+            heapq.heappush(self._queue, entry)
+
+    def _start(self, job: Dict[str, Any]):
+        queue_ms = (datetime.now() - job["queued_at"]).total_seconds() * 1000
+        self.stats['started'] += 1
+        self.stats['total_queue_ms'] += queue_ms
+        self.stats['max_queue_ms'] = max(self.stats['max_queue_ms'], queue_ms)
+
+        execution_id = job["execution_id"]
+        self.orchestrator.cache_manager.update_execution_fields(execution_id, {
+            "queue_time_ms": round(queue_ms, 2),
+            "priority": job["priority"]
+        })
+
+        job["handle"] = ExecutionHandle(execution_id)
+        job["task"] = asyncio.ensure_future(self._run(job))
+        self._acquire_slot(job)
+
+    async def _run(self, job: Dict[str, Any]):
+        try:
+            await self.orchestrator.execute_workflow(
+                job["workflow_id"],
+                job["input_data"],
+                job["execution_id"],
+                self.connection_manager,
+                handle=job["handle"],
+                resume=job["resume"]
+            )
+        finally:
+            execution_id = job["execution_id"]
+            if self.paused.pop(execution_id, None):
+                if execution_id in self._resuming:
+                    self._resuming.remove(execution_id)
+            else:
+                self._release_slot(job)
+            self.stats['completed'] += 1
+            if job["on_finished"]:
+                job["on_finished"]()
+            self._dispatch()
+
+    # ========================================================================
+    # EXECUTION CONTROL
+    # ========================================================================
+
+    def cancel(self, execution_id: str) -> bool:
+        """
+        Cancel a queued or running execution
+        Running executions have their blocking calls interrupted and release
+        their concurrency slot as soon as the task unwinds
+        """
+        for index, (_, _, job) in enumerate(self._queue):
+            if job["execution_id"] == execution_id:
+                self._queue.pop(index)
+                heapq.heapify(self._queue)
+                self.stats['cancelled'] += 1
+                self.orchestrator.cache_manager.update_execution_status(
+                    execution_id, status="cancelled", error="Cancelled before start"
+                )
+                if job["on_finished"]:
+                    job["on_finished"]()
+                return True
+
+        job = self.running.get(execution_id) or self.paused.get(execution_id)
+        if not job:
+            return False
+
+        self.stats['cancelled'] += 1
+        job["handle"].cancel()
+        job["task"].cancel()
+        return True
+
+    def pause(self, execution_id: str) -> bool:
+        """
+        Stop starting new nodes of a running execution (in-flight nodes finish)
+        and hand its slot to the next queued execution
+        """
+        job = self.running.get(execution_id)
+        if not job:
+            return False
+        job["handle"].pause()
+        self._release_slot(job)
+        self.paused[execution_id] = job
+        self.orchestrator.cache_manager.update_execution_status(execution_id, status="paused")
+        self._dispatch()
+        return True
+
+    def resume(self, execution_id: str) -> bool:
+        """Continue a paused execution once a slot is free (before any queued one)"""
+        if execution_id not in self.paused or execution_id in self._resuming:
+            return False
+        self._resuming.append(execution_id)
+        self.orchestrator.cache_manager.update_execution_status(
+            execution_id, status="queued", current_step="Waiting for a free slot to resume"
+        )
+        self._dispatch()
+        return True
+
+    def is_active(self, execution_id: str) -> bool:
+        """Whether an execution is queued, running or paused in this scheduler"""
+        return (execution_id in self.running or execution_id in self.paused
+                or self._queue_position(execution_id) is not None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics"""
+        started = self.stats['started']
+        return {
+            'running': len(self.running),
+            'paused': len(self.paused) - len(self._resuming),
+            'resuming': len(self._resuming),
+            'queued': len(self._queue),
+            'max_concurrent': self.max_concurrent,
+            'max_per_workflow': self.max_per_workflow,
+            'max_queued': self.max_queued,
+            'submitted': self.stats['submitted'],
+            'started': started,
+            'completed': self.stats['completed'],
+            'rejected': self.stats['rejected'],
+            'cancelled': self.stats['cancelled'],
+            'average_queue_ms': round(self.stats['total_queue_ms'] / started, 2) if started else 0.0,
+            'max_queue_ms': round(self.stats['max_queue_ms'], 2),
+            'queued_by_priority': {
+                name: sum(1 for _, _, job in self._queue if job["priority"] == name)
+                for name in PRIORITIES
+            }
+        }
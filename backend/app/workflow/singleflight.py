@@ -0,0 +1,110 @@
+"""
+Single-Flight Registry - Coalesce identical concurrent executions
+While an execution of a workflow revision with a given (normalized) input is
+queued or running, identical execute requests attach to it: they get its
+execution_id and so share its event stream and its result instead of opening
+their own Oracle / SSH connections and LLM calls
+"""
+
+import hashlib
+import json
+import time
+from typing import Dict, Any, Optional, Tuple
+from config import settings
+from workflow.queue import ACTIVE_STATUSES
+
+
+# A claim whose execution record never appeared (submit crashed) is stale after this
+CLAIM_GRACE_SECONDS = 30
+
+
+def normalize_input(value: Any) -> Any:
+    """Canonical form of input data: sorted keys, stripped strings, no None values"""
+    if isinstance(value, dict):
+        return {str(key): normalize_input(item) for key, item in sorted(value.items(), key=lambda kv: str(kv[0]))
+                if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [normalize_input(item) for item in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+class SingleFlightRegistry:
+    """
+    In-flight executions under singleflight:{hash} in the CacheManager
+
+    Key = sha256(workflow id, workflow revision, normalized input)
+    The claim is taken atomically (SET NX), so with Redis duplicates are
+    coalesced across API processes too; it expires with WORKFLOW_TIMEOUT and
+    is ignored as soon as its execution is no longer queued/running/paused.
+    """
+
+    def __init__(self, cache_manager, enabled: Optional[bool] = None):
+        self.cache_manager = cache_manager
+        self.enabled = settings.SINGLE_FLIGHT_ENABLED if enabled is None else enabled
+        self.stats = {
+            'leaders': 0,
+            'coalesced': 0,
+            'stale_claims': 0
+        }
+
+    def key_for(self, workflow_id: str, input_data: Dict[str, Any]) -> str:
+        content = json.dumps({
+            "workflow_id": workflow_id,
+            "revision": self.cache_manager.get_workflow_revision(workflow_id),
+            "input_data": normalize_input(input_data or {})
+        }, sort_keys=True, default=str)
+        return f"singleflight:{hashlib.sha256(content.encode()).hexdigest()}"
+
+    def _active(self, claim: Dict[str, Any]) -> bool:
+        execution = self.cache_manager.get_execution(claim["execution_id"])
+        if execution is None:
+            # Claimed but not submitted yet
+            return time.time() - claim.get("claimed_at", 0) < CLAIM_GRACE_SECONDS
+        return execution.get("status") in ACTIVE_STATUSES
+
+    def attach(self, workflow_id: str, input_data: Dict[str, Any], execution_id: str) -> Tuple[str, Optional[str]]:
+        """
+        Claim the flight for execution_id, or find the one already running
+
+        Returns:
+            (key, leader): leader is None if execution_id now owns the flight
+            (run it, and release(key, execution_id) if the submit fails),
+            otherwise the execution_id of the identical run to attach to
+        """
+        key = self.key_for(workflow_id, input_data)
+        claim = json.dumps({"execution_id": execution_id, "claimed_at": time.time()})
+
+        for _ in range(2):
+            if self.cache_manager.set_if_absent(key, claim, settings.WORKFLOW_TIMEOUT):
+                self.stats['leaders'] += 1
+                return key, None
+
+            existing = self.cache_manager.get(key)
+            if not existing:
+                continue  # expired or released in between
+            existing = json.loads(existing)
+            if self._active(existing):
+                self.stats['coalesced'] += 1
+                return key, existing["execution_id"]
+
+            self.stats['stale_claims'] += 1
+            self.cache_manager.delete(key)
+
+        # Lost the race for a stale claim twice - run without deduplication
+        return key, None
+
+    def release(self, key: str, execution_id: str):
+        """Drop a claim (only if execution_id still owns it)"""
+        existing = self.cache_manager.get(key)
+        if existing and json.loads(existing).get("execution_id") == execution_id:
+            self.cache_manager.delete(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.stats['leaders'] + self.stats['coalesced']
+        return {
+            **self.stats,
+            'enabled': self.enabled,
+            'coalesce_rate': round(self.stats['coalesced'] / total, 3) if total else 0.0
+        }
@@ -0,0 +1,252 @@
+"""
+Result Spill Store - Large node results live outside the execution record
+Results above RESULT_SPILL_BYTES are written once (Redis or local disk) as a
+meta record plus one JSON line per row; the execution and its checkpoints
+keep only a small handle, and rows are read back lazily and in ranges
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from itertools import islice
+from typing import Dict, Any, List, Optional, Tuple
+from config import settings
+from workflow.tracing import span
+
+
+# Fields holding the bulk of a result, split into rows when spilled
+ROW_FIELDS = ("data", "results", "rows")
+
+
+def result_reference(execution_id: str, node_id: str, result: Any, size: Optional[int]) -> Dict[str, Any]:
+    """Small stand-in for a large result: where to fetch it and what it holds"""
+    summary = {}
+    if isinstance(result, dict):
+        summary = {
+            key: result[key] for key in ("success", "row_count", "item_count", "error", "exit_code", "cached")
+            if key in result
+        }
+        summary["keys"] = list(result.keys())
+
+    return {
+        "result_ref": f"/api/executions/{execution_id}/nodes/{node_id}/result",
+        "size_bytes": size,
+        "summary": summary
+    }
+
+
+class DiskBlobBackend:
+    """Spilled results as files: {root}/{execution_id}/{node_id}.meta.json + .rows.jsonl"""
+
+    name = "disk"
+    available = True
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, execution_id: str, node_id: str, suffix: str) -> str:
+        safe = lambda value: re.sub(r"[^A-Za-z0-9_.-]", "_", value)
+        return os.path.join(self.root, safe(execution_id), f"{safe(node_id)}.{suffix}")
+
+    def write(self, execution_id: str, node_id: str, meta: str, rows: List[str]):
+        meta_path = self._path(execution_id, node_id, "meta.json")
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        with open(self._path(execution_id, node_id, "rows.jsonl"), "w") as f:
+            for row in rows:
+                f.write(row)
+                f.write("\n")
+        # Meta last: a handle is only readable once its rows are complete
+        with open(meta_path, "w") as f:
+            f.write(meta)
+
+    def read_meta(self, execution_id: str, node_id: str) -> Optional[str]:
+        try:
+            with open(self._path(execution_id, node_id, "meta.json")) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def read_rows(self, execution_id: str, node_id: str, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        try:
+            with open(self._path(execution_id, node_id, "rows.jsonl")) as f:
+                return [line.rstrip("\n") for line in islice(f, start, stop)]
+        except FileNotFoundError:
+            return []
+
+    def cleanup(self, max_age: int) -> int:
+        """Delete execution directories older than max_age seconds"""
+        if not os.path.isdir(self.root):
+            return 0
+        removed = 0
+        cutoff = time.time() - max_age
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        return removed
+
+
+class RedisBlobBackend:
+    """Spilled results in the CacheManager (a Redis list of rows, or memory)"""
+
+    def __init__(self, cache_manager):
+        self.cache_manager = cache_manager
+
+    @property
+    def name(self) -> str:
+        return "redis" if self.cache_manager.use_redis else "memory"
+
+    @property
+    def available(self) -> bool:
+        """Spilling into the in-memory fallback cache would free nothing"""
+        return self.cache_manager.use_redis
+
+    def write(self, execution_id: str, node_id: str, meta: str, rows: List[str]):
+        self.cache_manager.save_result_blob(execution_id, node_id, meta, rows)
+
+    def read_meta(self, execution_id: str, node_id: str) -> Optional[str]:
+        return self.cache_manager.get_result_blob_meta(execution_id, node_id)
+
+    def read_rows(self, execution_id: str, node_id: str, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        return self.cache_manager.get_result_blob_rows(execution_id, node_id, start, stop)
+
+    def cleanup(self, max_age: int) -> int:
+        return 0  # Redis keys expire with the execution
+
+
+class ResultSpillStore:
+    """
+    Decides per node result whether to keep it inline or spill it
+
+    A spilled result is replaced by a handle:
+        {"spilled": True, "store", "result_ref", "size_bytes", "summary",
+         "rows_field", "total_rows"}
+    The row field of the result ("data" for queries, "results" for map nodes)
+    is stored one row per line so ranges can be read without loading the rest.
+
+    When the CacheManager has fallen back to memory, the redis backend does
+    not spill: results stay inline (counted as not_spilled) and the mode is
+    reported as "memory".
+    """
+
+    def __init__(self, cache_manager, threshold_bytes: Optional[int] = None, backend: Optional[str] = None):
+        self.threshold_bytes = threshold_bytes or settings.RESULT_SPILL_BYTES
+        backend = backend or settings.RESULT_SPILL_BACKEND
+        if backend == "disk":
+            self.backend = DiskBlobBackend(settings.RESULT_SPILL_DIR)
+        else:
+            self.backend = RedisBlobBackend(cache_manager)
+        self.stats = {
+            'spilled': 0,
+            'inline': 0,
+            'bytes_spilled': 0,
+            'not_spilled': 0,
+            'loads': 0,
+            'range_reads': 0
+        }
+        if not self.backend.available:
+            print("✗ Result spill store: Redis not available - large results stay inline "
+                  "(set RESULT_SPILL_BACKEND=disk to spill without Redis)")
+
+    @staticmethod
+    def is_handle(result: Any) -> bool:
+        return isinstance(result, dict) and result.get("spilled") is True
+
+    @staticmethod
+    def split_rows(result: Dict[str, Any]) -> Tuple[Optional[str], List[Any]]:
+        """The row field of a result and its rows (dict fields become [key, value] pairs)"""
+        for field in ROW_FIELDS:
+            value = result.get(field)
+            if isinstance(value, list):
+                return field, value
+            if isinstance(value, dict):
+                return field, [[key, item] for key, item in value.items()]
+        return None, []
+
+    def store(self, execution_id: str, node_id: str, result: Any) -> Tuple[Any, str]:
+        """
+        Return (the result itself if small, else its spill handle, content digest)
+
+        The digest is a sha256 of the encoded result, taken while it is encoded
+        for the size check anyway; downstream fingerprints chain on it.
+        """
+        if not isinstance(result, dict):
+            return result, hashlib.sha256(json.dumps(result, default=str).encode()).hexdigest()
+
+        with span("spill.store", node_id=node_id) as store_span:
+            field, rows = self.split_rows(result)
+            meta = {key: value for key, value in result.items() if key != field}
+            meta["_rows"] = {"field": field, "kind": type(result.get(field)).__name__ if field else None}
+            encoded_meta = json.dumps(meta, default=str)
+            encoded_rows = [json.dumps(row, default=str) for row in rows]
+
+            digest = hashlib.sha256(encoded_meta.encode())
+            for row in encoded_rows:
+                digest.update(b"\n")
+                digest.update(row.encode())
+            digest = digest.hexdigest()
+
+            size = len(encoded_meta) + sum(len(row) for row in encoded_rows)
+            store_span.set(bytes=size, rows=len(rows), spilled=size > self.threshold_bytes and self.backend.available)
+            if size <= self.threshold_bytes:
+                self.stats['inline'] += 1
+                return result, digest
+            if not self.backend.available:
+                self.stats['not_spilled'] += 1
+                return result, digest
+
+            self.backend.write(execution_id, node_id, encoded_meta, encoded_rows)
+        self.stats['spilled'] += 1
+        self.stats['bytes_spilled'] += size
+
+        return {
+            "spilled": True,
+            "store": self.backend.name,
+            **result_reference(execution_id, node_id, result, size),
+            "rows_field": field,
+            "total_rows": len(rows)
+        }, digest
+
+    def _meta(self, execution_id: str, node_id: str) -> Optional[Dict[str, Any]]:
+        encoded = self.backend.read_meta(execution_id, node_id)
+        return json.loads(encoded) if encoded else None
+
+    @staticmethod
+    def _assemble(meta: Dict[str, Any], rows: List[Any]) -> Dict[str, Any]:
+        layout = meta.pop("_rows", {})
+        if layout.get("field"):
+            meta[layout["field"]] = dict(rows) if layout.get("kind") == "dict" else rows
+        return meta
+
+    def load(self, execution_id: str, node_id: str) -> Optional[Dict[str, Any]]:
+        """Full result behind a handle (None if it expired)"""
+        meta = self._meta(execution_id, node_id)
+        if meta is None:
+            return None
+        self.stats['loads'] += 1
+        rows = [json.loads(row) for row in self.backend.read_rows(execution_id, node_id)]
+        return self._assemble(meta, rows)
+
+    def load_range(self, execution_id: str, node_id: str, offset: int, limit: int) -> Optional[Dict[str, Any]]:
+        """Result with only rows [offset, offset + limit) of its row field"""
+        meta = self._meta(execution_id, node_id)
+        if meta is None:
+            return None
+        self.stats['range_reads'] += 1
+        rows = [json.loads(row) for row in self.backend.read_rows(execution_id, node_id, offset, offset + limit)]
+        return self._assemble(meta, rows)
+
+    def cleanup(self) -> int:
+        """Remove spilled results past the execution TTL (disk only)"""
+        return self.backend.cleanup(settings.RESULT_SPILL_MAX_AGE)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'backend': self.backend.name,
+            'spilling': self.backend.available,
+            'threshold_bytes': self.threshold_bytes
+        }
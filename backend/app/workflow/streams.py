@@ -0,0 +1,173 @@
+"""
+Row Streams - Bounded async row pipelines between workflow nodes
+A producer (e.g. an Oracle query in the oracle pool) pushes row batches while
+it fetches; each downstream consumer reads them through its own bounded
+queue, so memory is bounded by batch size rather than by result size
+"""
+
+import asyncio
+from typing import Dict, Any, List, Optional
+from config import settings
+
+
+class StreamAborted(Exception):
+    """Raised to a producer once its stream was aborted (execution cancelled or failed)"""
+
+
+_END = object()
+
+
+class RowStreamReader:
+    """One consumer's view of a RowStream - an async iterator of row batches"""
+
+    def __init__(self, stream: "RowStream", buffer_batches: int):
+        self.stream = stream
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.space = asyncio.Semaphore(buffer_batches)
+        self.claimed = False
+        self.released = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> List[Dict[str, Any]]:
+        if self.released:
+            raise StopAsyncIteration
+        batch = await self.queue.get()
+        if batch is _END:
+            self.released = True
+            raise StopAsyncIteration
+        self.space.release()
+        return batch
+
+    def release(self):
+        """Stop consuming; the producer no longer waits for this reader"""
+        self.released = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.space.release()
+
+    async def collect(self) -> Dict[str, Any]:
+        """Drain the stream into a regular query result (rows under "data")"""
+        rows = []
+        async for batch in self:
+            rows.extend(batch)
+        summary = await self.stream.result()
+        return {**summary, "data": rows} if summary.get("success") else summary
+
+    async def digest(self, sample_rows: int) -> Dict[str, Any]:
+        """Consume the stream keeping only the first `sample_rows` rows"""
+        sample = []
+        async for batch in self:
+            if len(sample) < sample_rows:
+                sample.extend(batch[:sample_rows - len(sample)])
+        summary = await self.stream.result()
+        return {**summary, "sample": sample} if summary.get("success") else summary
+
+
+class RowStream:
+    """
+    Row batches flowing from one producer node to its downstream nodes
+
+    The executor opens the stream with one reader per downstream node; the
+    producer's put() waits until every unreleased reader has room, so a slow
+    consumer throttles the fetch instead of growing a buffer.
+    """
+
+    def __init__(self, name: str, buffer_batches: Optional[int] = None):
+        self.name = name
+        self.buffer_batches = buffer_batches or settings.STREAM_BUFFER_BATCHES
+        self.columns: List[str] = []
+        self.row_count = 0
+        self.batch_count = 0
+        self.summary: Optional[Dict[str, Any]] = None
+        self.aborted = False
+        self.producer: Optional[asyncio.Future] = None
+        self._loop = asyncio.get_running_loop()
+        self._readers: List[RowStreamReader] = []
+        self._opened = asyncio.Event()
+        self._finished = asyncio.Event()
+
+    # ========================================================================
+    # CONSUMER SIDE
+    # ========================================================================
+
+    def open(self, consumers: int):
+        """Create the consumer queues; the producer starts pushing after this"""
+        self._readers = [RowStreamReader(self, self.buffer_batches) for _ in range(consumers)]
+        self._opened.set()
+
+    def reader(self) -> RowStreamReader:
+        """Claim the next unclaimed consumer queue"""
+        for reader in self._readers:
+            if not reader.claimed:
+                reader.claimed = True
+                return reader
+        raise RuntimeError(f"Stream {self.name} has no unclaimed readers")
+
+    async def collect(self) -> Dict[str, Any]:
+        """Materialize the whole stream (used when no consumer can stream it)"""
+        self.open(1)
+        return await self.reader().collect()
+
+    async def result(self) -> Dict[str, Any]:
+        """Final summary once the producer is done"""
+        await self._finished.wait()
+        return self.summary
+
+    async def wait_finished(self):
+        await self._finished.wait()
+
+    def abort(self):
+        """Unblock producer and consumers; the producer gets StreamAborted on its next put"""
+        if self._finished.is_set():
+            return
+        self.aborted = True
+        self.summary = {"success": False, "error": f"Stream {self.name} aborted"}
+        for reader in self._readers:
+            reader.release()
+            reader.queue.put_nowait(_END)
+        self._opened.set()
+        self._finished.set()
+        if self.producer:
+            self.producer.cancel()
+
+    # ========================================================================
+    # PRODUCER SIDE
+    # ========================================================================
+
+    async def put(self, columns: List[str], rows: List[Dict[str, Any]]):
+        await self._opened.wait()
+        if self.aborted:
+            raise StreamAborted(self.name)
+
+        self.columns = columns
+        self.row_count += len(rows)
+        self.batch_count += 1
+        for reader in self._readers:
+            if reader.released:
+                continue
+            await reader.space.acquire()
+            if not reader.released:
+                reader.queue.put_nowait(rows)
+
+    def put_threadsafe(self, columns: List[str], rows: List[Dict[str, Any]]):
+        """put() from a pool thread, blocking it while consumers are behind"""
+        asyncio.run_coroutine_threadsafe(self.put(columns, rows), self._loop).result()
+
+    async def finish(self, summary: Optional[Dict[str, Any]] = None):
+        """Mark the stream complete; `summary` overrides the default counts"""
+        if self._finished.is_set():
+            return
+        self.summary = {
+            "success": True,
+            "streamed": True,
+            "row_count": self.row_count,
+            "batch_count": self.batch_count,
+            "columns": self.columns,
+            **(summary or {})
+        }
+        await self._opened.wait()
+        for reader in self._readers:
+            reader.queue.put_nowait(_END)
+        self._finished.set()
@@ -0,0 +1,247 @@
+"""
+Execution Tracing - Spans for executions, nodes, MCP / LLM calls, cache
+lookups, compression passes and spills
+The current trace and span travel in contextvars, so span() works anywhere
+below an execution (node tasks inherit them) and is a no-op elsewhere.
+Finished traces go to Redis or to local files and are served by
+/api/executions/{id}/trace
+"""
+
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
+from config import settings
+
+
+class Span:
+    """One timed operation with attributes; parent_id links it into the tree"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "_started", "duration_ms",
+                 "attributes", "status", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, **attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.attributes: Dict[str, Any] = attributes
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def fail(self, error: Any):
+        self.status = "error"
+        self.error = str(error)
+
+    def end(self):
+        if self.duration_ms is None:
+            self.duration_ms = round((time.perf_counter() - self._started) * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+
+class _NoopSpan:
+    """Returned by span() outside any trace"""
+
+    def set(self, **attributes):
+        pass
+
+    def fail(self, error: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Spans of one execution run (capped at TRACE_MAX_SPANS)"""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self.dropped = 0
+
+    def add(self, span: Span):
+        if len(self.spans) < settings.TRACE_MAX_SPANS:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time the enclosed block as a child of the current span (no-op without a trace)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    current = Span(name, trace.trace_id, parent.span_id if parent else None, **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(e.__class__.__name__ if not str(e) else e)
+        raise
+    finally:
+        current.end()
+        _current_span.reset(token)
+        trace.add(current)
+
+
+def summarize(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Total time and count per span name, slowest first"""
+    by_name: Dict[str, Dict[str, Any]] = {}
+    for item in spans:
+        entry = by_name.setdefault(item["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0})
+        duration = item.get("duration_ms") or 0.0
+        entry["count"] += 1
+        entry["total_ms"] = round(entry["total_ms"] + duration, 3)
+        entry["max_ms"] = max(entry["max_ms"], duration)
+        entry["errors"] += item.get("status") == "error"
+    return dict(sorted(by_name.items(), key=lambda kv: kv[1]["total_ms"], reverse=True))
+
+
+class RedisTraceExporter:
+    """Traces under trace:{execution_id} in the CacheManager (one entry per run)"""
+
+    name = "redis"
+
+    def __init__(self, cache_manager):
+        self.cache_manager = cache_manager
+
+    def export(self, execution_id: str, run: Dict[str, Any]):
+        runs = self.load(execution_id)
+        runs.append(run)
+        self.cache_manager.set(f"trace:{execution_id}", json.dumps(runs, default=str), settings.TRACE_TTL)
+
+    def load(self, execution_id: str) -> List[Dict[str, Any]]:
+        data = self.cache_manager.get(f"trace:{execution_id}")
+        return json.loads(data) if data else []
+
+
+class FileTraceExporter:
+    """Traces as {root}/{execution_id}.jsonl (one line per run)"""
+
+    name = "file"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, execution_id: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9_.-]", "_", execution_id) + ".jsonl")
+
+    def export(self, execution_id: str, run: Dict[str, Any]):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._path(execution_id), "a") as f:
+            f.write(json.dumps(run, default=str))
+            f.write("\n")
+
+    def load(self, execution_id: str) -> List[Dict[str, Any]]:
+        try:
+            with open(self._path(execution_id)) as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+
+class Tracer:
+    """
+    Starts and exports execution traces
+
+    start_trace() opens the root "execution" span and makes it current for
+    the calling task; finish_trace() closes it and exports the run. A rerun of
+    the same execution adds another run to its trace.
+    """
+
+    def __init__(self, cache_manager, exporter: Optional[str] = None):
+        self.enabled = settings.TRACE_ENABLED
+        exporter = exporter or settings.TRACE_EXPORTER
+        if exporter == "file":
+            self.exporter = FileTraceExporter(settings.TRACE_DIR)
+        else:
+            self.exporter = RedisTraceExporter(cache_manager)
+        self._open: Dict[str, tuple] = {}  # root span_id -> (trace, context tokens)
+        self.stats = {
+            'traces': 0,
+            'spans': 0,
+            'dropped_spans': 0,
+            'export_errors': 0
+        }
+
+    def start_trace(self, execution_id: str, **attributes) -> Optional[Span]:
+        if not self.enabled:
+            return None
+        trace = Trace(execution_id)
+        root = Span("execution", execution_id, None, **attributes)
+        self._open[root.span_id] = (trace, _current_trace.set(trace), _current_span.set(root))
+        return root
+
+    def finish_trace(self, root: Optional[Span], status: str = "ok", error: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Close the root span and export the run; returns the exported run"""
+        if root is None:
+            return None
+        trace, trace_token, span_token = self._open.pop(root.span_id)
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+        root.end()
+        root.set(status=status)
+        if error:
+            root.fail(error)
+        spans = [root.to_dict()] + [item.to_dict() for item in trace.spans]
+
+        self.stats['traces'] += 1
+        self.stats['spans'] += len(spans)
+        self.stats['dropped_spans'] += trace.dropped
+        run = {
+            "started_at": root.start,
+            "duration_ms": root.duration_ms,
+            "status": status,
+            "dropped_spans": trace.dropped,
+            "spans": spans
+        }
+        try:
+            self.exporter.export(root.trace_id, run)
+        except Exception as e:
+            self.stats['export_errors'] += 1
+            print(f"✗ Trace export failed for {root.trace_id}: {e}")
+        return run
+
+    def get_trace(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        runs = self.exporter.load(execution_id)
+        if not runs:
+            return None
+        return {
+            "execution_id": execution_id,
+            "runs": runs,
+            "summary": summarize([item for run in runs for item in run["spans"]])
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'enabled': self.enabled, 'exporter': self.exporter.name}
@@ -0,0 +1,303 @@
+"""
+Workflow Triggers - In-process cron scheduler for recurring workflows
+Cron triggers are stored next to their workflow in the CacheManager; one
+process (leader, elected through a lock in Redis) fires them through the
+normal submit path, and every fire is claimed per trigger and slot so a
+leader handover never runs a slot twice
+"""
+
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, date
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Set, Tuple
+from config import settings
+from workflow.scheduler import PRIORITIES
+
+
+class CronError(ValueError):
+    """Raised for invalid cron expressions and triggers"""
+
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *"
+}
+
+MONTH_NAMES = {name: number for number, name in enumerate(
+    ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"], 1)}
+DAY_NAMES = {name: number for number, name in enumerate(["SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"])}
+
+LEADER_LOCK = "triggers:leader"
+
+
+class CronExpression:
+    """
+    Standard 5-field cron: minute hour day-of-month month day-of-week
+
+    Fields accept *, lists (1,15), ranges (1-5), steps (*/15, 8-18/2) and
+    JAN-DEC / SUN-SAT names; day-of-week 0 and 7 are Sunday. As in cron, when
+    both day fields are restricted a day matches if either does.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        fields = MACROS.get(self.expression.lower(), self.expression).split()
+        if len(fields) != 5:
+            raise CronError(f"Cron expression needs 5 fields: '{expression}'")
+
+        self.minutes = self._parse(fields[0], 0, 59)
+        self.hours = self._parse(fields[1], 0, 23)
+        self.days = self._parse(fields[2], 1, 31)
+        self.months = self._parse(fields[3], 1, 12, MONTH_NAMES)
+        self.weekdays = {day % 7 for day in self._parse(fields[4], 0, 7, DAY_NAMES)}
+        # As in cron, a field starting with * (also */2) leaves that day field unrestricted
+        self.any_day = fields[2].startswith("*")
+        self.any_weekday = fields[4].startswith("*")
+
+    def _parse(self, field: str, low: int, high: int, names: Optional[Dict[str, int]] = None) -> Set[int]:
+        values = set()
+        for part in field.upper().split(","):
+            spec, _, step = part.partition("/")
+            if spec == "*":
+                start, end = low, high
+            else:
+                first, _, last = spec.partition("-")
+                start = self._value(first, names)
+                end = self._value(last, names) if last else (high if step else start)
+            step = int(step) if step.isdigit() else (1 if not step else 0)
+            if step < 1 or not (low <= start <= end <= high):
+                raise CronError(f"Invalid cron field '{field}' in '{self.expression}'")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _value(self, token: str, names: Optional[Dict[str, int]]) -> int:
+        if names and token in names:
+            return names[token]
+        if not token.isdigit():
+            raise CronError(f"Invalid cron value '{token}' in '{self.expression}'")
+        return int(token)
+
+    def _day_matches(self, day: date) -> bool:
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, moment: datetime) -> Optional[datetime]:
+        """First matching minute strictly after `moment` (None within 5 years)"""
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        hours, minutes = sorted(self.hours), sorted(self.minutes)
+        for offset in range(366 * 5):
+            day = start.date() + timedelta(days=offset)
+            if not self._day_matches(day):
+                continue
+            for hour in hours:
+                if offset == 0 and hour < start.hour:
+                    continue
+                for minute in minutes:
+                    if offset == 0 and hour == start.hour and minute < start.minute:
+                        continue
+                    return datetime(day.year, day.month, day.day, hour, minute)
+        return None
+
+
+def normalize_triggers(triggers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Validate triggers of one workflow and fill in defaults
+
+    Raises:
+        CronError: if a cron expression or priority is invalid
+    """
+    normalized = []
+    for trigger in triggers:
+        if not trigger.get("cron"):
+            raise CronError("Every trigger needs a 'cron' expression")
+        CronExpression(trigger["cron"])
+        priority = trigger.get("priority", "scheduled")
+        if priority not in PRIORITIES:
+            raise CronError(f"Unknown priority: {priority} (expected one of {', '.join(PRIORITIES)})")
+        normalized.append({
+            "id": trigger.get("id") or str(uuid.uuid4())[:8],
+            "cron": trigger["cron"],
+            "input_data": trigger.get("input_data", {}),
+            "priority": priority,
+            "enabled": trigger.get("enabled", True),
+            "prewarm": trigger.get("prewarm", True)
+        })
+    return normalized
+
+
+class TriggerScheduler:
+    """
+    Polls the stored triggers every TRIGGER_POLL_SECONDS
+
+    - Leader only: the process holding LEADER_LOCK fires; the others stand by
+      and take over within TRIGGER_LEADER_TTL if it dies
+    - Exactly once: each fire first claims trigger:{workflow}:{trigger}:{slot}
+    - A new leader fires slots it missed within TRIGGER_LOOKBACK_SECONDS; older
+      ones are skipped rather than replayed
+    - prewarm(workflow_id) runs TRIGGER_PREWARM_SECONDS before a slot
+    """
+
+    def __init__(
+        self,
+        cache_manager,
+        submit: Callable[..., Awaitable[Dict[str, Any]]],
+        prewarm: Optional[Callable[[str], Awaitable[Any]]] = None
+    ):
+        self.cache_manager = cache_manager
+        self.submit = submit
+        self.prewarm = prewarm
+        self.instance_id = f"{socket.gethostname()}-{os.getpid()}"
+        self.is_leader = False
+        self._checked_until: Optional[datetime] = None
+        self._prewarmed: Set[Tuple[str, str, str]] = set()
+        self._task: Optional[asyncio.Future] = None
+        self.stats = {
+            'fired': 0,
+            'fire_errors': 0,
+            'skipped_claimed': 0,
+            'prewarms': 0,
+            'leader_changes': 0
+        }
+
+    # ========================================================================
+    # LIFECYCLE
+    # ========================================================================
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._loop())
+            print(f"✓ Trigger scheduler started ({self.instance_id})")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.is_leader:
+            self.cache_manager.release_lock(LEADER_LOCK, self.instance_id)
+            self.is_leader = False
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                print(f"✗ Trigger scheduler tick failed: {e}")
+            await asyncio.sleep(settings.TRIGGER_POLL_SECONDS)
+
+    # ========================================================================
+    # FIRING
+    # ========================================================================
+
+    def _elect(self) -> bool:
+        leader = self.cache_manager.acquire_lock(LEADER_LOCK, self.instance_id, settings.TRIGGER_LEADER_TTL)
+        if leader != self.is_leader:
+            self.is_leader = leader
+            self.stats['leader_changes'] += 1
+            self._checked_until = None
+            print(f"{'✓ Took' if leader else '✗ Lost'} trigger scheduler leadership ({self.instance_id})")
+        return leader
+
+    async def tick(self, now: Optional[datetime] = None):
+        """Fire every slot due since the last tick, prewarm the ones coming up"""
+        if not self._elect():
+            return
+
+        now = now or datetime.now()
+        since = self._checked_until or now - timedelta(seconds=settings.TRIGGER_LOOKBACK_SECONDS)
+        self._checked_until = now
+
+        for workflow_id, triggers in self.cache_manager.list_triggers().items():
+            for trigger in triggers:
+                if not trigger.get("enabled", True):
+                    continue
+                cron = CronExpression(trigger["cron"])
+
+                slot = cron.next_after(since)
+                while slot is not None and slot <= now:
+                    await self._fire(workflow_id, trigger, slot)
+                    slot = cron.next_after(slot)
+
+                if slot and self.prewarm and trigger.get("prewarm", True) \
+                        and (slot - now).total_seconds() <= settings.TRIGGER_PREWARM_SECONDS:
+                    await self._prewarm(workflow_id, trigger, slot)
+
+    async def _fire(self, workflow_id: str, trigger: Dict[str, Any], slot: datetime):
+        claim = f"trigger:{workflow_id}:{trigger['id']}:{slot.isoformat()}"
+        if not self.cache_manager.set_if_absent(claim, self.instance_id, 86400):
+            self.stats['skipped_claimed'] += 1
+            return
+
+        if not self.cache_manager.get_workflow(workflow_id):
+            return
+
+        execution_id = str(uuid.uuid4())
+        self.cache_manager.update_execution_fields(execution_id, {
+            "trigger": {"workflow_id": workflow_id, "trigger_id": trigger["id"], "slot": slot.isoformat()}
+        })
+        try:
+            await self.submit(
+                workflow_id, trigger.get("input_data", {}), execution_id,
+                priority=trigger.get("priority", "scheduled")
+            )
+            self.stats['fired'] += 1
+            print(f"⏰ Fired trigger {trigger['id']} of workflow {workflow_id} for {slot:%Y-%m-%d %H:%M}")
+        except Exception as e:
+            self.stats['fire_errors'] += 1
+            self.cache_manager.update_execution_status(execution_id, status="failed", error=f"Trigger fire failed: {e}")
+            print(f"✗ Trigger {trigger['id']} of workflow {workflow_id} failed to fire: {e}")
+
+    async def _prewarm(self, workflow_id: str, trigger: Dict[str, Any], slot: datetime):
+        key = (workflow_id, trigger["id"], slot.isoformat())
+        if key in self._prewarmed:
+            return
+        self._prewarmed = {entry for entry in self._prewarmed if entry[2] >= datetime.now().isoformat()}
+        self._prewarmed.add(key)
+        self.stats['prewarms'] += 1
+        try:
+            await self.prewarm(workflow_id)
+        except Exception as e:
+            print(f"✗ Prewarm of workflow {workflow_id} failed: {e}")
+
+    # ========================================================================
+    # INSPECTION
+    # ========================================================================
+
+    def upcoming(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Next run of every enabled trigger, soonest first"""
+        now = datetime.now()
+        runs = []
+        for workflow_id, triggers in self.cache_manager.list_triggers().items():
+            for trigger in triggers:
+                if not trigger.get("enabled", True):
+                    continue
+                next_run = CronExpression(trigger["cron"]).next_after(now)
+                if next_run:
+                    runs.append({
+                        "workflow_id": workflow_id,
+                        "trigger_id": trigger["id"],
+                        "cron": trigger["cron"],
+                        "next_run": next_run.isoformat()
+                    })
+        runs.sort(key=lambda run: run["next_run"])
+        return runs[:limit]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'instance_id': self.instance_id,
+            'leader': self.is_leader,
+            'upcoming': self.upcoming(5)
+        }
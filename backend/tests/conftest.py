@@ -0,0 +1,195 @@
+"""
+Test setup - the app uses flat imports (from config import settings), so
+backend/app goes on sys.path. Run from backend/:
+
+    python -m pytest tests
+
+Queue tests need a Redis server (6.2+ for XAUTOCLAIM) at TEST_REDIS_HOST /
+TEST_REDIS_PORT (default localhost:6379). They use TEST_REDIS_DB (default 15),
+which is flushed around each test, and are skipped if Redis is unreachable.
+
+Everything else runs in-process: the cache_manager fixture is a CacheManager
+on fakeredis, and FakeDriver stands in for cx_Oracle.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+REDIS_PARAMS = {
+    "host": os.environ.get("TEST_REDIS_HOST", "localhost"),
+    "port": int(os.environ.get("TEST_REDIS_PORT", "6379")),
+    "db": int(os.environ.get("TEST_REDIS_DB", "15"))
+}
+
+
+def run(coro):
+    """Run a coroutine to completion on a fresh event loop"""
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def redis_params():
+    """Connection parameters of a flushed test database"""
+    redis = pytest.importorskip("redis")
+    client = redis.Redis(**REDIS_PARAMS)
+    try:
+        client.ping()
+    except redis.ConnectionError:
+        pytest.skip(f"No Redis server at {REDIS_PARAMS['host']}:{REDIS_PARAMS['port']}")
+    client.flushdb()
+    yield dict(REDIS_PARAMS)
+    client.flushdb()
+    client.close()
+
+
+@pytest.fixture
+def cache_manager(monkeypatch):
+    """CacheManager connected to a fresh in-process fakeredis server"""
+    fakeredis = pytest.importorskip("fakeredis")
+    import cache_manager as module
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(module.redis, "Redis", lambda **params: fakeredis.FakeRedis(server=server, **params))
+    return module.CacheManager()
+
+
+@pytest.fixture
+def orchestrator(cache_manager, monkeypatch, tmp_path):
+    """WorkflowOrchestrator on the fakeredis cache, without credentials"""
+    from config import settings
+    monkeypatch.setattr(settings, "REPORT_DIR", str(tmp_path / "reports"))
+    from orchestrator import WorkflowOrchestrator
+    return WorkflowOrchestrator(cache_manager, None)
+
+
+# ============================================================================
+# FAKE ORACLE DRIVER
+# ============================================================================
+
+class FakeBatchError:
+    """Row error reported by cursor.getbatcherrors()"""
+
+    def __init__(self, offset, code, message):
+        self.offset = offset
+        self.code = code
+        self.message = message
+
+
+class FakeCursor:
+    """
+    DB-API cursor answering from its connection:
+    respond(sql, params) -> (columns, rows) for execute() and
+    respond_many(sql, rows) -> (batch errors, row counts) for executemany()
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.description = None
+        self.rowcount = 0
+        self._rows = []
+        self._errors = []
+        self._counts = []
+
+    def execute(self, sql, params=None):
+        self.connection.executed.append((sql, params))
+        columns, rows = self.connection.respond(sql, params)
+        self.description = [(column,) for column in columns] or None
+        self._rows = list(rows)
+        self.rowcount = len(self._rows)
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size):
+        self.connection.fetches += 1
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+    def setinputsizes(self, **sizes):
+        self.connection.input_sizes.append(sizes)
+
+    def executemany(self, sql, rows, batcherrors=False, arraydmlrowcounts=False):
+        rows = list(rows)
+        self.connection.executemany_calls.append((sql, rows))
+        self._errors, self._counts = self.connection.respond_many(sql, rows)
+
+    def getbatcherrors(self):
+        return self._errors
+
+    def getarraydmlrowcounts(self):
+        return self._counts
+
+    def close(self):
+        pass
+
+
+class FakeCollection(list):
+    """Object of an Oracle collection type (newobject().extend())"""
+
+
+class FakeCollectionType:
+    def newobject(self):
+        return FakeCollection()
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.closed = False
+        self.rollbacks = 0
+        self.commits = 0
+        self.fail_rollback = False
+        self.callTimeout = 0
+        self.collection_type = None
+        self.executed = []
+        self.executemany_calls = []
+        self.input_sizes = []
+        self.fetches = 0
+        self.respond = lambda sql, params: ([], [])
+        self.respond_many = lambda sql, rows: ([], [1] * len(rows))
+
+    def ping(self):
+        if not self.alive:
+            raise RuntimeError("ORA-03113: end-of-file on communication channel")
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def gettype(self, name):
+        if self.collection_type is None:
+            raise RuntimeError(f"ORA-04043: object {name} does not exist")
+        return self.collection_type
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        if self.fail_rollback:
+            raise RuntimeError("ORA-03114: not connected to ORACLE")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDriver:
+    """Stands in for cx_Oracle: makedsn() and connect()"""
+
+    def __init__(self):
+        self.connections = []
+
+    def makedsn(self, host, port, service_name=None):
+        return f"{host}:{port}/{service_name}"
+
+    def connect(self, user=None, password=None, dsn=None, encoding=None):
+        connection = FakeConnection(len(self.connections) + 1)
+        self.connections.append(connection)
+        return connection
@@ -0,0 +1,102 @@
+"""
+Checkpoint resume (orchestrator.execute_workflow): completed nodes are
+restored on resume, failed ones re-run, and a parent whose result changed
+re-runs its children
+"""
+
+import pytest
+
+from conftest import run
+
+
+class Broadcasts:
+    def __init__(self):
+        self.events = []
+
+    async def broadcast(self, event):
+        self.events.append(event)
+
+
+class Nodes:
+    """Stands in for _execute_node: records calls, answers from outputs"""
+
+    def __init__(self):
+        self.calls = []
+        self.upstream = {}
+        self.outputs = {}
+
+    async def __call__(self, node, input_data, previous_results, handle=None, streaming=False):
+        self.calls.append(node["id"])
+        self.upstream[node["id"]] = previous_results
+        output = self.outputs.get(node["id"], {"success": True, "node": node["id"]})
+        return output(previous_results) if callable(output) else output
+
+
+@pytest.fixture
+def nodes(orchestrator, cache_manager):
+    cache_manager.set_workflow("wf", {
+        "nodes": [{"id": node_id, "type": "llm", "config": {}} for node_id in ("load", "check", "report", "other")],
+        "edges": [{"source": "load", "target": "check"}, {"source": "check", "target": "report"}]
+    })
+    nodes = Nodes()
+    orchestrator._execute_node = nodes
+    return nodes
+
+
+def execute(orchestrator, resume=False):
+    run(orchestrator.execute_workflow("wf", {"cusips": ["A1"]}, "exec-1", Broadcasts(), resume=resume))
+    return orchestrator.cache_manager.get_execution("exec-1")
+
+
+def test_resume_reruns_only_the_failed_node(orchestrator, nodes):
+    nodes.outputs["report"] = {"success": False, "error": "disk full"}
+    assert execute(orchestrator)["status"] == "completed"
+
+    del nodes.outputs["report"]
+    nodes.calls.clear()
+    execution = execute(orchestrator, resume=True)
+
+    assert nodes.calls == ["report"]
+    assert sorted(execution["restored_nodes"]) == ["check", "load", "other"]
+    assert execution["result"]["report"]["success"]
+
+
+def test_changed_parent_result_reruns_its_children(orchestrator, nodes):
+    nodes.outputs["load"] = {"success": False, "error": "ORA-12541"}
+    nodes.outputs["check"] = lambda upstream: {"success": True, "rows": upstream["load"].get("row_count")}
+    execute(orchestrator)
+
+    nodes.outputs["load"] = {"success": True, "row_count": 2}
+    nodes.calls.clear()
+    execution = execute(orchestrator, resume=True)
+
+    assert nodes.calls == ["load", "check", "report"]
+    assert execution["restored_nodes"] == ["other"]
+
+
+def test_rerun_with_an_identical_result_restores_its_children(orchestrator, nodes, cache_manager):
+    execute(orchestrator)
+    checkpoint = cache_manager.get_node_checkpoints("exec-1")["load"]
+    cache_manager.save_node_checkpoint("exec-1", "load", {**checkpoint, "fingerprint": "stale"})
+
+    nodes.calls.clear()
+    execute(orchestrator, resume=True)
+
+    # Same result, same digest: check and report still match their checkpoints
+    assert nodes.calls == ["load"]
+
+
+def test_spilled_parent_is_restored_from_the_spill_store(orchestrator, nodes, monkeypatch):
+    monkeypatch.setattr(orchestrator.spill, "threshold_bytes", 500)
+    rows = [{"CUSIP": f"C{i:05d}", "PRICING_STATUS": "PRICED"} for i in range(100)]
+    nodes.outputs["load"] = {"success": True, "row_count": 100, "data": rows}
+    nodes.outputs["check"] = {"success": False, "error": "timeout"}
+    execution = execute(orchestrator)
+    assert orchestrator.spill.is_handle(execution["result"]["load"])
+
+    del nodes.outputs["check"]
+    nodes.calls.clear()
+    execute(orchestrator, resume=True)
+
+    assert nodes.calls == ["check", "report"]
+    assert nodes.upstream["check"]["load"]["data"] == rows
@@ -0,0 +1,41 @@
+"""
+Condition expressions (workflow/conditions.py): evaluation over upstream
+results and the whitelist that keeps them safe
+"""
+
+import pytest
+
+from workflow.conditions import ConditionError, compile_expression, evaluate_condition, normalize_branch_label
+
+
+def test_comparisons_and_lookups_over_results():
+    context = {"status": "FAILED", "price": 101.5, "check": {"row_count": 3, "data": [{"CUSIP": "A1"}]}}
+
+    assert evaluate_condition("status == 'FAILED' and price > 100", context)
+    assert evaluate_condition("check.row_count > 0 and len(check.data) == 1", context)
+    assert evaluate_condition("check.data[0].CUSIP in ['A1', 'B2']", context)
+    assert not evaluate_condition("missing > 0", context)  # unknown names are None, comparison is False
+    assert evaluate_condition("price * 2 > 200", context)
+
+
+def test_multiplication_is_limited_to_numbers():
+    # Sequence repetition evaluates to None instead of building the sequence
+    assert not evaluate_condition("len([0] * 1000000000) > 0", {})
+    assert not evaluate_condition("status * 3 == 'xxx'", {"status": "x"})
+    assert evaluate_condition("count * 1.5 == 3", {"count": 2})
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os')",
+    "open('/etc/passwd')",
+    "price.__class__",
+    "[x for x in range(3)]",
+    "lambda: 1"
+])
+def test_unsafe_syntax_is_rejected(expression):
+    with pytest.raises(ConditionError):
+        compile_expression(expression)
+
+
+def test_branch_labels_normalize():
+    assert [normalize_branch_label(label) for label in ("Yes", " then ", "ELSE", 0)] == ["true", "true", "false", "false"]
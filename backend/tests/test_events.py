@@ -0,0 +1,111 @@
+"""
+Execution event hub (workflow/events.py): coalescing per window, the drop
+policy under backpressure, subscriptions and large results by reference
+"""
+
+import asyncio
+import json
+
+from conftest import run
+from workflow.events import ExecutionEventHub, EventSubscriber, encoded_size
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.accepted = False
+        self.frames = []
+
+    async def accept(self):
+        self.accepted = True
+
+    async def send_text(self, text):
+        self.frames.append(json.loads(text))
+
+
+def progress(execution_id, node_id, done):
+    return {"type": "node_progress", "execution_id": execution_id, "node_id": node_id, "done": done}
+
+
+def test_window_keeps_latest_progress_per_node_and_every_transition():
+    async def scenario():
+        hub = ExecutionEventHub(coalesce_ms=20, inline_result_bytes=1000, client_queue_size=100)
+        websocket = FakeWebSocket()
+        await hub.connect(websocket)
+
+        for done in range(10):
+            await hub.broadcast(progress("e1", "map", done))
+        await hub.broadcast(progress("e1", "query", 1))
+        await hub.broadcast({"type": "node_completed", "execution_id": "e1", "node_id": "query", "result": {"ok": 1}})
+        await hub.broadcast({"type": "node_completed", "execution_id": "e1", "node_id": "map", "result": {"ok": 2}})
+        await asyncio.sleep(0.05)
+        hub.disconnect(websocket)
+        return websocket, hub
+
+    websocket, hub = run(scenario())
+
+    frame, = websocket.frames
+    assert frame["type"] == "batch"
+    assert [(e["type"], e["node_id"], e.get("done")) for e in frame["events"]] == [
+        ("node_progress", "map", 9), ("node_progress", "query", 1),
+        ("node_completed", "query", None), ("node_completed", "map", None)
+    ]
+    assert hub.get_stats()["frames_sent"] == 1
+
+
+def test_full_queue_drops_oldest_progress_but_never_transitions():
+    subscriber = EventSubscriber(FakeWebSocket(), None, max_queue=3)
+    subscriber.push("node_progress", ("node_progress", "e1", "a"), "p1")
+    subscriber.push("node_completed", None, "c1")
+    subscriber.push("node_completed", None, "c2")
+    subscriber.push("node_completed", None, "c3")  # drops p1
+    subscriber.push("execution_completed", None, "done")  # nothing droppable: grows past max_queue
+
+    assert [encoded for _, _, encoded in subscriber.queue] == ["c1", "c2", "c3", "done"]
+    assert subscriber.dropped == 1 and subscriber.overflowed == 1
+    assert subscriber.drain() == ["c1", "c2", "c3", "done"]
+
+
+def test_subscriptions_filter_executions():
+    async def scenario():
+        hub = ExecutionEventHub(coalesce_ms=0, inline_result_bytes=1000, client_queue_size=10)
+        everything, only_e2 = FakeWebSocket(), FakeWebSocket()
+        await hub.connect(everything)
+        await hub.connect(only_e2, ["e2"])
+
+        await hub.broadcast({"type": "execution_status", "execution_id": "e1", "status": "running"})
+        await hub.broadcast({"type": "execution_status", "execution_id": "e2", "status": "running"})
+        hub.handle_client_message(everything, {"action": "subscribe", "execution_id": "e1"})
+        await hub.broadcast({"type": "execution_status", "execution_id": "e2", "status": "completed"})
+        await asyncio.sleep(0.01)
+        return everything, only_e2
+
+    everything, only_e2 = run(scenario())
+
+    events = lambda ws: [(event["execution_id"], event["status"]) for frame in ws.frames for event in frame["events"]]
+    # Subscribing to e1 ends the catch-all subscription
+    assert events(everything) == [("e1", "running"), ("e2", "running")]
+    # Both e2 statuses fell in one window: only the latest is sent
+    assert events(only_e2) == [("e2", "completed")]
+
+
+def test_large_results_go_by_reference_and_completion_carries_status_only():
+    hub = ExecutionEventHub(coalesce_ms=0, inline_result_bytes=100, client_queue_size=10)
+    result = {"success": True, "row_count": 50, "data": [{"CUSIP": f"C{i}"} for i in range(50)]}
+
+    compact = hub._compact({"type": "node_completed", "execution_id": "e1", "node_id": "q", "result": result})
+    assert compact["result"]["result_ref"] == "/api/executions/e1/nodes/q/result"
+    assert compact["result"]["summary"]["row_count"] == 50
+    assert compact["result"]["size_bytes"] is None
+
+    small = {"type": "node_completed", "execution_id": "e1", "node_id": "c", "result": {"success": True}}
+    assert hub._compact(small) is small
+
+    done = hub._compact({"type": "execution_completed", "execution_id": "e1",
+                         "results": {"q": result, "c": {"success": False}}})
+    assert done["node_status"] == {"q": True, "c": False} and "results" not in done
+
+
+def test_encoded_size_stops_past_the_limit():
+    big = {"data": ["x" * 100] * 10000}
+    assert 100 < encoded_size(big, 100) < 10000
+    assert encoded_size({"a": 1}, 100) == len('{"a": 1}')
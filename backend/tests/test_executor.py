@@ -0,0 +1,154 @@
+"""
+DAG executor (workflow/executor.py): parallel ready nodes, branch pruning
+past untaken condition edges, stream materialization and per-run interrupt keys
+"""
+
+import asyncio
+
+import pytest
+
+from conftest import run
+from workflow.control import ExecutionHandle, interrupt_key
+from workflow.executor import WorkflowGraph, DAGExecutor
+from workflow.streams import RowStream
+
+
+def node(node_id, node_type="llm", **config):
+    return {"id": node_id, "type": node_type, "config": config}
+
+
+def edge(source, target, label=None):
+    return {"source": source, "target": target, **({"label": label} if label else {})}
+
+
+def test_topological_order_and_cycle_detection():
+    graph = WorkflowGraph([node("c"), node("a"), node("b")], [edge("a", "b"), edge("b", "c")])
+    assert graph.order == ["a", "b", "c"]
+    assert graph.roots == ["a"]
+
+    with pytest.raises(ValueError, match="cycle"):
+        WorkflowGraph([node("a"), node("b")], [edge("a", "b"), edge("b", "a")])
+
+
+def test_independent_nodes_run_concurrently_and_children_see_direct_parents():
+    graph = WorkflowGraph(
+        [node("oracle"), node("unix1"), node("unix2"), node("join")],
+        [edge("oracle", "join"), edge("unix1", "join"), edge("unix2", "join")]
+    )
+    running, peak, seen = set(), [0], {}
+
+    async def run_node(current, upstream):
+        running.add(current["id"])
+        peak[0] = max(peak[0], len(running))
+        await asyncio.sleep(0.02)
+        running.discard(current["id"])
+        seen[current["id"]] = sorted(upstream)
+        return {"success": True, "node": current["id"]}
+
+    results = run(DAGExecutor(graph, run_node).run())
+
+    assert peak[0] == 3
+    assert seen["join"] == ["oracle", "unix1", "unix2"]
+    assert set(results) == {"oracle", "unix1", "unix2", "join"}
+
+
+def test_untaken_branch_is_pruned_transitively():
+    graph = WorkflowGraph(
+        [node("check"), node("gate", "condition"), node("logs"), node("notify"), node("report"), node("done")],
+        [edge("check", "gate"), edge("gate", "logs", "yes"), edge("logs", "notify"),
+         edge("gate", "report", "else"), edge("notify", "done"), edge("report", "done")]
+    )
+    started, skipped = [], []
+
+    async def run_node(current, upstream):
+        started.append(current["id"])
+        if current["type"] == "condition":
+            return {"success": True, "branch": "false"}
+        return {"success": True, "parents": sorted(upstream)}
+
+    async def on_skipped(node_id):
+        skipped.append(node_id)
+
+    executor = DAGExecutor(graph, run_node, on_node_skipped=on_skipped)
+    results = run(executor.run())
+
+    assert executor.skipped == skipped == ["logs", "notify"]
+    assert "logs" not in started and "notify" not in started
+    # The join runs with its live parent only
+    assert results["done"]["parents"] == ["report"]
+
+
+def test_map_branches_keep_every_taken_label_live():
+    graph = WorkflowGraph(
+        [node("gate", "condition"), node("yes"), node("no")],
+        [edge("gate", "yes", "true"), edge("gate", "no", "false")]
+    )
+    assert graph.edge_taken("gate", "yes", {"branches": ["false", "true"]})
+    assert graph.edge_taken("gate", "no", {"branches": ["false", "true"]})
+    assert not graph.edge_taken("gate", "yes", {"branches": []})
+    assert not graph.edge_taken("gate", "yes", None)
+
+
+def test_stream_is_materialized_before_completion_when_a_child_waits_on_others():
+    graph = WorkflowGraph(
+        [node("query", "oracle"), node("slow"), node("join")],
+        [edge("query", "join"), edge("slow", "join")]
+    )
+    events = []
+
+    async def run_node(current, upstream):
+        if current["id"] == "query":
+            stream = RowStream("query", buffer_batches=2)
+
+            async def produce():
+                await stream.put(["CUSIP"], [{"CUSIP": "A1"}, {"CUSIP": "B2"}])
+                await stream.finish()
+
+            stream.producer = asyncio.ensure_future(produce())
+            return {"success": True, "stream": stream}
+        if current["id"] == "slow":
+            await asyncio.sleep(0.02)
+        return {"success": True, "inputs": {k: v.get("row_count") for k, v in upstream.items()}}
+
+    async def materialized(node_id, result):
+        events.append(("materialized", node_id, result["row_count"]))
+
+    async def completed(node_id, result):
+        events.append(("completed", node_id))
+
+    results = run(DAGExecutor(graph, run_node, completed, on_stream_materialized=materialized).run())
+
+    assert events.index(("materialized", "query", 2)) < events.index(("completed", "query"))
+    assert results["query"]["data"] == [{"CUSIP": "A1"}, {"CUSIP": "B2"}]
+    assert results["join"]["inputs"] == {"query": 2, "slow": None}
+
+
+def test_parallel_runs_of_one_node_get_their_own_interrupt_keys():
+    """A map runs the same child id in several batches at once; timeouts must not cross batches"""
+    slow_graph = WorkflowGraph([node("check", "oracle", timeout=0.05)], [])
+    graph = WorkflowGraph([node("check", "oracle")], [])
+
+    async def scenario():
+        handle = ExecutionHandle("exec-1", timeout=5)
+        keys, interrupted = {}, []
+
+        async def run_node(current, upstream):
+            slow = bool(current["config"].get("timeout"))
+            key = keys["slow" if slow else "fast"] = interrupt_key(current["id"])
+            handle.register_interrupt(key, lambda: interrupted.append(key))
+            if slow:
+                await asyncio.sleep(1)  # overruns its 0.05s node timeout
+            return {"success": True}
+
+        first = asyncio.ensure_future(DAGExecutor(slow_graph, run_node, handle=handle).run())
+        await asyncio.sleep(0)
+        second = await DAGExecutor(graph, run_node, handle=handle).run()
+        first = await first
+        return keys, interrupted, first, second, handle
+
+    keys, interrupted, first, second, handle = run(scenario())
+
+    assert keys["slow"] != keys["fast"] and all(key.startswith("check:") for key in keys.values())
+    assert interrupted == [keys["slow"]]
+    assert first["check"]["timed_out"] and second["check"]["success"]
+    assert handle._interrupts == {}
@@ -0,0 +1,108 @@
+"""
+Map nodes (orchestrator._execute_map_node): batching and de-duplication,
+the max_parallel cap, one bulk status query per batch and per-item
+condition pruning of the child sub-flow
+"""
+
+import asyncio
+
+import pytest
+
+from conftest import run
+from mcp_servers.oracle_mcp import STATUS_COLUMNS
+from orchestrator import SKIPPED_ITEM
+
+# Every tenth CUSIP failed pricing, every seventh is not in pricing_master
+CUSIPS = [f"C{i:05d}" for i in range(1200)]
+STATUSES = {cusip: [cusip, 100.0, "2024-01-02", "FAILED" if i % 10 == 0 else "PRICED", None, None]
+            for i, cusip in enumerate(CUSIPS) if i % 7}
+
+
+class Children:
+    """Stands in for the oracle (bulk) and unix node executors"""
+
+    def __init__(self):
+        self.bulk_sizes = []
+        self.logs_checked = []
+        self.running = 0
+        self.peak = 0
+
+    async def oracle(self, node_id, config, input_data, handle=None):
+        assert config["action"] == "check_pricing_status_bulk"
+        self.bulk_sizes.append(len(input_data["cusips"]))
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        found = {cusip: STATUSES[cusip] for cusip in input_data["cusips"] if cusip in STATUSES}
+        return {"success": True, "columns": STATUS_COLUMNS, "statuses": found,
+                "missing": [cusip for cusip in input_data["cusips"] if cusip not in found]}
+
+    async def unix(self, node_id, config, input_data, handle=None):
+        self.logs_checked.append(input_data["cusip"])
+        return {"success": True, "output": f"no errors for {input_data['cusip']}"}
+
+
+@pytest.fixture
+def children(orchestrator, monkeypatch):
+    children = Children()
+    monkeypatch.setattr(orchestrator, "_execute_oracle_node", children.oracle)
+    monkeypatch.setattr(orchestrator, "_execute_unix_node", children.unix)
+    return children
+
+
+def map_node(**config):
+    return {"id": "per_cusip", "type": "map", "config": {
+        "nodes": [
+            {"id": "lookup", "type": "oracle", "config": {"action": "check_pricing_status"}},
+            {"id": "gate", "type": "condition", "config": {"expression": "status != 'PRICED'"}},
+            {"id": "logs", "type": "unix", "config": {"action": "check_pricing_job_logs"}}
+        ],
+        "edges": [
+            {"source": "lookup", "target": "gate"},
+            {"source": "gate", "target": "logs", "label": "true"}
+        ],
+        **config
+    }}
+
+
+def test_items_are_deduplicated_and_batched_with_one_bulk_query_each(orchestrator, children):
+    result = run(orchestrator._execute_map_node(
+        map_node(batch_size=500, max_parallel=2), {"cusips": CUSIPS + CUSIPS[:50]}, {}
+    ))
+
+    assert result["item_count"] == 1200 and result["batch_count"] == 3
+    assert sorted(children.bulk_sizes) == [200, 500, 500]
+    assert children.peak == 2
+
+
+def test_condition_prunes_per_item_and_failures_are_reported(orchestrator, children):
+    result = run(orchestrator._execute_map_node(map_node(batch_size=500), {"cusips": CUSIPS}, {}))
+
+    missing = [cusip for cusip in CUSIPS if cusip not in STATUSES]
+    failed_pricing = [cusip for cusip, values in STATUSES.items() if values[3] == "FAILED"]
+    # Only CUSIPs whose status is not PRICED (failed or not found) get a log check
+    assert sorted(children.logs_checked) == sorted(missing + failed_pricing)
+    assert result["results"]["C00001"] == SKIPPED_ITEM
+    assert result["results"]["C00010"]["output"] == "no errors for C00010"
+
+    # A lookup that did not find the CUSIP fails the item
+    assert result["missing"] == missing
+    assert result["failed_items"] == missing
+    assert result["succeeded"] == 1200 - len(missing) and not result["success"]
+
+
+def test_max_parallel_one_runs_batches_in_turn(orchestrator, children):
+    run(orchestrator._execute_map_node(map_node(batch_size=100, max_parallel=1), {"cusips": CUSIPS}, {}))
+    assert children.bulk_sizes == [100] * 12 and children.peak == 1
+
+
+def test_items_from_an_upstream_result(orchestrator, children):
+    upstream = {"query": {"success": True, "data": [{"CUSIP": cusip} for cusip in CUSIPS[:30]]}}
+    result = run(orchestrator._execute_map_node(
+        map_node(items_from="query.data", item_field="CUSIP", batch_size=25), {}, upstream
+    ))
+    assert result["item_count"] == 30 and children.bulk_sizes == [25, 5]
+
+    bad = run(orchestrator._execute_map_node(map_node(items_from="query.rows"), {}, upstream))
+    assert not bad["success"] and "No item list" in bad["error"]
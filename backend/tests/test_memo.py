@@ -0,0 +1,52 @@
+"""
+Node result memoization (workflow/memo.py): which nodes may be cached and
+what their keys cover
+"""
+
+from config import settings
+from workflow.memo import NodeResultCache, memoizable
+
+QUERY = {"id": "prices", "type": "oracle", "config": {"sql": "SELECT * FROM pricing_master", "cache": True}}
+
+
+def test_only_read_only_nodes_are_memoizable():
+    assert memoizable("llm", {"prompt": "Summarize"})
+    assert memoizable("oracle", {"sql": "  with t as (select 1 from dual) select * from t"})
+    assert memoizable("oracle", {"action": "check_pricing_status"})
+    assert memoizable("unix", {"action": "check_pricing_job_logs"})
+
+    assert not memoizable("oracle", {"sql": "UPDATE pricing_master SET price = 0"})
+    assert not memoizable("oracle", {"action": "update_pricing_status"})
+    assert not memoizable("unix", {"command": "ls /data"})  # execute_command may write
+    assert not memoizable("report", {"format": "csv"})
+    assert not NodeResultCache.enabled_for({"type": "oracle", "config": {"action": "execute_dml", "cache": True}})
+
+
+def test_key_covers_inputs_upstream_digests_and_credentials():
+    key = NodeResultCache.key_for(QUERY, {"date": "2024-01-02"}, {"load": "digest-1"}, "cred-a")
+
+    assert key.startswith("node_result:")
+    assert key == NodeResultCache.key_for(QUERY, {"date": "2024-01-02"}, {"load": "digest-1"}, "cred-a")
+    assert key != NodeResultCache.key_for(QUERY, {"date": "2024-01-03"}, {"load": "digest-1"}, "cred-a")
+    assert key != NodeResultCache.key_for(QUERY, {"date": "2024-01-02"}, {"load": "digest-2"}, "cred-a")
+    assert key != NodeResultCache.key_for(QUERY, {"date": "2024-01-02"}, {"load": "digest-1"}, "cred-b")
+
+    # Cache settings and timeouts do not change what the node returns
+    tuned = {**QUERY, "config": {**QUERY["config"], "cache_ttl": 60, "timeout": 5}}
+    assert key == NodeResultCache.key_for(tuned, {"date": "2024-01-02"}, {"load": "digest-1"}, "cred-a")
+
+
+def test_put_skips_failures_and_oversized_results(cache_manager, monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_SPILL_BYTES", 200)
+    cache = NodeResultCache(cache_manager)
+    result = {"success": True, "row_count": 1, "data": [{"CUSIP": "A1"}]}
+
+    cache.put("node_result:ok", QUERY, result)
+    cache.put("node_result:failed", QUERY, {"success": False, "error": "ORA-00942"})
+    cache.put("node_result:large", QUERY, {"success": True, "data": [{"CUSIP": "X" * 50}] * 10})
+
+    assert cache.get("node_result:ok") == result
+    assert cache.get("node_result:failed") is None
+    assert cache.get("node_result:large") is None
+    assert cache.get_stats()["too_large"] == 1
+    assert 0 < cache_manager.redis.ttl("node_result:ok") <= settings.CACHE_ORACLE_QUERY_TTL
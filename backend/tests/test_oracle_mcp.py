@@ -0,0 +1,95 @@
+"""
+Oracle MCP bulk operations (mcp_servers/oracle_mcp.py) on the fake driver:
+chunked CUSIP status lookups (array binds and IN-lists) and batch DML
+"""
+
+import pytest
+
+from conftest import FakeDriver, FakeBatchError, FakeCollectionType
+from mcp_servers.oracle_mcp import OracleMCPServer, STATUS_COLUMNS, pricing_status_entry
+from mcp_servers.oracle_pool import OracleSessionPool
+
+CREDENTIALS = {"host": "db1", "port": 1521, "service_name": "PRICING", "username": "app", "password": "secret"}
+
+# Every third CUSIP has no row in pricing_master
+PRICED = {f"C{i:05d}": ["Bond %d" % i, 100.0 + i, "2024-01-02", "FAILED" if i % 5 == 0 else "PRICED", None, None]
+          for i in range(2500) if i % 3}
+
+
+def lookup(sql, params):
+    """pricing_master as seen by the bulk status query"""
+    cusips = params["cusips"] if "cusips" in params else list(params.values())
+    return ["CUSIP"] + STATUS_COLUMNS, [(cusip, *PRICED[cusip]) for cusip in cusips if cusip in PRICED]
+
+
+@pytest.fixture
+def oracle():
+    pool = OracleSessionPool(CREDENTIALS, FakeDriver(), min_sessions=0, max_sessions=1)
+    server = OracleMCPServer(pool)
+    success, message = server.connect(CREDENTIALS)
+    assert success, message
+    server.connection.respond = lookup
+    return server
+
+
+def test_bulk_status_falls_back_to_in_lists_of_1000(oracle):
+    cusips = [f"C{i:05d}" for i in range(2500)] + ["C00001", "C00002"]  # duplicates are looked up once
+    result = oracle.check_pricing_status_bulk(cusips)
+
+    assert result["bind_mode"] == "in_list"
+    assert [len(params) for _, params in oracle.connection.executed] == [1000, 1000, 500]
+    assert result["requested"] == 2500 and result["found"] == len(PRICED)
+    assert result["round_trips"] == 3
+    assert set(result["missing"]) == {f"C{i:05d}" for i in range(2500) if not i % 3}
+
+    entry = pricing_status_entry(result, "C00005")
+    assert entry["success"] and entry["status"] == "FAILED" and entry["price"] == 105.0
+    assert not pricing_status_entry(result, "C00003")["success"]
+
+
+def test_bulk_status_array_binds_one_collection_per_query(oracle):
+    oracle.connection.collection_type = FakeCollectionType()
+    cusips = [f"C{i:05d}" for i in range(2500)]
+    result = oracle.check_pricing_status_bulk(cusips, chunk_size=1200)
+
+    assert result["bind_mode"] == "array"
+    assert [len(params["cusips"]) for _, params in oracle.connection.executed] == [1200, 1200, 100]
+    assert all("TABLE(:cusips)" in sql for sql, _ in oracle.connection.executed)
+    assert result["round_trips"] == 4  # gettype + one per chunk
+    assert result["found"] == len(PRICED)
+
+
+def test_dml_batch_commits_per_chunk_and_reports_rejected_rows(oracle):
+    def respond_many(sql, rows):
+        if rows[0]["cusip"] == "C00002":  # second chunk: its second row is rejected
+            return [FakeBatchError(1, 1400, "ORA-01400: cannot insert NULL ")], [1, 0]
+        return [], [1] * len(rows)
+
+    oracle.connection.respond_many = respond_many
+    updates = [{"cusip": f"C{i:05d}", "status": "PRICED"} for i in range(5)]
+    result = oracle.update_pricing_status_bulk(updates, chunk_size=2)
+
+    assert [len(rows) for _, rows in oracle.connection.executemany_calls] == [2, 2, 1]
+    assert oracle.connection.commits == 3 and result["chunks"] == 3
+    assert oracle.connection.input_sizes == [{"error_code": 100}] * 3
+    assert result["rows_affected"] == 4 and result["rows_committed"] == 4
+    assert result["failed_rows"] == [{"index": 3, "code": 1400, "error": "ORA-01400: cannot insert NULL",
+                                      "row": {"cusip": "C00003", "status": "PRICED", "error_code": None}}]
+    assert result["unmatched"] == [] and not result["success"]
+
+
+def test_dml_batch_stops_at_a_failed_chunk(oracle):
+    def respond_many(sql, rows):
+        if rows[0]["cusip"] == "C00002":
+            raise RuntimeError("ORA-03113: end-of-file on communication channel")
+        return [], [1 if row["cusip"] != "C00001" else 0 for row in rows]
+
+    oracle.connection.respond_many = respond_many
+    rows = [{"cusip": f"C{i:05d}", "status": "PRICED", "error_code": None} for i in range(6)]
+    result = oracle.execute_dml_batch("UPDATE pricing_master SET pricing_status = :status WHERE cusip = :cusip",
+                                      rows, chunk_size=2)
+
+    assert not result["success"] and result["error"].startswith("Chunk at row 2 failed")
+    assert result["rows_committed"] == 2 and result["unmatched"] == [1]
+    assert oracle.connection.commits == 1 and oracle.connection.rollbacks == 1
+    assert len(oracle.connection.executemany_calls) == 2
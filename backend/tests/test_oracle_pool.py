@@ -0,0 +1,149 @@
+"""
+Oracle session pool (mcp_servers/oracle_pool.py) with a fake DB-API driver:
+exhaustion, idle eviction, ping on checkout, rollback on release and sharing
+by credential fingerprint
+"""
+
+import threading
+import time
+
+import pytest
+
+from conftest import FakeDriver
+from mcp_servers.oracle_pool import OracleSessionPool, OracleSessionPoolManager, PoolExhaustedError
+
+CREDENTIALS = {"host": "db1", "port": 1521, "service_name": "PRICING", "username": "app", "password": "secret"}
+
+
+def make_pool(driver, **options):
+    params = {"min_sessions": 0, "max_sessions": 2, "idle_timeout": 300, "ping_interval": 60,
+              "checkout_timeout": 0.1}
+    params.update(options)
+    return OracleSessionPool(CREDENTIALS, driver, **params)
+
+
+def test_released_session_is_reused():
+    driver = FakeDriver()
+    pool = make_pool(driver)
+
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+
+    stats = pool.get_stats()
+    assert stats["created"] == 1
+    assert stats["checkouts"] == 2 and stats["reused"] == 1
+    assert stats["in_use"] == 1 and stats["idle"] == 0
+
+
+def test_checkout_fails_when_max_sessions_are_in_use():
+    driver = FakeDriver()
+    pool = make_pool(driver, max_sessions=2, checkout_timeout=0.05)
+    pool.acquire(), pool.acquire()
+
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire()
+    assert len(driver.connections) == 2
+    assert pool.get_stats()["exhausted"] == 1
+
+
+def test_waiting_checkout_gets_released_session():
+    driver = FakeDriver()
+    pool = make_pool(driver, max_sessions=1, checkout_timeout=2)
+    held = pool.acquire()
+    threading.Timer(0.05, pool.release, args=(held,)).start()
+
+    assert pool.acquire() is held
+    stats = pool.get_stats()
+    assert stats["waits"] == 1 and stats["created"] == 1
+
+
+def test_idle_sessions_are_closed_down_to_min_sessions():
+    driver = FakeDriver()
+    pool = make_pool(driver, min_sessions=1, max_sessions=3, idle_timeout=0.05)
+    sessions = [pool.acquire() for _ in range(3)]
+    for connection in sessions:
+        pool.release(connection)
+    assert pool.get_stats()["idle"] == 3
+
+    time.sleep(0.1)
+    kept = pool.acquire()  # expiry runs on checkout
+
+    stats = pool.get_stats()
+    assert stats["idle_closed"] == 2
+    assert stats["open"] == 1
+    assert kept in sessions and not kept.closed
+    assert sum(connection.closed for connection in sessions) == 2
+
+
+def test_dead_session_is_replaced_on_checkout():
+    driver = FakeDriver()
+    pool = make_pool(driver, ping_interval=0)
+    dead = pool.acquire()
+    pool.release(dead)
+    dead.alive = False
+
+    replacement = pool.acquire()
+    assert replacement is not dead
+    assert dead.closed
+    stats = pool.get_stats()
+    assert stats["health_check_failures"] == 1
+    assert stats["created"] == 2 and stats["open"] == 1
+
+
+def test_recent_session_is_not_pinged():
+    driver = FakeDriver()
+    pool = make_pool(driver, ping_interval=60)
+    connection = pool.acquire()
+    pool.release(connection)
+    connection.alive = False  # would fail a ping
+
+    assert pool.acquire() is connection
+    assert pool.get_stats()["health_check_failures"] == 0
+
+
+def test_release_rolls_back_and_resets_call_timeout():
+    driver = FakeDriver()
+    pool = make_pool(driver)
+    connection = pool.acquire()
+    connection.callTimeout = 30000
+
+    pool.release(connection)
+    assert connection.rollbacks == 1
+    assert connection.callTimeout == 0
+    assert pool.get_stats()["idle"] == 1
+
+
+def test_session_that_cannot_roll_back_is_dropped():
+    driver = FakeDriver()
+    pool = make_pool(driver)
+    broken = pool.acquire()
+    broken.fail_rollback = True
+
+    pool.release(broken)
+    assert broken.closed
+    stats = pool.get_stats()
+    assert stats["release_failures"] == 1
+    assert stats["open"] == 0 and stats["idle"] == 0
+    assert pool.acquire() is not broken
+
+
+def test_manager_shares_pools_by_credential_fingerprint():
+    manager = OracleSessionPoolManager(FakeDriver())
+
+    same = manager.pool_for(dict(CREDENTIALS))
+    assert manager.pool_for(dict(CREDENTIALS)) is same
+    other = manager.pool_for({**CREDENTIALS, "password": "rotated"})
+    assert other is not same
+
+    pool, connection = manager.session(CREDENTIALS)
+    assert pool is same
+    pool.release(connection)
+
+    stats = manager.get_stats()
+    assert len(stats) == 2
+    assert all(len(key) == 12 for key in stats)
+    assert CREDENTIALS["password"] not in str(stats)
+
+    manager.close_all()
+    assert connection.closed
@@ -0,0 +1,199 @@
+"""
+Execution queue (workflow/queue.py) against a real Redis: enqueue / read / ack,
+heartbeat, XAUTOCLAIM reclaim, dead-lettering and cancel-before-start
+"""
+
+import asyncio
+
+import pytest
+import redis.asyncio as aioredis
+
+from conftest import run
+from config import settings
+from cache_manager import CacheManager
+from workflow.queue import ExecutionQueue, ExecutionQueueClient
+from workflow.scheduler import SchedulerSaturatedError
+
+
+def make_queue(redis_params, consumer):
+    return ExecutionQueue(
+        client=aioredis.Redis(decode_responses=True, **redis_params),
+        prefix="test:executions",
+        group="test-workers",
+        consumer=consumer
+    )
+
+
+def make_job(execution_id, priority="manual"):
+    return {"workflow_id": "wf", "input_data": {"cusips": ["A1"]}, "execution_id": execution_id,
+            "priority": priority, "resume": False}
+
+
+def test_enqueue_read_ack(redis_params):
+    async def scenario():
+        queue = make_queue(redis_params, "worker-a")
+        await queue.ensure_groups()
+        await queue.enqueue(make_job("e-manual", "manual"))
+        await queue.enqueue(make_job("e-repair", "eod_repair"))
+        assert await queue.backlog() == 2
+
+        jobs = await queue.read(2, block_ms=100)
+        assert [job["execution_id"] for _, _, job in jobs] == ["e-repair", "e-manual"]  # priority order
+        assert await queue.read(1, block_ms=100) == []  # already delivered
+
+        for stream, entry_id, _ in jobs:
+            await queue.ack(stream, entry_id)
+        assert await queue.backlog() == 0
+        stats = await queue.get_stats()
+        assert all(stream["pending"] == 0 for stream in stats["streams"].values())
+        await queue.redis.aclose()
+
+    run(scenario())
+
+
+def test_enqueue_refuses_past_max_queued(redis_params, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_QUEUED_WORKFLOWS", 1)
+
+    async def scenario():
+        queue = make_queue(redis_params, "worker-a")
+        await queue.ensure_groups()
+        await queue.enqueue(make_job("e1"))
+        with pytest.raises(SchedulerSaturatedError):
+            await queue.enqueue(make_job("e2"))
+        await queue.redis.aclose()
+
+    run(scenario())
+
+
+def test_heartbeat_keeps_job_from_reclaim(redis_params):
+    async def scenario():
+        owner, rescuer = make_queue(redis_params, "worker-a"), make_queue(redis_params, "worker-b")
+        await owner.ensure_groups()
+        await owner.enqueue(make_job("e1"))
+        (stream, entry_id, _), = await owner.read(1, block_ms=100)
+
+        await asyncio.sleep(0.15)
+        await owner.heartbeat([(stream, entry_id)])
+        reclaimed, dead = await rescuer.reclaim(min_idle_ms=100)
+        assert reclaimed == [] and dead == []
+
+        await asyncio.sleep(0.15)  # no heartbeat: the owner looks dead now
+        reclaimed, dead = await rescuer.reclaim(min_idle_ms=100)
+        assert [(s, e) for s, e, _ in reclaimed] == [(stream, entry_id)]
+        assert reclaimed[0][2]["resume"] is True
+        assert dead == []
+        for queue in (owner, rescuer):
+            await queue.redis.aclose()
+
+    run(scenario())
+
+
+def test_reclaim_follows_cursor_past_healthy_pending_jobs(redis_params):
+    async def scenario():
+        healthy, lost, rescuer = (make_queue(redis_params, name) for name in ("worker-a", "worker-b", "worker-c"))
+        await healthy.ensure_groups()
+        for number in range(30):
+            await healthy.enqueue(make_job(f"e{number}"))
+        held = await healthy.read(25, block_ms=100)
+        orphaned = await lost.read(5, block_ms=100)
+
+        await asyncio.sleep(0.15)
+        await healthy.heartbeat([(stream, entry_id) for stream, entry_id, _ in held])
+        # COUNT 1 scans ~10 pending entries per call: the lost ones are past the first pages
+        reclaimed, _ = await rescuer.reclaim(min_idle_ms=100, count=1)
+        assert [job["execution_id"] for _, _, job in reclaimed] == [orphaned[0][2]["execution_id"]]
+        for queue in (healthy, lost, rescuer):
+            await queue.redis.aclose()
+
+    run(scenario())
+
+
+def test_reclaim_claims_at_most_count_across_streams(redis_params):
+    async def scenario():
+        lost, rescuer = make_queue(redis_params, "worker-a"), make_queue(redis_params, "worker-b")
+        await lost.ensure_groups()
+        await lost.enqueue(make_job("e-manual", "manual"))
+        await lost.enqueue(make_job("e-scheduled", "scheduled"))
+        await lost.read(2, block_ms=100)
+
+        await asyncio.sleep(0.05)
+        reclaimed, _ = await rescuer.reclaim(min_idle_ms=10, count=1)
+        assert [job["execution_id"] for _, _, job in reclaimed] == ["e-scheduled"]
+        reclaimed, _ = await rescuer.reclaim(min_idle_ms=10, count=5)
+        assert [job["execution_id"] for _, _, job in reclaimed] == ["e-manual"]
+        for queue in (lost, rescuer):
+            await queue.redis.aclose()
+
+    run(scenario())
+
+
+def test_reclaim_dead_letters_after_max_deliveries(redis_params, monkeypatch):
+    monkeypatch.setattr(settings, "EXECUTION_MAX_DELIVERIES", 2)
+
+    async def scenario():
+        first, second, third = (make_queue(redis_params, name) for name in ("worker-a", "worker-b", "worker-c"))
+        await first.ensure_groups()
+        await first.enqueue(make_job("e1"))
+        await first.read(1, block_ms=100)  # delivery 1
+
+        await asyncio.sleep(0.02)
+        reclaimed, dead = await second.reclaim(min_idle_ms=10)  # delivery 2
+        assert len(reclaimed) == 1 and dead == []
+
+        await asyncio.sleep(0.02)
+        reclaimed, dead = await third.reclaim(min_idle_ms=10)  # delivery 3 > 2
+        assert reclaimed == []
+        assert [job["execution_id"] for job in dead] == ["e1"]
+
+        assert await third.backlog() == 0
+        (_, fields), = await third.redis.xrange(third.dead_stream)
+        assert fields["source"] == third.stream_for("manual")
+        assert int(fields["deliveries"]) == 3
+        for queue in (first, second, third):
+            await queue.redis.aclose()
+
+    run(scenario())
+
+
+class RecordingScheduler:
+    """Stands in for WorkflowScheduler: records what the worker submits"""
+
+    def __init__(self, cache_manager):
+        self.orchestrator = type("Orchestrator", (), {"cache_manager": cache_manager})()
+        self.max_concurrent = 2
+        self.running = {}
+        self.submitted = []
+
+    def submit(self, workflow_id, input_data, execution_id, **kwargs):
+        self.submitted.append(execution_id)
+
+
+def test_cancel_before_start_is_skipped_by_worker(redis_params):
+    from worker import WorkflowWorker
+
+    cache_manager = CacheManager(**redis_params)
+    assert cache_manager.use_redis
+
+    async def scenario():
+        queue = make_queue(redis_params, "worker-a")
+        client = ExecutionQueueClient(cache_manager, queue)
+        await client.submit("wf", {}, "e-cancelled")
+        await client.submit("wf", {}, "e-kept")
+        assert cache_manager.get_execution("e-cancelled")["status"] == "queued"
+
+        assert await client.cancel("e-cancelled") is True
+        assert cache_manager.get_execution("e-cancelled")["status"] == "cancelled"
+        assert await client.cancel("e-cancelled") is False  # no longer active
+
+        scheduler = RecordingScheduler(cache_manager)
+        worker = WorkflowWorker(queue, scheduler)
+        for stream, entry_id, job in await queue.read(2, block_ms=100):
+            worker._start(stream, entry_id, job)
+        await asyncio.sleep(0.05)  # the skipped job is acked in the background
+
+        assert scheduler.submitted == ["e-kept"]
+        assert list(worker.in_flight) == ["e-kept"]
+        assert await queue.backlog() == 1  # only the running job is left
+        await queue.redis.aclose()
+
+    run(scenario())
@@ -0,0 +1,141 @@
+"""
+Retries and circuit breakers (workflow/resilience.py): breaker state
+transitions with a fake clock and which failures are retried
+"""
+
+import pytest
+
+from conftest import run
+from config import settings
+from workflow.resilience import CircuitBreaker, ResilienceLayer, RetryPolicy
+
+TARGET = "oracle:db1:1521/PRICING"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("workflow.resilience.time", clock)
+    monkeypatch.setattr(settings, "CIRCUIT_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "CIRCUIT_COOLDOWN", 30)
+    return clock
+
+
+def test_breaker_opens_probes_and_closes(cache_manager, clock):
+    breaker = CircuitBreaker(cache_manager)
+    assert breaker.state(TARGET) == "closed"
+
+    assert not breaker.record_failure(TARGET)
+    assert breaker.record_failure(TARGET)
+    assert breaker.state(TARGET) == "open" and not breaker.allow(TARGET)
+
+    clock.now += 31
+    assert breaker.state(TARGET) == "half_open"
+    assert breaker.allow(TARGET)  # this caller is the probe
+    assert not breaker.allow(TARGET)  # everyone else still fails fast
+
+    breaker.record_success(TARGET)
+    assert breaker.state(TARGET) == "closed" and breaker.allow(TARGET)
+
+
+def test_failed_probe_reopens_for_another_cooldown(cache_manager, clock):
+    breaker = CircuitBreaker(cache_manager)
+    breaker.record_failure(TARGET), breaker.record_failure(TARGET)
+
+    clock.now += 31
+    assert breaker.allow(TARGET)
+    assert breaker.record_failure(TARGET)
+    assert breaker.state(TARGET) == "open"
+
+    clock.now += 31
+    assert breaker.allow(TARGET)  # the probe claim was released with the failure
+
+
+def test_abandoned_probe_is_taken_over(cache_manager, clock, monkeypatch):
+    monkeypatch.setattr(settings, "CIRCUIT_PROBE_TIMEOUT", 60)
+    breaker = CircuitBreaker(cache_manager)
+    breaker.record_failure(TARGET), breaker.record_failure(TARGET)
+
+    clock.now += 31
+    assert breaker.allow(TARGET)  # this probe never reports back
+    clock.now += 61
+    assert breaker.allow(TARGET)
+
+
+def test_transient_errors_are_retried_and_recover(cache_manager, clock, monkeypatch):
+    monkeypatch.setattr(settings, "CIRCUIT_FAILURE_THRESHOLD", 5)
+    layer = ResilienceLayer(cache_manager)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionResetError("connection reset by peer")
+        return {"success": True, "row_count": 1}
+
+    result = run(layer.call(TARGET, RetryPolicy(attempts=3, backoff="none"), flaky))
+
+    assert result == {"success": True, "row_count": 1} and len(calls) == 3
+    assert layer.stats["retries"] == 2 and layer.stats["recovered"] == 1
+    assert layer.breaker.state(TARGET) == "closed"
+
+
+def test_exhausted_transient_error_is_raised_and_counted(cache_manager, clock):
+    layer = ResilienceLayer(cache_manager)
+
+    async def down():
+        raise TimeoutError("listener did not answer")
+
+    with pytest.raises(TimeoutError):
+        run(layer.call(TARGET, RetryPolicy(attempts=2, backoff="none"), down))
+    assert layer.breaker.state(TARGET) == "open"  # two failures reach the threshold
+
+    fast = run(layer.call(TARGET, RetryPolicy(attempts=2, backoff="none"), down))
+    assert fast["circuit_open"] and layer.stats["fast_failures"] == 1
+
+
+def test_bugs_propagate_without_retry_or_breaker(cache_manager, clock):
+    layer = ResilienceLayer(cache_manager)
+    calls = []
+
+    async def broken():
+        calls.append(1)
+        raise KeyError("credentials")
+
+    for _ in range(3):
+        with pytest.raises(KeyError):
+            run(layer.call(TARGET, RetryPolicy(attempts=3, backoff="none"), broken))
+
+    assert len(calls) == 3 and layer.stats["retries"] == 0
+    assert layer.breaker.state(TARGET) == "closed"
+
+
+def test_retryable_results_retry_but_other_errors_return_as_is(cache_manager, clock):
+    layer = ResilienceLayer(cache_manager)
+    results = iter([{"success": False, "error": "ORA-12541", "retryable": True},
+                    {"success": False, "error": "ORA-00942: table or view does not exist"}])
+
+    async def call():
+        return next(results)
+
+    result = run(layer.call(TARGET, RetryPolicy(attempts=3, backoff="none"), call))
+    assert result["error"].startswith("ORA-00942") and layer.stats["retries"] == 1
+    assert layer.breaker.state(TARGET) == "closed"  # the target answered
+
+
+def test_policy_from_agent_and_node_config():
+    policy = RetryPolicy.from_config({"retry_attempts": 3, "retry_backoff": "linear"}, {"retry_attempts": 5})
+    assert policy.attempts == 5 and policy.backoff == "linear"
+    assert RetryPolicy(backoff="bogus").backoff == "exponential"
+
+    capped = RetryPolicy(attempts=5, backoff="exponential", base_delay=1.0, max_delay=3.0)
+    assert all(0 <= capped.delay(attempt) <= 3.0 for attempt in range(1, 6))
+    assert RetryPolicy(backoff="none").delay(4) == 0.0
@@ -0,0 +1,159 @@
+"""
+Workflow scheduler (workflow/scheduler.py): global and per-workflow slots,
+priority order, saturation and pause / resume handing slots over
+"""
+
+import asyncio
+
+import pytest
+
+from conftest import run
+from workflow.scheduler import WorkflowScheduler, SchedulerSaturatedError
+
+
+class GatedOrchestrator:
+    """execute_workflow() blocks until release(execution_id)"""
+
+    def __init__(self, cache_manager):
+        self.cache_manager = cache_manager
+        self.started = []
+        self.gates = {}
+
+    async def execute_workflow(self, workflow_id, input_data, execution_id, connection_manager,
+                               handle=None, resume=False):
+        self.started.append(execution_id)
+        await self.gates.setdefault(execution_id, asyncio.Event()).wait()
+
+    def release(self, execution_id):
+        self.gates.setdefault(execution_id, asyncio.Event()).set()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def make_scheduler(cache_manager, **limits):
+    orchestrator = GatedOrchestrator(cache_manager)
+    params = {"max_concurrent": 2, "max_per_workflow": 2, "max_queued": 10}
+    params.update(limits)
+    return WorkflowScheduler(orchestrator, None, **params), orchestrator
+
+
+def test_global_and_per_workflow_slots(cache_manager):
+    async def scenario():
+        scheduler, orchestrator = make_scheduler(cache_manager, max_concurrent=3, max_per_workflow=1)
+        responses = [scheduler.submit(workflow, {}, execution)
+                     for workflow, execution in [("wf-a", "a1"), ("wf-a", "a2"), ("wf-b", "b1"), ("wf-c", "c1")]]
+        await settle()
+
+        assert [r["status"] for r in responses] == ["running", "queued", "running", "running"]
+        assert orchestrator.started == ["a1", "b1", "c1"]
+        assert responses[1]["queue_position"] == 1
+
+        orchestrator.release("a1")
+        await settle()
+        assert orchestrator.started[-1] == "a2"
+        assert scheduler.running_per_workflow == {"wf-a": 1, "wf-b": 1, "wf-c": 1}
+
+        for execution in ("a2", "b1", "c1"):
+            orchestrator.release(execution)
+        await settle()
+        assert scheduler.running == {} and scheduler.running_per_workflow == {}
+        assert scheduler.get_stats()["completed"] == 4
+
+    run(scenario())
+
+
+def test_queue_runs_by_priority_and_rejects_when_full(cache_manager):
+    async def scenario():
+        scheduler, orchestrator = make_scheduler(cache_manager, max_concurrent=1, max_queued=3)
+        scheduler.submit("wf", {}, "running", priority="manual")
+        scheduler.submit("wf", {}, "chat", priority="chat")
+        scheduler.submit("wf", {}, "scheduled", priority="scheduled")
+        scheduler.submit("wf", {}, "repair", priority="eod_repair")
+        with pytest.raises(SchedulerSaturatedError):
+            scheduler.submit("wf", {}, "overflow")
+        with pytest.raises(ValueError):
+            scheduler.submit("wf", {}, "bad", priority="urgent")
+
+        for execution in ("running", "repair", "scheduled"):
+            await settle()
+            orchestrator.release(execution)
+        await settle()
+        assert orchestrator.started == ["running", "repair", "scheduled", "chat"]
+        assert scheduler.get_stats()["rejected"] == 1
+
+    run(scenario())
+
+
+def test_pause_hands_the_slot_to_the_queue_and_resume_goes_first(cache_manager):
+    async def scenario():
+        scheduler, orchestrator = make_scheduler(cache_manager, max_concurrent=1)
+        scheduler.submit("wf", {}, "first")
+        scheduler.submit("wf", {}, "second")
+        scheduler.submit("wf", {}, "third")
+        await settle()
+
+        assert scheduler.pause("first")
+        await settle()
+        assert scheduler.running.keys() == {"second"}
+        assert scheduler.paused["first"]["handle"].paused
+        assert cache_manager.get_execution("first")["status"] == "paused"
+
+        # No slot yet: resume waits, ahead of the still queued "third"
+        assert scheduler.resume("first")
+        assert not scheduler.resume("first")
+        assert scheduler.get_stats()["resuming"] == 1
+        assert scheduler.paused["first"]["handle"].paused
+
+        orchestrator.release("second")
+        await settle()
+        assert scheduler.running.keys() == {"first"}
+        assert not scheduler.running["first"]["handle"].paused
+        assert "third" not in orchestrator.started
+
+        orchestrator.release("first")
+        await settle()
+        assert orchestrator.started == ["first", "second", "third"]
+
+    run(scenario())
+
+
+def test_paused_execution_that_finishes_does_not_free_a_slot_twice(cache_manager):
+    async def scenario():
+        scheduler, orchestrator = make_scheduler(cache_manager, max_concurrent=1)
+        scheduler.submit("wf", {}, "first")
+        scheduler.submit("wf", {}, "second")
+        await settle()
+        scheduler.pause("first")
+        await settle()
+
+        orchestrator.release("first")  # its in-flight nodes finish while paused
+        await settle()
+        assert scheduler.paused == {} and scheduler.running.keys() == {"second"}
+        assert scheduler.running_per_workflow == {"wf": 1}
+
+        scheduler.submit("wf", {}, "third")
+        await settle()
+        assert "third" not in orchestrator.started
+
+    run(scenario())
+
+
+def test_cancel_queued_and_running(cache_manager):
+    async def scenario():
+        scheduler, orchestrator = make_scheduler(cache_manager, max_concurrent=1)
+        finished = []
+        scheduler.submit("wf", {}, "running", on_finished=lambda: finished.append("running"))
+        scheduler.submit("wf", {}, "queued", on_finished=lambda: finished.append("queued"))
+        await settle()
+
+        assert scheduler.cancel("queued")
+        assert cache_manager.get_execution("queued")["status"] == "cancelled"
+        assert scheduler.cancel("running")
+        await settle()
+        assert finished == ["queued", "running"]
+        assert not scheduler.is_active("running") and not scheduler.cancel("missing")
+
+    run(scenario())
@@ -0,0 +1,70 @@
+"""
+Result spill store (workflow/spill.py): large results round-trip through
+Redis or disk, ranges read only their rows, small results stay inline
+"""
+
+import pytest
+
+from workflow.spill import ResultSpillStore
+
+ROWS = [{"CUSIP": f"C{i:05d}", "PRICE": i * 1.5} for i in range(50)]
+
+
+def make_result(rows=ROWS):
+    return {"success": True, "row_count": len(rows), "columns": ["CUSIP", "PRICE"], "data": list(rows)}
+
+
+@pytest.fixture(params=["redis", "disk"])
+def spill(request, cache_manager, tmp_path, monkeypatch):
+    monkeypatch.setattr("workflow.spill.settings.RESULT_SPILL_DIR", str(tmp_path))
+    return ResultSpillStore(cache_manager, threshold_bytes=500, backend=request.param)
+
+
+def test_large_result_round_trips(spill):
+    result = make_result()
+    handle, digest = spill.store("exec-1", "prices", result)
+
+    assert ResultSpillStore.is_handle(handle)
+    assert handle["store"] == spill.backend.name
+    assert handle["rows_field"] == "data" and handle["total_rows"] == 50
+    assert handle["summary"]["row_count"] == 50
+    assert handle["result_ref"] == "/api/executions/exec-1/nodes/prices/result"
+    assert spill.load("exec-1", "prices") == result
+    assert spill.load("exec-1", "missing") is None
+    assert len(digest) == 64
+
+
+def test_load_range_reads_only_the_requested_rows(spill):
+    spill.store("exec-1", "prices", make_result())
+
+    page = spill.load_range("exec-1", "prices", 10, 5)
+    assert page["data"] == ROWS[10:15]
+    assert page["row_count"] == 50  # meta fields come back whole
+    assert spill.load_range("exec-1", "prices", 48, 10)["data"] == ROWS[48:]
+    assert spill.get_stats()["range_reads"] == 2
+
+
+def test_dict_row_fields_keep_their_shape(spill):
+    result = {"success": True, "item_count": 40, "results": {f"C{i}": {"status": "PRICED" * 5} for i in range(40)}}
+    handle, _ = spill.store("exec-1", "map", result)
+
+    assert handle["rows_field"] == "results"
+    assert spill.load("exec-1", "map") == result
+
+
+def test_small_results_stay_inline_with_a_stable_digest(spill):
+    result = make_result(ROWS[:2])
+    stored, digest = spill.store("exec-1", "prices", result)
+
+    assert stored is result
+    assert spill.store("exec-2", "prices", make_result(ROWS[:2]))[1] == digest
+    assert spill.store("exec-2", "prices", make_result(ROWS[:3]))[1] != digest
+
+
+def test_memory_fallback_does_not_spill(cache_manager):
+    cache_manager.use_redis = False
+    spill = ResultSpillStore(cache_manager, threshold_bytes=500, backend="redis")
+
+    stored, _ = spill.store("exec-1", "prices", make_result())
+    assert not ResultSpillStore.is_handle(stored)
+    assert spill.get_stats()["not_spilled"] == 1 and spill.get_stats()["backend"] == "memory"
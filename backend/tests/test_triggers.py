@@ -0,0 +1,59 @@
+"""
+Cron triggers (workflow/triggers.py): next fire times and trigger validation
+"""
+
+from datetime import datetime
+
+import pytest
+
+from workflow.triggers import CronExpression, CronError, normalize_triggers
+
+
+def fires(expression, start, count):
+    cron, moment, times = CronExpression(expression), start, []
+    for _ in range(count):
+        moment = cron.next_after(moment)
+        times.append(moment)
+    return times
+
+
+def test_next_after_is_strictly_later():
+    cron = CronExpression("30 18 * * MON-FRI")
+    assert cron.next_after(datetime(2024, 1, 5, 18, 29, 59)) == datetime(2024, 1, 5, 18, 30)
+    assert cron.next_after(datetime(2024, 1, 5, 18, 30)) == datetime(2024, 1, 8, 18, 30)  # Fri -> Mon
+
+
+def test_steps_ranges_and_macros():
+    assert fires("*/20 8-9 * * *", datetime(2024, 1, 1, 8, 50), 3) == [
+        datetime(2024, 1, 1, 9, 0), datetime(2024, 1, 1, 9, 20), datetime(2024, 1, 1, 9, 40)
+    ]
+    assert CronExpression("@daily").next_after(datetime(2024, 2, 28, 12, 0)) == datetime(2024, 2, 29, 0, 0)
+    assert CronExpression("0 0 29 2 *").next_after(datetime(2024, 3, 1)) == datetime(2028, 2, 29, 0, 0)
+
+
+def test_restricted_day_fields_match_either():
+    # The 1st and 15th, plus every Monday (Jan 2024: Mondays are 1, 8, 15, 22)
+    assert [t.day for t in fires("0 6 1,15 * 1", datetime(2024, 1, 1, 7), 4)] == [8, 15, 22, 29]
+
+
+def test_stepped_day_field_counts_as_unrestricted():
+    # */2 and Monday: only Mondays that fall on odd days (AND, as in cron)
+    times = fires("0 0 */2 * 1", datetime(2024, 1, 1, 1), 4)
+    assert [t.strftime("%a %d") for t in times] == ["Mon 15", "Mon 29", "Mon 05", "Mon 19"]
+
+
+@pytest.mark.parametrize("expression", ["* * *", "61 * * * *", "0 0 * * FUNDAY", "*/0 * * * *", "5-1 * * * *"])
+def test_invalid_expressions_raise(expression):
+    with pytest.raises(CronError):
+        CronExpression(expression)
+
+
+def test_normalize_fills_defaults_and_validates():
+    trigger, = normalize_triggers([{"cron": "0 18 * * MON-FRI", "input_data": {"cusips": ["A1"]}}])
+    assert trigger["priority"] == "scheduled" and trigger["enabled"] and trigger["prewarm"]
+    assert trigger["id"]
+
+    with pytest.raises(CronError, match="needs a 'cron'"):
+        normalize_triggers([{"priority": "scheduled"}])
+    with pytest.raises(CronError, match="Unknown priority"):
+        normalize_triggers([{"cron": "0 18 * * *", "priority": "urgent"}])
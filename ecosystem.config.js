@@ -1,6 +1,40 @@
 // PM2 Ecosystem Configuration for Production
 // Usage: pm2 start ecosystem.config.js
 
+// Queue workers run queued workflows (scale independently of the API). They are
+// only started with EXECUTION_MODE=queue in the environment, which is then passed
+// to the API processes as well; queue mode also needs CREDENTIAL_ENCRYPTION_KEY:
+//   EXECUTION_MODE=queue CREDENTIAL_ENCRYPTION_KEY=... pm2 start ecosystem.config.js
+const executionMode = process.env.EXECUTION_MODE || 'local';
+
+const queueWorkers = executionMode === 'queue' ? [
+  {
+    name: 'pricing-worker',
+    cwd: './backend',
+    script: 'venv/bin/python',
+    args: 'app/worker.py',
+    interpreter: 'none',
+    env: {
+      NODE_ENV: 'production',
+      PYTHONPATH: './backend',
+      PYTHONUNBUFFERED: '1',
+      EXECUTION_MODE: executionMode
+    },
+    instances: 2,
+    exec_mode: 'fork',
+    max_memory_restart: '1G',
+    error_file: '/var/log/pricing-workflow/worker-error.log',
+    out_file: '/var/log/pricing-workflow/worker-out.log',
+    log_date_format: 'YYYY-MM-DD HH:mm:ss Z',
+    merge_logs: true,
+    autorestart: true,
+    watch: false,
+    max_restarts: 10,
+    min_uptime: '10s',
+    kill_timeout: 10000
+  }
+] : [];
+
 module.exports = {
   apps: [
     {
@@ -12,7 +46,8 @@ module.exports = {
       env: {
         NODE_ENV: 'production',
         PYTHONPATH: './backend',
-        PYTHONUNBUFFERED: '1'
+        PYTHONUNBUFFERED: '1',
+        EXECUTION_MODE: executionMode
       },
       instances: 2,  // Run 2 instances for load balancing
       exec_mode: 'cluster',
@@ -28,6 +63,7 @@ module.exports = {
       listen_timeout: 3000,
       kill_timeout: 5000
     },
+    ...queueWorkers,
     {
       name: 'pricing-frontend',
       cwd: './frontend',